@@ -0,0 +1,63 @@
+"""Create failure_trends table for weekly trend analytics
+
+Revision ID: 20261019_create_failure_trends
+Revises: ba44018ef18c
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_create_failure_trends"
+down_revision = "ba44018ef18c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "failure_trends",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("dimension", sa.String(length=32), nullable=False),
+        sa.Column("dimension_key", sa.String(length=255), nullable=False),
+        sa.Column("label", sa.String(length=255), nullable=True),
+        sa.Column("week_start", sa.Date(), nullable=False),
+        sa.Column("claim_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "total_cost_usd",
+            sa.Numeric(precision=12, scale=2),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column("rolling_claim_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "rolling_cost_usd",
+            sa.Numeric(precision=12, scale=2),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column("ewma", sa.Float(), nullable=True),
+        sa.Column("baseline_mean", sa.Float(), nullable=True),
+        sa.Column("upper_control_limit", sa.Float(), nullable=True),
+        sa.Column("is_spike", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column(
+            "computed_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+    op.create_index(
+        "ix_failure_trends_dimension_key_week",
+        "failure_trends",
+        ["dimension", "dimension_key", "week_start"],
+        unique=True,
+    )
+    op.create_index("ix_failure_trends_spike_week", "failure_trends", ["is_spike", "week_start"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_failure_trends_spike_week", table_name="failure_trends")
+    op.drop_index("ix_failure_trends_dimension_key_week", table_name="failure_trends")
+    op.drop_table("failure_trends")
@@ -0,0 +1,116 @@
+"""Add claims.geohash and geo_hotspots table
+
+Revision ID: 20261020_add_claim_geohash_and_hotspots
+Revises: 20261019_create_failure_trends
+Create Date: 2026-10-20 00:00:00.000000
+"""
+
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261020_add_claim_geohash_and_hotspots"
+down_revision = "20261019_create_failure_trends"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Frozen copies of the encoder and default precision as of this revision, so later
+# changes to app code cannot change what this migration writes. The app re-encodes
+# with its own settings on ingest.
+GEOHASH_PRECISION = 7
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str | None:
+    if not (math.isfinite(latitude) and math.isfinite(longitude)) or abs(latitude) > 90 or abs(longitude) > 180:
+        return None
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    lat_cell = min(max(math.floor((latitude + 90.0) / 180.0 * (1 << lat_bits)), 0), (1 << lat_bits) - 1)
+    lon_cell = min(max(math.floor((longitude + 180.0) / 360.0 * (1 << lon_bits)), 0), (1 << lon_bits) - 1)
+
+    # Geohash interleaves longitude and latitude bits, starting with longitude.
+    code = 0
+    for position in range(total_bits):
+        if position % 2 == 0:
+            bit = (lon_cell >> (lon_bits - 1 - position // 2)) & 1
+        else:
+            bit = (lat_cell >> (lat_bits - 1 - position // 2)) & 1
+        code = (code << 1) | bit
+    return "".join(GEOHASH_ALPHABET[(code >> shift) & 31] for shift in range(5 * (precision - 1), -1, -5))
+
+
+def _backfill_geohashes() -> None:
+    bind = op.get_bind()
+    claims = sa.table(
+        "claims",
+        sa.column("id", sa.Integer()),
+        sa.column("latitude", sa.Float()),
+        sa.column("longitude", sa.Float()),
+        sa.column("geohash", sa.String()),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(claims.c.id, claims.c.latitude, claims.c.longitude)
+            .where(claims.c.id > last_id, claims.c.latitude.is_not(None), claims.c.longitude.is_not(None))
+            .order_by(claims.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            claims.update().where(claims.c.id == sa.bindparam("claim_pk")).values(geohash=sa.bindparam("cell")),
+            [{"claim_pk": row.id, "cell": _encode_geohash(row.latitude, row.longitude)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("claims", sa.Column("geohash", sa.String(length=12), nullable=True))
+    op.create_index("ix_claims_geohash", "claims", ["geohash"], unique=False)
+    op.create_index("ix_claims_latitude_longitude", "claims", ["latitude", "longitude"], unique=False)
+    _backfill_geohashes()
+
+    op.create_table(
+        "geo_hotspots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("cluster_id", sa.Integer(), nullable=True),
+        sa.Column("cell", sa.String(length=12), nullable=False),
+        sa.Column("precision", sa.Integer(), nullable=False),
+        sa.Column("center_latitude", sa.Float(), nullable=False),
+        sa.Column("center_longitude", sa.Float(), nullable=False),
+        sa.Column("claim_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "total_cost_usd",
+            sa.Numeric(precision=12, scale=2),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column("lift", sa.Float(), nullable=False),
+        sa.Column("z_score", sa.Float(), nullable=False),
+        sa.Column("is_hotspot", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column(
+            "computed_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+    op.create_index("ix_geo_hotspots_cell", "geo_hotspots", ["cell"], unique=False)
+    op.create_index("ix_geo_hotspots_cluster_hotspot", "geo_hotspots", ["cluster_id", "is_hotspot"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_geo_hotspots_cluster_hotspot", table_name="geo_hotspots")
+    op.drop_index("ix_geo_hotspots_cell", table_name="geo_hotspots")
+    op.drop_table("geo_hotspots")
+
+    op.drop_index("ix_claims_latitude_longitude", table_name="claims")
+    op.drop_index("ix_claims_geohash", table_name="claims")
+    op.drop_column("claims", "geohash")
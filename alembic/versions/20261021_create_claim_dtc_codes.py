@@ -0,0 +1,67 @@
+"""Create claim_dtc_codes association table
+
+Revision ID: 20261021_create_claim_dtc_codes
+Revises: 20261020_add_claim_geohash_and_hotspots
+Create Date: 2026-10-21 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261021_create_claim_dtc_codes"
+down_revision = "20261020_add_claim_geohash_and_hotspots"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+DTC_CODE_MAX_LENGTH = 32
+
+
+def _parse_dtc_codes(raw: object) -> list[str]:
+    # Frozen copy of ingest_service.parse_dtc_codes as of this revision, so the backfill
+    # neither changes with app code nor imports pandas into alembic.
+    if not isinstance(raw, str):
+        return []
+    codes = (code.strip().upper() for code in raw.split(","))
+    return list(dict.fromkeys(code for code in codes if code and len(code) <= DTC_CODE_MAX_LENGTH))
+
+
+def _backfill_dtc_codes(dtc_table: sa.Table) -> None:
+    bind = op.get_bind()
+    claims = sa.table("claims", sa.column("id", sa.Integer()), sa.column("dtc_codes", sa.Text()))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(claims.c.id, claims.c.dtc_codes)
+            .where(claims.c.id > last_id)
+            .order_by(claims.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        entries = [
+            {"claim_id": row.id, "code": code}
+            for row in rows
+            for code in _parse_dtc_codes(row.dtc_codes)
+        ]
+        if entries:
+            op.bulk_insert(dtc_table, entries)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    dtc_table = op.create_table(
+        "claim_dtc_codes",
+        sa.Column("claim_id", sa.Integer(), nullable=False),
+        sa.Column("code", sa.String(length=32), nullable=False),
+        sa.ForeignKeyConstraint(["claim_id"], ["claims.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("claim_id", "code"),
+    )
+    op.create_index("ix_claim_dtc_codes_code_claim_id", "claim_dtc_codes", ["code", "claim_id"], unique=False)
+    _backfill_dtc_codes(dtc_table)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_claim_dtc_codes_code_claim_id", table_name="claim_dtc_codes")
+    op.drop_table("claim_dtc_codes")
@@ -0,0 +1,37 @@
+"""Create cluster_details table for precomputed drill-down data
+
+Revision ID: 20261022_create_cluster_details
+Revises: 20261021_create_claim_dtc_codes
+Create Date: 2026-10-22 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261022_create_cluster_details"
+down_revision = "20261021_create_claim_dtc_codes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cluster_details",
+        sa.Column("cluster_id", sa.Integer(), primary_key=True),
+        sa.Column("representative_claims", sa.JSON(), nullable=False),
+        sa.Column("model_breakdown", sa.JSON(), nullable=False),
+        sa.Column("region_breakdown", sa.JSON(), nullable=False),
+        sa.Column("cost_histogram", sa.JSON(), nullable=True),
+        sa.Column(
+            "computed_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.ForeignKeyConstraint(["cluster_id"], ["clusters.id"], ondelete="CASCADE"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cluster_details")
@@ -0,0 +1,26 @@
+"""Add users.token_version
+
+Revision ID: 20261023_add_user_token_version
+Revises: 20261022_create_cluster_details
+Create Date: 2026-10-23 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261023_add_user_token_version"
+down_revision = "20261022_create_cluster_details"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
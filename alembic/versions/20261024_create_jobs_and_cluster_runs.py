@@ -0,0 +1,76 @@
+"""Create jobs and cluster_runs tables
+
+Revision ID: 20261024_create_jobs_and_cluster_runs
+Revises: 20261023_add_user_token_version
+Create Date: 2026-10-24 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261024_create_jobs_and_cluster_runs"
+down_revision = "20261023_add_user_token_version"
+branch_labels = None
+depends_on = None
+
+ACTIVE_JOB = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column("kind", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("stages", sa.JSON(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("worker_id", sa.String(length=255), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_jobs_status", "jobs", ["status"], unique=False)
+    op.create_index("ix_jobs_kind_status", "jobs", ["kind", "status"], unique=False)
+    op.create_index(
+        "uq_jobs_active_kind",
+        "jobs",
+        ["kind"],
+        unique=True,
+        postgresql_where=ACTIVE_JOB,
+        sqlite_where=ACTIVE_JOB,
+    )
+
+    op.create_table(
+        "cluster_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.String(length=36), nullable=True),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="running"),
+        sa.Column("num_claims", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("num_clusters", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "started_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="SET NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cluster_runs")
+
+    op.drop_index("uq_jobs_active_kind", table_name="jobs")
+    op.drop_index("ix_jobs_kind_status", table_name="jobs")
+    op.drop_index("ix_jobs_status", table_name="jobs")
+    op.drop_table("jobs")
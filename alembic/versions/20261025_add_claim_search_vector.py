@@ -0,0 +1,46 @@
+"""Add claims.search_vector full-text column and GIN index
+
+Revision ID: 20261025_add_claim_search_vector
+Revises: 20261024_create_jobs_and_cluster_runs
+Create Date: 2026-10-25 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+revision = "20261025_add_claim_search_vector"
+down_revision = "20261024_create_jobs_and_cluster_runs"
+branch_labels = None
+depends_on = None
+
+# A stored generated column is recomputed by PostgreSQL on every insert and update, so
+# ingest keeps it current without touching application code. DTC lists are
+# comma-separated; commas become spaces so each code is its own lexeme. The text search
+# configuration must match search_service.TEXT_SEARCH_CONFIG.
+SEARCH_DOCUMENT = (
+    "to_tsvector('english', "
+    "coalesce(symptom_text, '') || ' ' || "
+    "coalesce(repair_action, '') || ' ' || "
+    "replace(coalesce(dtc_codes, ''), ',', ' ') || ' ' || "
+    "coalesce(part_number, ''))"
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        # Other databases fall back to substring matching in search_service.
+        return
+    op.add_column(
+        "claims",
+        sa.Column("search_vector", TSVECTOR(), sa.Computed(SEARCH_DOCUMENT, persisted=True), nullable=True),
+    )
+    op.create_index("ix_claims_search_vector", "claims", ["search_vector"], unique=False, postgresql_using="gin")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_claims_search_vector", table_name="claims")
+    op.drop_column("claims", "search_vector")
@@ -0,0 +1,48 @@
+"""Add near-duplicate links, MinHash signatures and claim_lsh_buckets
+
+Revision ID: 20261026_add_claim_duplicates
+Revises: 20261025_add_claim_search_vector
+Create Date: 2026-10-26 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261026_add_claim_duplicates"
+down_revision = "20261025_add_claim_search_vector"
+branch_labels = None
+depends_on = None
+
+# Existing claims are indexed afterwards with ``python -m app.dedup_claims``: matching
+# needs the candidate lookups of dedup_service, not just a per-row backfill.
+
+
+def upgrade() -> None:
+    op.add_column("claims", sa.Column("duplicate_of_id", sa.Integer(), nullable=True))
+    op.add_column("claims", sa.Column("duplicate_similarity", sa.Float(), nullable=True))
+    op.add_column("claims", sa.Column("minhash", sa.LargeBinary(), nullable=True))
+    op.create_foreign_key(
+        "fk_claims_duplicate_of_id_claims", "claims", "claims", ["duplicate_of_id"], ["id"], ondelete="SET NULL"
+    )
+    op.create_index("ix_claims_duplicate_of_id", "claims", ["duplicate_of_id"], unique=False)
+
+    op.create_table(
+        "claim_lsh_buckets",
+        sa.Column("band", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+        sa.Column("claim_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["claim_id"], ["claims.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("band", "bucket", "claim_id"),
+    )
+    op.create_index("ix_claim_lsh_buckets_claim_id", "claim_lsh_buckets", ["claim_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_claim_lsh_buckets_claim_id", table_name="claim_lsh_buckets")
+    op.drop_table("claim_lsh_buckets")
+    op.drop_index("ix_claims_duplicate_of_id", table_name="claims")
+    op.drop_constraint("fk_claims_duplicate_of_id_claims", "claims", type_="foreignkey")
+    op.drop_column("claims", "minhash")
+    op.drop_column("claims", "duplicate_similarity")
+    op.drop_column("claims", "duplicate_of_id")
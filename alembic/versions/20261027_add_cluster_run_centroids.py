@@ -0,0 +1,31 @@
+"""Store KMeans centroids and convergence stats on cluster_runs
+
+Revision ID: 20261027_add_cluster_run_centroids
+Revises: 20261026_add_claim_duplicates
+Create Date: 2026-10-27 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261027_add_cluster_run_centroids"
+down_revision = "20261026_add_claim_duplicates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("cluster_runs", sa.Column("centroids", sa.LargeBinary(), nullable=True))
+    op.add_column("cluster_runs", sa.Column("warm_started", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column("cluster_runs", sa.Column("reseeded_centroids", sa.Integer(), nullable=True))
+    op.add_column("cluster_runs", sa.Column("kmeans_iterations", sa.Integer(), nullable=True))
+    op.add_column("cluster_runs", sa.Column("kmeans_seconds", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("cluster_runs", "kmeans_seconds")
+    op.drop_column("cluster_runs", "kmeans_iterations")
+    op.drop_column("cluster_runs", "reseeded_centroids")
+    op.drop_column("cluster_runs", "warm_started")
+    op.drop_column("cluster_runs", "centroids")
@@ -0,0 +1,29 @@
+"""Tag clusters with their segment and record run segmentation
+
+Revision ID: 20261028_add_cluster_segments
+Revises: 20261027_add_cluster_run_centroids
+Create Date: 2026-10-28 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261028_add_cluster_segments"
+down_revision = "20261027_add_cluster_run_centroids"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("clusters", sa.Column("segment", sa.String(length=255), nullable=True))
+    op.create_index("ix_clusters_segment", "clusters", ["segment"], unique=False)
+    op.add_column("cluster_runs", sa.Column("segment_by", sa.String(length=32), nullable=True))
+    op.add_column("cluster_runs", sa.Column("centroid_segments", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("cluster_runs", "centroid_segments")
+    op.drop_column("cluster_runs", "segment_by")
+    op.drop_index("ix_clusters_segment", table_name="clusters")
+    op.drop_column("clusters", "segment")
@@ -0,0 +1,33 @@
+"""Add the parent/child cluster tree
+
+Revision ID: 20261029_add_cluster_hierarchy
+Revises: 20261028_add_cluster_segments
+Create Date: 2026-10-29 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261029_add_cluster_hierarchy"
+down_revision = "20261028_add_cluster_segments"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("clusters", sa.Column("level", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("clusters", sa.Column("parent_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_clusters_parent_id_clusters", "clusters", "clusters", ["parent_id"], ["id"], ondelete="CASCADE"
+    )
+    op.create_index("ix_clusters_level", "clusters", ["level"], unique=False)
+    op.create_index("ix_clusters_parent_id", "clusters", ["parent_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_clusters_parent_id", table_name="clusters")
+    op.drop_index("ix_clusters_level", table_name="clusters")
+    op.drop_constraint("fk_clusters_parent_id_clusters", "clusters", type_="foreignkey")
+    op.drop_column("clusters", "parent_id")
+    op.drop_column("clusters", "level")
@@ -0,0 +1,35 @@
+"""Add claim outlier scores and the leaf centroids they are computed against
+
+Revision ID: 20261030_add_claim_outlier_scores
+Revises: 20261029_add_cluster_hierarchy
+Create Date: 2026-10-30 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261030_add_claim_outlier_scores"
+down_revision = "20261029_add_cluster_hierarchy"
+branch_labels = None
+depends_on = None
+
+# Scores are filled in by the next clustering run.
+
+
+def upgrade() -> None:
+    op.add_column("claims", sa.Column("centroid_distance", sa.Float(), nullable=True))
+    op.add_column("claims", sa.Column("outlier_score", sa.Float(), nullable=True))
+    op.create_index("ix_claims_outlier_score", "claims", ["outlier_score"], unique=False)
+    op.add_column("clusters", sa.Column("centroid", sa.LargeBinary(), nullable=True))
+    op.add_column("clusters", sa.Column("distance_median", sa.Float(), nullable=True))
+    op.add_column("clusters", sa.Column("distance_scale", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("clusters", "distance_scale")
+    op.drop_column("clusters", "distance_median")
+    op.drop_column("clusters", "centroid")
+    op.drop_index("ix_claims_outlier_score", table_name="claims")
+    op.drop_column("claims", "outlier_score")
+    op.drop_column("claims", "centroid_distance")
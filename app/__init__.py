@@ -1,3 +1,10 @@
-from .main import app
-
 __all__ = ["app"]
+
+
+def __getattr__(name: str):
+    # Imported lazily so that ``import app.worker`` and friends don't build the whole API.
+    if name == "app":
+        from .main import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,26 +1,114 @@
 from functools import lru_cache
 from typing import Annotated, Literal, Optional
 
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     app_name: str = Field("Warranty Intelligence Copilot", env="APP_NAME")
     env: Literal["dev", "prod"] = Field("dev", env="ENV")
+    api_role: Literal["full", "read"] = Field("full", env="API_ROLE")
     database_url: str = Field(
         "postgresql+psycopg2://postgres:postgres@db:5432/warrantrix", env="DATABASE_URL"
     )
+    read_database_url: Optional[str] = Field(None, env="READ_DATABASE_URL")
+    replica_max_lag_seconds: float = Field(5.0, env="REPLICA_MAX_LAG_SECONDS")
+    replica_lag_check_interval_seconds: float = Field(10.0, env="REPLICA_LAG_CHECK_INTERVAL_SECONDS")
+    read_your_writes_seconds: float = Field(10.0, env="READ_YOUR_WRITES_SECONDS")
+    db_pool_size: int = Field(10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(20, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30.0, env="DB_POOL_TIMEOUT")
+    db_pool_pre_ping: bool = Field(True, env="DB_POOL_PRE_PING")
+    db_pool_recycle: int = Field(1800, env="DB_POOL_RECYCLE")
+    db_statement_timeout_ms: int = Field(30000, env="DB_STATEMENT_TIMEOUT_MS")
+    slow_query_threshold_ms: float = Field(500.0, env="SLOW_QUERY_THRESHOLD_MS")
+    slow_query_explain: bool = Field(True, env="SLOW_QUERY_EXPLAIN")
+    query_profile_top_n: int = Field(5, env="QUERY_PROFILE_TOP_N")
     jwt_secret_key: str = Field("supersecret", env="JWT_SECRET_KEY")
     jwt_algorithm: str = Field("HS256", env="JWT_ALGORITHM")
+    auth_user_cache_ttl_seconds: float = Field(60.0, env="AUTH_USER_CACHE_TTL_SECONDS")
+    auth_user_cache_max_entries: int = Field(10000, env="AUTH_USER_CACHE_MAX_ENTRIES")
+    bcrypt_rounds: int = Field(12, env="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(4, env="PASSWORD_HASH_WORKERS")
+    password_hash_queue_size: int = Field(32, env="PASSWORD_HASH_QUEUE_SIZE")
+    login_throttle_window_seconds: float = Field(300.0, env="LOGIN_THROTTLE_WINDOW_SECONDS")
+    login_max_failures_per_account: int = Field(5, env="LOGIN_MAX_FAILURES_PER_ACCOUNT")
+    login_max_failures_per_ip: int = Field(20, env="LOGIN_MAX_FAILURES_PER_IP")
+    login_throttle_max_keys: int = Field(100_000, env="LOGIN_THROTTLE_MAX_KEYS")
     openai_api_key: Optional[str] = Field(None, env="OPENAI_API_KEY")
     openai_embedding_model: str = Field("text-embedding-3-small", env="OPENAI_EMBEDDING_MODEL")
     openai_completion_model: str = Field("gpt-4o-mini", env="OPENAI_COMPLETION_MODEL")
+    vector_backend: Literal["qdrant", "local"] = Field("qdrant", env="VECTOR_BACKEND")
+    local_vector_path: str = Field("./data/vectors", env="LOCAL_VECTOR_PATH")
+    local_vector_ivf_min_points: int = Field(50000, env="LOCAL_VECTOR_IVF_MIN_POINTS")
+    local_vector_ivf_lists: int = Field(0, env="LOCAL_VECTOR_IVF_LISTS")
+    local_vector_ivf_probes: int = Field(8, env="LOCAL_VECTOR_IVF_PROBES")
     qdrant_url: str = Field("http://qdrant:6333", env="QDRANT_URL")
     qdrant_api_key: Optional[str] = Field(None, env="QDRANT_API_KEY")
+    qdrant_quantization: Literal["none", "scalar", "binary"] = Field("none", env="QDRANT_QUANTIZATION")
+    qdrant_quantization_always_ram: bool = Field(True, env="QDRANT_QUANTIZATION_ALWAYS_RAM")
+    qdrant_scalar_quantile: float = Field(0.99, env="QDRANT_SCALAR_QUANTILE")
+    qdrant_search_rescore: bool = Field(True, env="QDRANT_SEARCH_RESCORE")
+    qdrant_search_oversampling: float = Field(2.0, env="QDRANT_SEARCH_OVERSAMPLING")
+    qdrant_on_disk_vectors: bool = Field(False, env="QDRANT_ON_DISK_VECTORS")
+    qdrant_on_disk_payload: bool = Field(False, env="QDRANT_ON_DISK_PAYLOAD")
+    qdrant_hnsw_m: int = Field(16, env="QDRANT_HNSW_M")
+    qdrant_hnsw_ef_construct: int = Field(100, env="QDRANT_HNSW_EF_CONSTRUCT")
+    qdrant_hnsw_ef: Optional[int] = Field(None, env="QDRANT_HNSW_EF")
+    qdrant_payload_fields: Annotated[list[str], NoDecode] = Field(
+        default_factory=lambda: ["model", "model_year", "region", "component", "failure_date", "cluster_id"],
+        env="QDRANT_PAYLOAD_FIELDS",
+    )
     embedding_batch_size: int = Field(64, env="EMBEDDING_BATCH_SIZE")
+    embedding_provider: Literal["openai", "fake"] = Field("openai", env="EMBEDDING_PROVIDER")
+    embedding_dim: int = Field(1536, env="EMBEDDING_DIM")
     clustering_min_claims: int = Field(50, env="CLUSTERING_MIN_CLAIMS")
     num_clusters_default: int = Field(10, env="NUM_CLUSTERS_DEFAULT")
+    clustering_segment_by: Optional[Literal["model", "model_year", "region", "component"]] = Field(
+        None, env="CLUSTERING_SEGMENT_BY"
+    )
+    clustering_workers: int = Field(0, env="CLUSTERING_WORKERS")
+    job_poll_interval_seconds: float = Field(5.0, env="JOB_POLL_INTERVAL_SECONDS")
+    job_heartbeat_interval_seconds: float = Field(30.0, env="JOB_HEARTBEAT_INTERVAL_SECONDS")
+    job_stale_after_seconds: float = Field(300.0, env="JOB_STALE_AFTER_SECONDS")
+    job_max_attempts: int = Field(3, env="JOB_MAX_ATTEMPTS")
+    scheduler_enabled: bool = Field(False, env="SCHEDULER_ENABLED")
+    scheduler_interval_seconds: float = Field(60.0, env="SCHEDULER_INTERVAL_SECONDS")
+    scheduler_embed_batch_size: int = Field(64, env="SCHEDULER_EMBED_BATCH_SIZE")
+    scheduler_embed_concurrency: int = Field(2, env="SCHEDULER_EMBED_CONCURRENCY")
+    scheduler_recluster_min_new_claims: int = Field(500, env="SCHEDULER_RECLUSTER_MIN_NEW_CLAIMS")
+    scheduler_recluster_max_interval_seconds: float = Field(86400.0, env="SCHEDULER_RECLUSTER_MAX_INTERVAL_SECONDS")
+    cluster_warm_start: bool = Field(True, env="CLUSTER_WARM_START")
+    cluster_reseed_distance_factor: float = Field(2.0, env="CLUSTER_RESEED_DISTANCE_FACTOR")
+    cluster_assign_on_embed: bool = Field(True, env="CLUSTER_ASSIGN_ON_EMBED")
+    cluster_hierarchy: bool = Field(False, env="CLUSTER_HIERARCHY")
+    cluster_hierarchy_branching: int = Field(4, env="CLUSTER_HIERARCHY_BRANCHING")
+    cluster_representatives_k: int = Field(5, env="CLUSTER_REPRESENTATIVES_K")
+    cluster_cost_histogram_bins: int = Field(10, env="CLUSTER_COST_HISTOGRAM_BINS")
+    export_batch_size: int = Field(2000, env="EXPORT_BATCH_SIZE")
+    export_compression_level: int = Field(6, env="EXPORT_COMPRESSION_LEVEL")
+    gzip_minimum_size: int = Field(1024, env="GZIP_MINIMUM_SIZE")
+    gzip_compression_level: int = Field(6, env="GZIP_COMPRESSION_LEVEL")
+    trend_extract_batch_size: int = Field(5000, env="TREND_EXTRACT_BATCH_SIZE")
+    trend_rolling_weeks: int = Field(4, env="TREND_ROLLING_WEEKS")
+    trend_baseline_weeks: int = Field(8, env="TREND_BASELINE_WEEKS")
+    trend_spike_rule: Literal["ewma", "shewhart"] = Field("ewma", env="TREND_SPIKE_RULE")
+    trend_ewma_alpha: float = Field(0.3, env="TREND_EWMA_ALPHA")
+    trend_control_limit_sigma: float = Field(3.0, env="TREND_CONTROL_LIMIT_SIGMA")
+    trend_min_spike_claims: int = Field(3, env="TREND_MIN_SPIKE_CLAIMS")
+    geohash_precision: int = Field(7, ge=1, le=12, env="GEOHASH_PRECISION")
+    hotspot_geohash_precision: int = Field(5, ge=1, le=12, env="HOTSPOT_GEOHASH_PRECISION")
+    hotspot_min_claims: int = Field(5, env="HOTSPOT_MIN_CLAIMS")
+    hotspot_z_threshold: float = Field(3.0, env="HOTSPOT_Z_THRESHOLD")
+    search_candidates: int = Field(100, env="SEARCH_CANDIDATES")
+    search_rrf_k: int = Field(60, env="SEARCH_RRF_K")
+    dedup_enabled: bool = Field(True, env="DEDUP_ENABLED")
+    dedup_skip_duplicates: bool = Field(True, env="DEDUP_SKIP_DUPLICATES")
+    dedup_threshold: float = Field(0.8, env="DEDUP_THRESHOLD")
+    dedup_num_perm: int = Field(128, env="DEDUP_NUM_PERM")
+    dedup_bands: int = Field(16, env="DEDUP_BANDS")
+    dedup_shingle_size: int = Field(5, env="DEDUP_SHINGLE_SIZE")
     cors_origins: Annotated[list[str], NoDecode] = Field(
         default_factory=lambda: [
             "http://localhost:5173",
@@ -56,6 +144,19 @@ class Settings(BaseSettings):
 
         return value
 
+    @field_validator("qdrant_payload_fields", mode="before")
+    def parse_payload_fields(cls, value):
+        if isinstance(value, str):
+            return [field.strip() for field in value.split(",") if field.strip()]
+        return value
+
+    @model_validator(mode="after")
+    def check_geohash_precisions(self):
+        # Hotspot cells are prefixes of the stored claim geohashes.
+        if self.hotspot_geohash_precision > self.geohash_precision:
+            raise ValueError("HOTSPOT_GEOHASH_PRECISION must not exceed GEOHASH_PRECISION")
+        return self
+
 
 @lru_cache()
 def get_settings() -> Settings:
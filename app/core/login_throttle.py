@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from ..config import settings
+
+
+class LoginThrottle:
+    """Sliding-window counter of failed logins per account and per client IP.
+
+    State lives in process memory, so with several workers each one enforces the
+    limits on the traffic it sees. Keys are kept in order of their latest failure:
+    every recorded failure evicts the keys whose window has passed, and beyond
+    ``max_keys`` the least recently failing ones, so spraying made-up emails cannot
+    grow it without bound.
+    """
+
+    def __init__(self, window_seconds: float, max_per_account: int, max_per_ip: int, max_keys: int = 100_000) -> None:
+        self.window_seconds = window_seconds
+        self.max_per_account = max_per_account
+        self.max_per_ip = max_per_ip
+        self.max_keys = max_keys
+        self._failures: OrderedDict[str, deque[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._failures)
+
+    def _prune(self, key: str, now: float) -> deque[float]:
+        failures = self._failures.get(key)
+        if failures is None:
+            return deque()
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+        return failures
+
+    def _record(self, key: str, now: float) -> None:
+        failures = self._failures.get(key)
+        if failures is None:
+            failures = self._failures[key] = deque()
+        else:
+            self._failures.move_to_end(key)
+        failures.append(now)
+
+    def _evict(self, now: float) -> None:
+        # The first key has the oldest latest failure; once that is out of the window,
+        # so is everything else it recorded.
+        while self._failures:
+            key, failures = next(iter(self._failures.items()))
+            if failures[-1] > now - self.window_seconds and len(self._failures) <= max(1, self.max_keys):
+                break
+            del self._failures[key]
+
+    def retry_after(self, account: str, ip: str | None) -> float:
+        """Seconds until another attempt is allowed, or 0 when it is allowed now."""
+
+        now = time.monotonic()
+        limits = [(f"account:{account}", self.max_per_account)]
+        if ip:
+            limits.append((f"ip:{ip}", self.max_per_ip))
+
+        wait = 0.0
+        with self._lock:
+            for key, limit in limits:
+                failures = self._prune(key, now)
+                if limit > 0 and len(failures) >= limit:
+                    wait = max(wait, failures[len(failures) - limit] + self.window_seconds - now)
+        return wait
+
+    def record_failure(self, account: str, ip: str | None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._record(f"account:{account}", now)
+            if ip:
+                self._record(f"ip:{ip}", now)
+            self._evict(now)
+
+    def reset(self, account: str) -> None:
+        with self._lock:
+            self._failures.pop(f"account:{account}", None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._failures.clear()
+
+
+login_throttle = LoginThrottle(
+    settings.login_throttle_window_seconds,
+    settings.login_max_failures_per_account,
+    settings.login_max_failures_per_ip,
+    settings.login_throttle_max_keys,
+)
@@ -0,0 +1,114 @@
+"""Prometheus metrics shared by the API, the worker and the scheduler.
+
+With several worker processes, point ``PROMETHEUS_MULTIPROC_DIR`` at a shared, empty
+directory so ``/metrics`` aggregates every process.
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+T = TypeVar("T")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STAGE_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "warrantrix_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "warrantrix_db_query_duration_seconds",
+    "SQL statement execution time by statement type.",
+    ("operation",),
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_CALL_DURATION = Histogram(
+    "warrantrix_external_call_duration_seconds",
+    "Latency of calls to Qdrant and OpenAI.",
+    ("service", "operation", "outcome"),
+    buckets=LATENCY_BUCKETS,
+)
+PIPELINE_STAGE_DURATION = Histogram(
+    "warrantrix_pipeline_stage_duration_seconds",
+    "Time spent in each stage of the embedding, clustering and AI reasoning pipelines.",
+    ("pipeline", "stage"),
+    buckets=STAGE_BUCKETS,
+)
+INGEST_ROWS = Counter("warrantrix_ingest_rows_total", "CSV rows seen by ingest.", ("outcome",))
+CLAIMS_EMBEDDED = Counter("warrantrix_claims_embedded_total", "Claims embedded and written to the vector store.")
+CLUSTERS_CREATED = Counter("warrantrix_clusters_created_total", "Clusters created by clustering runs.")
+
+
+@contextmanager
+def stage_timer(pipeline: str, stage: str) -> Iterator[None]:
+    with PIPELINE_STAGE_DURATION.labels(pipeline, stage).time():
+        yield
+
+
+@contextmanager
+def external_call(service: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_DURATION.labels(service, operation, outcome).observe(time.perf_counter() - started)
+
+
+def timed_external_call(service: str, operation: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs) -> T:
+            with external_call(service, operation):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _statement_operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[:1]
+    return keyword[0].upper() if keyword else "OTHER"
+
+
+# Listening on the Engine class covers every engine, including the ones behind the
+# asyncio engines and those created by tests.
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _observe_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started_at"].pop()
+    DB_QUERY_DURATION.labels(_statement_operation(statement)).observe(time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_query(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Exposition of all metrics, aggregated across processes in multiprocess mode."""
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,146 @@
+"""Per-request SQL profiling and the slow-query log.
+
+Admins send ``X-Profile-Queries: 1`` to get the statement count, total database time
+and the slowest statements of that request back in a ``Server-Timing`` header.
+Independently, every statement slower than ``slow_query_threshold_ms`` is logged to
+the ``app.slow_query`` logger as one JSON object, with its parameters and plan.
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+SLOW_QUERY_LOGGER = logging.getLogger("app.slow_query")
+
+PROFILE_HEADER = "X-Profile-Queries"
+PARAMETER_REPR_LIMIT = 200
+STATEMENT_DESC_LIMIT = 120
+EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+EXPLAIN_SAVEPOINT = "profiling_explain"
+
+
+@dataclass
+class StatementTiming:
+    statement: str
+    duration_ms: float
+
+
+@dataclass
+class QueryProfile:
+    top_n: int
+    count: int = 0
+    total_ms: float = 0.0
+    slowest: list[StatementTiming] = field(default_factory=list)
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.slowest.append(StatementTiming(statement, duration_ms))
+        self.slowest.sort(key=lambda timing: timing.duration_ms, reverse=True)
+        del self.slowest[self.top_n :]
+
+
+_current_profile: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+
+
+@contextmanager
+def profile_queries(top_n: int) -> Iterator[QueryProfile]:
+    """Collect every statement executed in this context (and threads spawned from it)."""
+
+    profile = QueryProfile(top_n=top_n)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def _quote(value: str) -> str:
+    return '"' + " ".join(value.split()).replace("\\", "").replace('"', "'") + '"'
+
+
+def server_timing(profile: QueryProfile) -> str:
+    """Render ``profile`` as a Server-Timing header value."""
+
+    entries = [f"db;dur={profile.total_ms:.2f};desc={_quote(f'{profile.count} statements')}"]
+    for index, timing in enumerate(profile.slowest, start=1):
+        entries.append(
+            f"db-{index};dur={timing.duration_ms:.2f};desc={_quote(timing.statement[:STATEMENT_DESC_LIMIT])}"
+        )
+    return ", ".join(entries)
+
+
+def _parameters_for_log(parameters) -> object:
+    if isinstance(parameters, dict):
+        return {key: repr(value)[:PARAMETER_REPR_LIMIT] for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [repr(value)[:PARAMETER_REPR_LIMIT] for value in parameters]
+    return repr(parameters)[:PARAMETER_REPR_LIMIT]
+
+
+def _explain(conn, statement: str, parameters) -> list[str] | None:
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    # A raw DBAPI cursor keeps the EXPLAIN itself out of the engine events (and this log).
+    # It runs inside the request's transaction, where a failed statement would abort
+    # everything after it on PostgreSQL, so it gets a savepoint of its own.
+    savepoint = conn.in_transaction()
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+        except Exception as exc:  # depends on the statement and driver
+            if savepoint:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            return [f"EXPLAIN failed: {exc}"]
+        finally:
+            if savepoint:
+                cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("profile_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration_ms = (time.perf_counter() - conn.info["profile_started_at"].pop()) * 1000
+
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(statement, duration_ms)
+
+    if duration_ms < settings.slow_query_threshold_ms:
+        return
+    entry = {
+        "event": "slow_query",
+        "duration_ms": round(duration_ms, 2),
+        "statement": statement,
+        "parameters": "<executemany>" if executemany else _parameters_for_log(parameters),
+    }
+    if settings.slow_query_explain and not executemany:
+        entry["plan"] = _explain(conn, statement, parameters)
+    SLOW_QUERY_LOGGER.warning(json.dumps(entry, default=str))
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_statement(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("profile_started_at"):
+        connection.info["profile_started_at"].pop()
@@ -0,0 +1,46 @@
+"""Serialize list endpoints straight from row tuples.
+
+Building a Pydantic model per ORM row and letting FastAPI validate it again through
+``response_model`` costs more than the query on a page of claims. The list endpoints
+select exactly the columns of their read schema and hand the rows to ``RowsResponse``,
+which encodes them once with orjson. The read schemas stay the response models, so the
+OpenAPI document and the JSON shape do not change.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    # Pydantic writes Decimal as a string in JSON mode; keep the wire format identical.
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def schema_columns(schema: type[BaseModel], model) -> tuple:
+    """The ORM columns backing ``schema``'s fields, in the schema's field order."""
+
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+def rows_as_dicts(schema: type[BaseModel], rows: Iterable[Sequence]) -> list[dict]:
+    fields = tuple(schema.model_fields)
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class RowsResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,6 +1,9 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from hashlib import sha256
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, TypeVar
 
 import bcrypt
 from jose import jwt
@@ -11,6 +14,12 @@ from ..config import settings
 PASSWORD_MIN_LENGTH = 8
 PASSWORD_MAX_LENGTH = 128
 
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when every bcrypt worker is busy and the wait queue is full."""
+
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -33,4 +42,33 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     prepared = _prepare_password(password).encode("utf-8")
-    return bcrypt.hashpw(prepared, bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(prepared, bcrypt.gensalt(rounds=settings.bcrypt_rounds)).decode("utf-8")
+
+
+class PasswordHasher:
+    """Runs bcrypt on its own small thread pool so it never competes with request threads.
+
+    At most ``workers`` hashes run at once and ``queue_size`` more may wait; anything
+    beyond that is rejected immediately instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max(1, workers) + max(0, queue_size))
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Password hashing queue is full")
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_queue_size)
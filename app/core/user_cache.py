@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+
+from ..config import settings
+from ..models import User
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Detached, read-only snapshot of the columns an authenticated request needs."""
+
+    id: int
+    email: str
+    name: str
+    role: str
+    token_version: int
+    created_at: datetime | None
+    last_login: datetime | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            token_version=user.token_version or 0,
+            created_at=user.created_at,
+            last_login=user.last_login,
+        )
+
+
+class UserCache:
+    """Thread-safe LRU of user snapshots whose entries expire after ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[float, CachedUser]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> CachedUser | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user: CachedUser) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.auth_user_cache_ttl_seconds, settings.auth_user_cache_max_entries)
+
+CREDENTIAL_COLUMNS = ("role", "password_hash")
+
+
+@event.listens_for(User, "before_update")
+def _revoke_tokens_on_credential_change(mapper, connection, target: User) -> None:
+    # Bumping the version rejects every token issued before the change. Other worker
+    # processes keep their snapshot until it expires, so there it takes at most the TTL.
+    state = inspect(target)
+    if any(state.attrs[column].history.has_changes() for column in CREDENTIAL_COLUMNS):
+        target.token_version = (target.token_version or 0) + 1
+        user_cache.invalidate(target.id)
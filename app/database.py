@@ -1,20 +1,210 @@
-from sqlalchemy import create_engine
+import logging
+import time
+from functools import cache
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
-from .config import settings
+from .config import Settings, settings
+
+LOGGER = logging.getLogger(__name__)
+
+READ_YOUR_WRITES_COOKIE = "wx_primary_until"
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+
+# A primary, or a streaming replica that has replayed everything it received, has no
+# lag; otherwise the lag is the age of the last replayed transaction.
+REPLICATION_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(settings.database_url, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+def to_async_url(database_url: str) -> str:
+    """Swap the sync driver of ``database_url`` for its asyncio counterpart."""
+
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def engine_options(database_url: str, settings: Settings, *, is_async: bool = False) -> dict:
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    if settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+# Engines are built on first use rather than at import, so importing the models (or a
+# CLI that never touches the database) does not load and configure both DB drivers.
+@cache
+def get_engine():
+    return create_engine(settings.database_url, future=True, **engine_options(settings.database_url, settings))
+
+
+@cache
+def get_session_factory() -> sessionmaker:
+    return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, future=True)
+
+
+@cache
+def get_async_engine():
+    return create_async_engine(
+        to_async_url(settings.database_url),
+        **engine_options(settings.database_url, settings, is_async=True),
+    )
+
+
+@cache
+def get_async_session_factory() -> async_sessionmaker:
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+class ReadSessionRouter:
+    """Chooses between the primary and the read replica for read-only requests.
+
+    The replica's lag is probed at most once per ``check_interval_seconds``; while it is
+    above ``max_lag_seconds`` or the probe fails, reads fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica: async_sessionmaker | None,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._checked_at: float | None = None
+        self._replica_usable = replica is not None
+
+    @property
+    def has_replica(self) -> bool:
+        return self.replica is not None
+
+    async def _probe_replica(self) -> bool:
+        try:
+            async with self.replica() as db:
+                if db.bind.dialect.name != "postgresql":
+                    return True
+                lag = float((await db.execute(REPLICATION_LAG_SQL)).scalar_one() or 0)
+        except Exception as exc:  # pragma: no cover - depends on replica availability
+            LOGGER.warning("Read replica unavailable; routing reads to the primary: %s", exc)
+            return False
+
+        if lag > self.max_lag_seconds:
+            LOGGER.warning(
+                "Read replica lag %.1fs exceeds %.1fs; routing reads to the primary",
+                lag,
+                self.max_lag_seconds,
+            )
+            return False
+        return True
+
+    async def session_factory(self, prefer_primary: bool = False) -> async_sessionmaker:
+        if prefer_primary or self.replica is None:
+            return self.primary
+
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval_seconds:
+            self._checked_at = now
+            self._replica_usable = await self._probe_replica()
+        return self.replica if self._replica_usable else self.primary
+
+
+@cache
+def get_read_router() -> ReadSessionRouter:
+    replica = None
+    if settings.read_database_url:
+        read_engine = create_async_engine(
+            to_async_url(settings.read_database_url),
+            **engine_options(settings.read_database_url, settings, is_async=True),
+        )
+        replica = async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+    return ReadSessionRouter(
+        get_async_session_factory(),
+        replica,
+        max_lag_seconds=settings.replica_max_lag_seconds,
+        check_interval_seconds=settings.replica_lag_check_interval_seconds,
+    )
+
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "SessionLocal": get_session_factory,
+    "async_engine": get_async_engine,
+    "AsyncSessionLocal": get_async_session_factory,
+    "read_router": get_read_router,
+}
+
+
+def __getattr__(name: str):
+    # Keeps ``database.SessionLocal`` and friends working for existing callers.
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def wants_primary(request: Request) -> bool:
+    """Whether a read must see the primary: explicitly requested, or a recent write pinned it."""
+
+    if request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, "")) > time.time()
+    except ValueError:
+        return False
 
 
 def get_db():
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    factory = await get_read_router().session_factory(prefer_primary=wants_primary(request))
+    async with factory() as db:
+        yield db
@@ -0,0 +1,33 @@
+"""Compute MinHash signatures for claims ingested before near-duplicate detection.
+
+Indexes every claim that has no signature yet, oldest first::
+
+    python -m app.dedup_claims
+
+Pass ``--rebuild`` after changing DEDUP_NUM_PERM, DEDUP_BANDS or DEDUP_SHINGLE_SIZE to
+drop every signature and link and index all claims again.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from .config import get_settings
+from .core.logging import setup_logging
+from .database import get_session_factory
+from .services.dedup_service import reindex_claims
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Index claims for near-duplicate detection.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Claims indexed per transaction")
+    parser.add_argument("--rebuild", action="store_true", help="Drop all signatures and links first")
+    args = parser.parse_args()
+
+    setup_logging()
+    with get_session_factory()() as db:
+        print(reindex_claims(db, get_settings(), batch_size=args.batch_size, rebuild=args.rebuild))
+
+
+if __name__ == "__main__":
+    main()
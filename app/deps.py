@@ -1,51 +1,106 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
 from .config import settings
+from .core.user_cache import CachedUser, user_cache
 from .database import get_db as _get_db
+from .database import get_session_factory as _get_session_factory
 from .models import User
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+ADMIN_ROLE = "admin"
 
 
 def get_db() -> Session:
     yield from _get_db()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def get_session_factory() -> sessionmaker:
+    return _get_session_factory()
+
+
+def decode_token(token: str) -> dict:
+    return jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+
+
+def is_admin_request(request: Request) -> bool:
+    """Whether the request carries a current bearer token of a user who is an admin now.
+
+    The role comes from the user snapshot, not the token's claims, so demoted users and
+    revoked tokens are refused like in :func:`get_current_user`. Runs in middleware,
+    outside dependency injection, so overrides of :func:`get_session_factory` are looked
+    up by hand.
+    """
 
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
     try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm],
-        )
-    except JWTError as exc:
-        raise credentials_exception from exc
+        payload = decode_token(token)
+    except JWTError:
+        return False
+    session_factory = request.app.dependency_overrides.get(get_session_factory, get_session_factory)()
+    user = _resolve_user(payload, session_factory)
+    return user is not None and user.role == ADMIN_ROLE
 
-    user_id = payload.get("user_id")
-    email = payload.get("sub")
-    if user_id is None and email is None:
-        raise credentials_exception
 
+def _load_user(db: Session, user_id: int | None, email: str | None) -> User | None:
     query = db.query(User)
     user: User | None = None
     if user_id is not None:
         user = query.filter(User.id == user_id).first()
     if user is None and email is not None:
         user = query.filter(User.email == email).first()
+    return user
+
+
+def _resolve_user(payload: dict, session_factory: sessionmaker) -> CachedUser | None:
+    """The snapshot of the user a decoded token belongs to, or None if it is not valid.
+
+    Tokens carry the user's id, role and token version, so a cached snapshot with a
+    matching version answers without a database session; only a miss opens one.
+    """
 
+    user_id = payload.get("user_id")
+    email = payload.get("sub")
+    if user_id is None and email is None:
+        return None
+    token_version = payload.get("ver", 0)
+
+    if user_id is not None:
+        cached = user_cache.get(user_id)
+        if cached is not None and cached.token_version == token_version:
+            return cached
+
+    with session_factory() as db:
+        user = _load_user(db, user_id, email)
+        if user is None or (user.token_version or 0) != token_version:
+            return None
+        snapshot = CachedUser.from_user(user)
+    user_cache.put(snapshot)
+    return snapshot
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), session_factory: sessionmaker = Depends(get_session_factory)
+) -> CachedUser:
+    """Resolve the bearer token to a user snapshot (see :func:`_resolve_user`)."""
+
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    try:
+        payload = decode_token(token)
+    except JWTError as exc:
+        raise credentials_exception from exc
+
+    user = _resolve_user(payload, session_factory)
     if user is None:
         raise credentials_exception
-
     return user
@@ -1,16 +1,44 @@
-from fastapi import FastAPI
+import math
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
 
+from . import database
 from .config import settings
 from .core.logging import setup_logging
-from .routers import admin, analytics, auth, claims, clusters, ingest
+from .core.metrics import HTTP_REQUEST_DURATION, render_latest
+from .core.profiling import PROFILE_HEADER, profile_queries, server_timing
+from .deps import is_admin_request
+from .routers import analytics, auth, claims, clusters
+from .services.export_service import EXPORT_MEDIA_TYPES
 
 setup_logging()
 
 API_PREFIX = "/api/v1"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler = None
+    if settings.scheduler_enabled and settings.api_role == "full":
+        from .services.scheduler_service import PipelineScheduler
 
+        scheduler = PipelineScheduler(database.get_session_factory(), settings)
+        scheduler.start()
+    try:
+        yield
+    finally:
+        if scheduler is not None:
+            scheduler.stop(timeout=settings.scheduler_interval_seconds)
 
-app = FastAPI(title=settings.app_name, version="0.1.0")
+
+app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
 
 cors_origins = settings.cors_origins or ["*"]
 allow_credentials = "*" not in cors_origins
@@ -22,15 +50,96 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Gzipped exports and Parquet files are compressed already; don't pay for it twice.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_compression_level,
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + (EXPORT_MEDIA_TYPES["parquet"],),
+)
+
+
+def _route_template(scope: dict) -> str:
+    # Routers included with a prefix report their own, unprefixed path on the matched route;
+    # FastAPI records the full template on the effective route context.
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    route = effective or scope.get("route")
+    return getattr(route, "path", "<unmatched>")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, so ids in the URL don't explode cardinality.
+        HTTP_REQUEST_DURATION.labels(
+            request.method,
+            _route_template(request.scope),
+            str(status_code),
+        ).observe(time.perf_counter() - started)
+
+
+@app.middleware("http")
+async def profile_request_queries(request: Request, call_next):
+    """Report the request's SQL statements in Server-Timing when an admin asks for it."""
+
+    # A cache miss in is_admin_request queries the database; keep it off the event loop.
+    if request.headers.get(PROFILE_HEADER) != "1" or not await run_in_threadpool(is_admin_request, request):
+        return await call_next(request)
+
+    started = time.perf_counter()
+    with profile_queries(settings.query_profile_top_n) as profile:
+        response = await call_next(request)
+    total_ms = (time.perf_counter() - started) * 1000
+    response.headers["Server-Timing"] = f"{server_timing(profile)}, total;dur={total_ms:.2f}"
+    return response
+
+
+@app.middleware("http")
+async def pin_reads_after_write(request: Request, call_next):
+    """Send a client's reads to the primary for a while after it wrote something."""
+
+    response = await call_next(request)
+    if (
+        database.get_read_router().has_replica
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            database.READ_YOUR_WRITES_COOKIE,
+            f"{time.time() + settings.read_your_writes_seconds:.3f}",
+            max_age=math.ceil(settings.read_your_writes_seconds),
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
 
 app.include_router(auth.router, prefix=API_PREFIX)
-app.include_router(ingest.router, prefix=API_PREFIX)
 app.include_router(claims.router, prefix=API_PREFIX)
 app.include_router(clusters.router, prefix=API_PREFIX)
 app.include_router(analytics.router, prefix=API_PREFIX)
-app.include_router(admin.router, prefix=API_PREFIX)
+
+# API_ROLE=read serves the dashboards only: no ingest or pipeline admin endpoints, so
+# those workers never import the embedding and clustering stack.
+if settings.api_role == "full":
+    from .routers import admin, ingest
+
+    app.include_router(ingest.router, prefix=API_PREFIX)
+    app.include_router(admin.router, prefix=API_PREFIX)
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    content, media_type = render_latest()
+    return Response(content=content, media_type=media_type)
@@ -0,0 +1,35 @@
+"""Rebuild the claim vector collection with the current QDRANT_* settings.
+
+Copies every point into a new collection and switches the ``claim_embeddings`` alias
+to it::
+
+    python -m app.migrate_vectors
+
+Pause the worker and scheduler while it runs; see ``migrate_vector_store``.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from .config import get_settings
+from .core.logging import setup_logging
+from .services.vector_store import migrate_vector_store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recreate the vector collection behind its alias.")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points copied per request")
+    parser.add_argument(
+        "--keep-old",
+        action="store_true",
+        help="Keep the previous collection after the switch (a copy, for a legacy plain collection)",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    print(migrate_vector_store(get_settings(), batch_size=args.batch_size, keep_old=args.keep_old))
+
+
+if __name__ == "__main__":
+    main()
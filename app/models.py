@@ -1,7 +1,22 @@
 from datetime import datetime, date
 from decimal import Decimal
 
-from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    Numeric,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -12,6 +27,18 @@ class Cluster(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     label: Mapped[str] = mapped_column(String(255))
+    segment: Mapped[str | None] = mapped_column(String(255), index=True, nullable=True)
+    # Level 0 holds the KMeans clusters that claims belong to; every level above
+    # partitions the one below it (see CLUSTER_HIERARCHY).
+    level: Mapped[int] = mapped_column(Integer, default=0, server_default="0", index=True)
+    # Leaf centroid (float32) and centroid-distance median and scale, kept so that new
+    # claims can be assigned and scored between runs.
+    centroid: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    distance_median: Mapped[float | None] = mapped_column(Float, nullable=True)
+    distance_scale: Mapped[float | None] = mapped_column(Float, nullable=True)
+    parent_id: Mapped[int | None] = mapped_column(
+        ForeignKey("clusters.id", ondelete="CASCADE"), index=True, nullable=True
+    )
     root_cause_hypothesis: Mapped[str | None] = mapped_column(Text, nullable=True)
     recommended_actions: Mapped[str | None] = mapped_column(Text, nullable=True)
     sample_dtc_codes: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -24,10 +51,27 @@ class Cluster(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     claims: Mapped[list["Claim"]] = relationship("Claim", back_populates="cluster")
+    detail: Mapped["ClusterDetail | None"] = relationship(
+        "ClusterDetail", back_populates="cluster", uselist=False, cascade="all, delete-orphan"
+    )
+
+
+class ClusterDetail(Base):
+    __tablename__ = "cluster_details"
+
+    cluster_id: Mapped[int] = mapped_column(ForeignKey("clusters.id", ondelete="CASCADE"), primary_key=True)
+    representative_claims: Mapped[list] = mapped_column(JSON, default=list)
+    model_breakdown: Mapped[list] = mapped_column(JSON, default=list)
+    region_breakdown: Mapped[list] = mapped_column(JSON, default=list)
+    cost_histogram: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    cluster: Mapped[Cluster] = relationship("Cluster", back_populates="detail")
 
 
 class Claim(Base):
     __tablename__ = "claims"
+    __table_args__ = (Index("ix_claims_latitude_longitude", "latitude", "longitude"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     claim_id: Mapped[str] = mapped_column(String(255), index=True)
@@ -46,12 +90,44 @@ class Claim(Base):
     dealer_id: Mapped[str] = mapped_column(String(255))
     latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
     longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    geohash: Mapped[str | None] = mapped_column(String(12), index=True, nullable=True)
     cluster_id: Mapped[int | None] = mapped_column(ForeignKey("clusters.id"), nullable=True)
+    # Distance to the cluster centroid and how unusual that is within the cluster; see
+    # clustering_service.outlier_scores.
+    centroid_distance: Mapped[float | None] = mapped_column(Float, nullable=True)
+    outlier_score: Mapped[float | None] = mapped_column(Float, index=True, nullable=True)
     embedded_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    duplicate_of_id: Mapped[int | None] = mapped_column(
+        ForeignKey("claims.id", ondelete="SET NULL"), index=True, nullable=True
+    )
+    duplicate_similarity: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # MinHash signature (uint32 array); only dedup_service reads it.
+    minhash: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     cluster: Mapped[Cluster | None] = relationship("Cluster", back_populates="claims")
+    dtc_entries: Mapped[list["ClaimDtcCode"]] = relationship(
+        "ClaimDtcCode", back_populates="claim", cascade="all, delete-orphan"
+    )
+
+
+class ClaimDtcCode(Base):
+    __tablename__ = "claim_dtc_codes"
+    __table_args__ = (Index("ix_claim_dtc_codes_code_claim_id", "code", "claim_id"),)
+
+    claim_id: Mapped[int] = mapped_column(ForeignKey("claims.id", ondelete="CASCADE"), primary_key=True)
+    code: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    claim: Mapped[Claim] = relationship("Claim", back_populates="dtc_entries")
+
+
+class ClaimLshBucket(Base):
+    __tablename__ = "claim_lsh_buckets"
+
+    band: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    claim_id: Mapped[int] = mapped_column(ForeignKey("claims.id", ondelete="CASCADE"), primary_key=True, index=True)
 
 
 class User(Base):
@@ -62,5 +138,97 @@ class User(Base):
     name: Mapped[str] = mapped_column(String(255))
     password_hash: Mapped[str] = mapped_column(String(255))
     role: Mapped[str] = mapped_column(String(50))
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     last_login: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class FailureTrend(Base):
+    __tablename__ = "failure_trends"
+    __table_args__ = (
+        Index("ix_failure_trends_dimension_key_week", "dimension", "dimension_key", "week_start", unique=True),
+        Index("ix_failure_trends_spike_week", "is_spike", "week_start"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    dimension: Mapped[str] = mapped_column(String(32))
+    dimension_key: Mapped[str] = mapped_column(String(255))
+    label: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    week_start: Mapped[date] = mapped_column(Date)
+    claim_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_cost_usd: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+    rolling_claim_count: Mapped[int] = mapped_column(Integer, default=0)
+    rolling_cost_usd: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+    ewma: Mapped[float | None] = mapped_column(Float, nullable=True)
+    baseline_mean: Mapped[float | None] = mapped_column(Float, nullable=True)
+    upper_control_limit: Mapped[float | None] = mapped_column(Float, nullable=True)
+    is_spike: Mapped[bool] = mapped_column(Boolean, default=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class GeoHotspot(Base):
+    __tablename__ = "geo_hotspots"
+    __table_args__ = (Index("ix_geo_hotspots_cluster_hotspot", "cluster_id", "is_hotspot"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    cluster_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cell: Mapped[str] = mapped_column(String(12), index=True)
+    precision: Mapped[int] = mapped_column(Integer)
+    center_latitude: Mapped[float] = mapped_column(Float)
+    center_longitude: Mapped[float] = mapped_column(Float)
+    claim_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_cost_usd: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+    lift: Mapped[float] = mapped_column(Float)
+    z_score: Mapped[float] = mapped_column(Float)
+    is_hotspot: Mapped[bool] = mapped_column(Boolean, default=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_kind_status", "kind", "status"),
+        # At most one queued or running job per kind: a second enqueue hits this index
+        # and gets the job already in flight instead of starting an overlapping run.
+        Index(
+            "uq_jobs_active_kind",
+            "kind",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64))
+    status: Mapped[str] = mapped_column(String(16), default="queued", index=True)
+    stages: Mapped[dict] = mapped_column(JSON, default=dict)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    worker_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class ClusterRun(Base):
+    __tablename__ = "cluster_runs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    job_id: Mapped[str | None] = mapped_column(ForeignKey("jobs.id", ondelete="SET NULL"), nullable=True)
+    status: Mapped[str] = mapped_column(String(16), default="running")
+    num_claims: Mapped[int] = mapped_column(Integer, default=0)
+    num_clusters: Mapped[int] = mapped_column(Integer, default=0)
+    # Final KMeans centroids as a float32 .npy; the next run starts from them.
+    centroids: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    segment_by: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    # Segment of each centroid row, for segmented runs.
+    centroid_segments: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    warm_started: Mapped[bool] = mapped_column(Boolean, default=False)
+    reseeded_centroids: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    kmeans_iterations: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    kmeans_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
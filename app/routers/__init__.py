@@ -1,5 +1,3 @@
-from . import admin, analytics, auth, claims, clusters, ingest
-
 __all__ = [
     "admin",
     "analytics",
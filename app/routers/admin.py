@@ -1,26 +1,31 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
-from ..config import Settings, get_settings
 from ..database import get_db
-from ..services.ai_reasoning_service import update_ai_explanations_for_all_clusters
-from ..services.clustering_service import recalculate_clusters
-from ..services.embedding_service import embed_new_claims
+from ..models import Job
+from ..schemas import JobRead
+from ..services.job_service import RECLUSTER_JOB, enqueue_job
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
-@router.post("/recluster")
-def run_full_recluster(
-    db: Session = Depends(get_db),
-    settings: Settings = Depends(get_settings),
-):
-    embedded = embed_new_claims(db, settings)
-    clusters_created = recalculate_clusters(db, settings)
-    ai_updated = update_ai_explanations_for_all_clusters(db, settings)
-
-    return {
-        "embedded": embedded,
-        "clusters_created": clusters_created,
-        "clusters_updated_with_ai": ai_updated,
-    }
+@router.post("/recluster", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+def run_full_recluster(response: Response, db: Session = Depends(get_db)) -> JobRead:
+    """Queue the embed → cluster → explain → analytics pipeline for the worker.
+
+    If a recluster job is already queued or running, that job is returned instead.
+    """
+
+    job, created = enqueue_job(db, RECLUSTER_JOB)
+    response.headers["Location"] = f"{router.prefix}/jobs/{job.id}"
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=JobRead)
+def get_job(job_id: str, db: Session = Depends(get_db)) -> JobRead:
+    job = db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
@@ -1,19 +1,82 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-from ..services.analytics_service import get_cost_by_component, get_top_failure_clusters
+from ..database import get_read_db
+from ..services.analytics_service import (
+    get_cost_by_component,
+    get_dtc_frequency,
+    get_failure_trends,
+    get_geo_hotspots,
+    get_spike_alerts,
+    get_top_failure_clusters,
+)
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 @router.get("/top-failures")
-def top_failures(limit: int = Query(5, ge=1, le=20), db: Session = Depends(get_db)):
-    records = get_top_failure_clusters(db, limit=limit)
+async def top_failures(limit: int = Query(5, ge=1, le=20), db: AsyncSession = Depends(get_read_db)):
+    records = await db.run_sync(get_top_failure_clusters, limit=limit)
     return {"clusters": [dict(record) for record in records]}
 
 
 @router.get("/cost-by-component")
-def cost_by_component(db: Session = Depends(get_db)):
-    records = get_cost_by_component(db)
+async def cost_by_component(db: AsyncSession = Depends(get_read_db)):
+    records = await db.run_sync(get_cost_by_component)
     return [dict(record) for record in records]
+
+
+@router.get("/dtc-frequency")
+async def dtc_frequency(
+    cluster_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+):
+    records = await db.run_sync(get_dtc_frequency, cluster_id=cluster_id, limit=limit)
+    return [dict(record) for record in records]
+
+
+@router.get("/trends")
+async def failure_trends(
+    dimension: str = Query("cluster", pattern="^(cluster|component)$"),
+    key: Optional[str] = None,
+    weeks: int = Query(12, ge=1, le=104),
+    db: AsyncSession = Depends(get_read_db),
+):
+    records = await db.run_sync(get_failure_trends, dimension=dimension, key=key, weeks=weeks)
+    return {"dimension": dimension, "trends": [dict(record) for record in records]}
+
+
+@router.get("/alerts")
+async def spike_alerts(
+    dimension: Optional[str] = Query(None, pattern="^(cluster|component)$"),
+    weeks: int = Query(4, ge=1, le=52),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    records = await db.run_sync(get_spike_alerts, dimension=dimension, weeks=weeks, limit=limit)
+    return {"alerts": [dict(record) for record in records]}
+
+
+@router.get("/hotspots")
+async def geo_hotspots(
+    cluster_id: Optional[int] = Query(None),
+    hotspots_only: bool = Query(True),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lon: Optional[float] = Query(None, ge=-180, le=180),
+    limit: int = Query(200, ge=1, le=5000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    bbox = (min_lat, min_lon, max_lat, max_lon)
+    records = await db.run_sync(
+        get_geo_hotspots,
+        cluster_id=cluster_id,
+        hotspots_only=hotspots_only,
+        bbox=bbox if None not in bbox else None,
+        limit=limit,
+    )
+    return {"cells": [dict(record) for record in records]}
@@ -1,17 +1,22 @@
+import math
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.login_throttle import login_throttle
 from ..core.security import (
     PASSWORD_MAX_LENGTH,
     PASSWORD_MIN_LENGTH,
+    PasswordHasherBusy,
     create_access_token,
-    get_password_hash,
-    verify_password,
+    password_hasher,
 )
-from ..deps import get_current_user, get_db
+from ..core.user_cache import CachedUser, user_cache
+from ..database import get_async_db
+from ..deps import get_current_user
 from ..models import User
 from ..schemas import AuthResponse, UserCreate, UserRead
 
@@ -21,6 +26,25 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 PASSWORD_LENGTH_MESSAGE = (
     f"Password must be between {PASSWORD_MIN_LENGTH} and {PASSWORD_MAX_LENGTH} characters."
 )
+HASHER_BUSY_RETRY_SECONDS = 1
+
+
+def _issue_token(user: User) -> str:
+    claims = {
+        "sub": user.email,
+        "user_id": user.id,
+        "role": user.role,
+        "ver": user.token_version or 0,
+    }
+    return create_access_token(claims, expires_delta=timedelta(hours=1))
+
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": str(HASHER_BUSY_RETRY_SECONDS)},
+    )
 
 
 class LoginRequest(BaseModel):
@@ -31,11 +55,24 @@ class LoginRequest(BaseModel):
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)) -> AuthResponse:
+async def login(
+    data: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)
+) -> AuthResponse:
     email = data.email.lower()
-    user = db.query(User).filter(User.email == email).first()
+    client_ip = request.client.host if request.client else None
+    retry_after = login_throttle.retry_after(email, client_ip)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     try:
-        password_valid = verify_password(data.password, user.password_hash) if user else False
+        password_valid = await password_hasher.verify(data.password, user.password_hash) if user else False
+    except PasswordHasherBusy as exc:
+        raise _hasher_busy() from exc
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,25 +80,30 @@ def login(data: LoginRequest, db: Session = Depends(get_db)) -> AuthResponse:
         ) from exc
 
     if not user or not password_valid:
+        login_throttle.record_failure(email, client_ip)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    login_throttle.reset(email)
     user.last_login = datetime.utcnow()
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    user_cache.invalidate(user.id)
 
-    token = create_access_token({"sub": user.email, "user_id": user.id}, expires_delta=timedelta(hours=1))
+    token = _issue_token(user)
     return AuthResponse(access_token=token, user=user)
 
 
 @router.post("/signup", response_model=AuthResponse)
-def signup(data: UserCreate, db: Session = Depends(get_db)) -> AuthResponse:
+async def signup(data: UserCreate, db: AsyncSession = Depends(get_async_db)) -> AuthResponse:
     email = data.email.lower()
-    existing_user = db.query(User).filter(User.email == email).first()
+    existing_user = (await db.execute(select(User.id).where(User.email == email))).first()
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
     try:
-        password_hash = get_password_hash(data.password)
+        password_hash = await password_hasher.hash(data.password)
+    except PasswordHasherBusy as exc:
+        raise _hasher_busy() from exc
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,13 +116,13 @@ def signup(data: UserCreate, db: Session = Depends(get_db)) -> AuthResponse:
         role="engineer",
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
-    token = create_access_token({"sub": user.email, "user_id": user.id}, expires_delta=timedelta(hours=1))
+    token = _issue_token(user)
     return AuthResponse(access_token=token, user=user)
 
 
 @router.get("/me", response_model=UserRead)
-def read_current_user(current_user: User = Depends(get_current_user)) -> UserRead:
+def read_current_user(current_user: CachedUser = Depends(get_current_user)) -> UserRead:
     return current_user
@@ -2,18 +2,41 @@ from datetime import date
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, func, select
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-from ..models import Claim
-from ..schemas import ClaimRead, ClaimsPage
+from ..config import Settings, get_settings
+from ..core.responses import RowsResponse, rows_as_dicts, schema_columns
+from ..database import get_read_db
+from ..models import Claim, ClaimDtcCode
+from ..schemas import ClaimDuplicates, ClaimRead, ClaimSearchHit, ClaimsPage
+from ..services.export_service import EXPORT_MEDIA_TYPES, export_select, stream_claims_export
+from ..services.geo_service import GeoFilter, geo_conditions
+from ..services.search_service import hybrid_search, vector_filter
 
 router = APIRouter(prefix="/claims", tags=["claims"])
 
 
-def apply_filters(query, model: Optional[str], region: Optional[str], component: Optional[str], cluster_id: Optional[int], date_from: Optional[date], date_to: Optional[date]):
-    conditions = []
+def geo_filter(
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lon: Optional[float] = Query(None, ge=-180, le=180),
+    near_lat: Optional[float] = Query(None, ge=-90, le=90),
+    near_lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=5000),
+) -> Optional[GeoFilter]:
+    geo = GeoFilter(min_lat, min_lon, max_lat, max_lon, near_lat, near_lon, radius_km)
+    return geo if geo.has_bbox or geo.has_radius else None
+
+
+def apply_filters(query, model: Optional[str], region: Optional[str], component: Optional[str], cluster_id: Optional[int], date_from: Optional[date], date_to: Optional[date], *, dtc: Optional[str] = None, geo: Optional[GeoFilter] = None):
+    conditions = geo_conditions(geo)
+    if dtc:
+        conditions.append(
+            Claim.id.in_(select(ClaimDtcCode.claim_id).where(ClaimDtcCode.code == dtc.strip().upper()))
+        )
     if model:
         conditions.append(Claim.model == model)
     if region:
@@ -33,7 +56,7 @@ def apply_filters(query, model: Optional[str], region: Optional[str], component:
 
 
 @router.get("", response_model=ClaimsPage)
-def list_claims(
+async def list_claims(
     page: int = Query(1, ge=1),
     page_size: int = Query(25, ge=1, le=100),
     model: Optional[str] = None,
@@ -42,32 +65,162 @@ def list_claims(
     cluster_id: Optional[int] = Query(None),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
-) -> ClaimsPage:
-    base_query = select(Claim)
-    base_query = apply_filters(base_query, model, region, component, cluster_id, date_from, date_to)
+    dtc: Optional[str] = Query(None, max_length=32),
+    geo: Optional[GeoFilter] = Depends(geo_filter),
+    db: AsyncSession = Depends(get_read_db),
+) -> RowsResponse:
+    base_query = select(*schema_columns(ClaimRead, Claim))
+    base_query = apply_filters(base_query, model, region, component, cluster_id, date_from, date_to, dtc=dtc, geo=geo)
 
-    total_query = base_query.with_only_columns(func.count()).order_by(None)
-    total = db.execute(total_query).scalar_one()
+    total_query = base_query.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    total = (await db.execute(total_query)).scalar_one()
 
-    result = db.execute(
+    result = await db.execute(
         base_query.order_by(Claim.failure_date.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
     )
-    items = result.scalars().all()
 
-    return ClaimsPage(
-        total=total,
-        page=page,
-        page_size=page_size,
-        items=[ClaimRead.from_orm(item) for item in items],
+    # Rows already have ClaimRead's shape; skip building and re-validating a model per row.
+    return RowsResponse(
+        {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "items": rows_as_dicts(ClaimRead, result.all()),
+        }
     )
 
 
+@router.get("/export")
+async def export_claims(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson|parquet)$"),
+    compression: str = Query("gzip", pattern="^(gzip|none)$"),
+    model: Optional[str] = None,
+    region: Optional[str] = None,
+    component: Optional[str] = None,
+    cluster_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    dtc: Optional[str] = Query(None, max_length=32),
+    geo: Optional[GeoFilter] = Depends(geo_filter),
+    db: AsyncSession = Depends(get_read_db),
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    stmt = apply_filters(export_select(), model, region, component, cluster_id, date_from, date_to, dtc=dtc, geo=geo)
+    stmt = stmt.order_by(Claim.id.asc())
+
+    # Parquet compresses its column chunks itself; gzip only applies to the text formats.
+    compress = compression == "gzip" and export_format != "parquet"
+    filename = f"claims-export.{export_format}" + (".gz" if compress else "")
+    media_type = "application/gzip" if compress else EXPORT_MEDIA_TYPES[export_format]
+
+    return StreamingResponse(
+        stream_claims_export(db, settings, stmt, export_format, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/search", response_model=list[ClaimSearchHit])
+async def search_claims(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    model: Optional[str] = None,
+    region: Optional[str] = None,
+    component: Optional[str] = None,
+    cluster_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    settings: Settings = Depends(get_settings),
+) -> RowsResponse:
+    """Full-text and vector search over symptoms, repairs, DTC codes and part numbers."""
+
+    stmt = apply_filters(select(Claim.id), model, region, component, cluster_id, date_from, date_to)
+    hits = await hybrid_search(
+        db,
+        settings,
+        stmt,
+        q,
+        limit,
+        vector_filter(
+            settings,
+            model=model,
+            region=region,
+            component=component,
+            cluster_id=cluster_id,
+            date_from=date_from,
+            date_to=date_to,
+        ),
+    )
+    if not hits:
+        return RowsResponse([])
+
+    rows = await db.execute(select(*schema_columns(ClaimRead, Claim)).where(Claim.id.in_([hit.claim_id for hit in hits])))
+    claims = {claim["id"]: claim for claim in rows_as_dicts(ClaimRead, rows.all())}
+    return RowsResponse(
+        [
+            {"score": hit.score, "text_rank": hit.text_rank, "vector_rank": hit.vector_rank, "claim": claims[hit.claim_id]}
+            for hit in hits
+            if hit.claim_id in claims
+        ]
+    )
+
+
+@router.get("/anomalies", response_model=list[ClaimRead])
+async def list_anomalies(
+    limit: int = Query(20, ge=1, le=100),
+    min_score: Optional[float] = None,
+    model: Optional[str] = None,
+    region: Optional[str] = None,
+    component: Optional[str] = None,
+    cluster_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+) -> RowsResponse:
+    """The claims farthest from their cluster centroid, highest outlier score first."""
+
+    # Walks ix_claims_outlier_score from the top and stops after ``limit`` matches.
+    stmt = select(*schema_columns(ClaimRead, Claim)).where(Claim.outlier_score.is_not(None))
+    if min_score is not None:
+        stmt = stmt.where(Claim.outlier_score >= min_score)
+    stmt = apply_filters(stmt, model, region, component, cluster_id, date_from, date_to)
+    result = await db.execute(stmt.order_by(Claim.outlier_score.desc(), Claim.id.asc()).limit(limit))
+    return RowsResponse(rows_as_dicts(ClaimRead, result.all()))
+
+
 @router.get("/{claim_id}", response_model=ClaimRead)
-def get_claim(claim_id: int, db: Session = Depends(get_db)) -> ClaimRead:
-    claim = db.get(Claim, claim_id)
+async def get_claim(claim_id: int, db: AsyncSession = Depends(get_read_db)) -> ClaimRead:
+    claim = await db.get(Claim, claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail="Claim not found")
     return ClaimRead.from_orm(claim)
+
+
+@router.get("/{claim_id}/duplicates", response_model=ClaimDuplicates)
+async def get_claim_duplicates(claim_id: int, db: AsyncSession = Depends(get_read_db)) -> RowsResponse:
+    """The other claims in ``claim_id``'s near-duplicate group, canonical claim first."""
+
+    row = (await db.execute(select(Claim.id, Claim.duplicate_of_id).where(Claim.id == claim_id))).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Claim not found")
+
+    canonical_id = row.duplicate_of_id or row.id
+    result = await db.execute(
+        select(*schema_columns(ClaimRead, Claim), Claim.duplicate_similarity)
+        .where(or_(Claim.id == canonical_id, Claim.duplicate_of_id == canonical_id), Claim.id != claim_id)
+        .order_by(Claim.id.asc())
+    )
+    rows = result.all()
+    return RowsResponse(
+        {
+            "claim_id": claim_id,
+            "canonical_id": canonical_id,
+            "duplicates": [
+                {"is_canonical": claim["id"] == canonical_id, "similarity": row[-1], "claim": claim}
+                for claim, row in zip(rows_as_dicts(ClaimRead, rows), rows)
+            ],
+        }
+    )
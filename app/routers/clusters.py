@@ -2,22 +2,33 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-from ..models import Claim, Cluster
-from ..schemas import ClusterRead
+from ..core.responses import RowsResponse, rows_as_dicts, schema_columns
+from ..database import get_read_db
+from ..models import Claim, Cluster, ClusterDetail
+from ..schemas import ClusterDetailRead, ClusterRead
 
 router = APIRouter(prefix="/clusters", tags=["clusters"])
 
 
 @router.get("", response_model=list[ClusterRead])
-def list_clusters(
+async def list_clusters(
     sort_by: Optional[str] = Query(None, pattern="^(cost|count)$"),
     limit: Optional[int] = Query(None, ge=1, le=100),
-    db: Session = Depends(get_db),
-):
-    stmt = select(Cluster)
+    segment: Optional[str] = None,
+    level: int = Query(0, ge=0),
+    parent_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> RowsResponse:
+    stmt = select(*schema_columns(ClusterRead, Cluster))
+    # The children of ``parent_id`` sit one level below it, so ``level`` is ignored then.
+    if parent_id is not None:
+        stmt = stmt.where(Cluster.parent_id == parent_id)
+    else:
+        stmt = stmt.where(Cluster.level == level)
+    if segment is not None:
+        stmt = stmt.where(Cluster.segment == segment)
 
     if sort_by == "cost":
         stmt = stmt.order_by(Cluster.total_cost_usd.desc())
@@ -29,13 +40,12 @@ def list_clusters(
     if limit:
         stmt = stmt.limit(limit)
 
-    clusters = db.execute(stmt).scalars().all()
-    return [ClusterRead.from_orm(cluster) for cluster in clusters]
+    return RowsResponse(rows_as_dicts(ClusterRead, (await db.execute(stmt)).all()))
 
 
 @router.get("/{cluster_id}", response_model=ClusterRead)
-def get_cluster(cluster_id: int, db: Session = Depends(get_db)) -> ClusterRead:
-    cluster = db.get(Cluster, cluster_id)
+async def get_cluster(cluster_id: int, db: AsyncSession = Depends(get_read_db)) -> ClusterRead:
+    cluster = await db.get(Cluster, cluster_id)
     if not cluster:
         raise HTTPException(status_code=404, detail="Cluster not found")
 
@@ -47,8 +57,34 @@ def get_cluster(cluster_id: int, db: Session = Depends(get_db)) -> ClusterRead:
             )
             .where(Claim.cluster_id == cluster_id)
         )
-        agg = db.execute(agg_stmt).one()
+        agg = (await db.execute(agg_stmt)).one()
         cluster.num_claims = agg.num_claims
         cluster.total_cost_usd = agg.total_cost_usd
 
     return ClusterRead.from_orm(cluster)
+
+
+@router.get("/{cluster_id}/detail", response_model=ClusterDetailRead)
+async def get_cluster_detail(cluster_id: int, db: AsyncSession = Depends(get_read_db)) -> ClusterDetailRead:
+    row = (
+        await db.execute(
+            select(Cluster, ClusterDetail)
+            .outerjoin(ClusterDetail, ClusterDetail.cluster_id == Cluster.id)
+            .where(Cluster.id == cluster_id)
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Cluster not found")
+
+    cluster, detail = row
+    summary = ClusterRead.from_orm(cluster).model_dump()
+    if detail is None:
+        return ClusterDetailRead(**summary)
+    return ClusterDetailRead(
+        **summary,
+        representative_claims=detail.representative_claims,
+        model_breakdown=detail.model_breakdown,
+        region_breakdown=detail.region_breakdown,
+        cost_histogram=detail.cost_histogram,
+        computed_at=detail.computed_at,
+    )
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
 
+from ..config import Settings, get_settings
 from ..database import get_db
-from ..services.ingest_service import IngestSummary, ingest_claims_from_csv
 
 router = APIRouter(prefix="/ingest", tags=["ingest"])
 
@@ -11,12 +11,16 @@ router = APIRouter(prefix="/ingest", tags=["ingest"])
 def ingest_claims(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
+    settings: Settings = Depends(get_settings),
 ):
     if file.content_type not in ("text/csv", "application/vnd.ms-excel", "application/octet-stream"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file type")
 
+    # Imported here so read-only API workers never load pandas.
+    from ..services.ingest_service import IngestSummary, ingest_claims_from_csv
+
     try:
-        summary: IngestSummary = ingest_claims_from_csv(db, file)
+        summary: IngestSummary = ingest_claims_from_csv(db, file, settings)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
@@ -26,4 +30,5 @@ def ingest_claims(
         "total_cost_usd": float(summary.total_cost_usd),
         "earliest_failure_date": summary.earliest_failure_date,
         "latest_failure_date": summary.latest_failure_date,
+        "duplicates": summary.duplicates,
     }
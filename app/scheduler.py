@@ -0,0 +1,34 @@
+"""Periodic incremental embedding and clustering.
+
+Run it as its own process::
+
+    python -m app.scheduler
+
+or set ``SCHEDULER_ENABLED=true`` to run it inside the API process instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from .config import get_settings
+from .core.logging import setup_logging
+from .database import get_session_factory
+from .services.scheduler_service import PipelineScheduler, run_scheduler_tick
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embed new claims and queue reclustering on a schedule.")
+    parser.add_argument("--once", action="store_true", help="Run a single tick, then exit")
+    args = parser.parse_args()
+
+    setup_logging()
+    settings = get_settings()
+    if args.once:
+        run_scheduler_tick(get_session_factory(), settings)
+        return
+    PipelineScheduler(get_session_factory(), settings).run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,9 @@ class ClaimCreate(ClaimBase):
 class ClaimRead(ORMModelMixin, ClaimBase):
     id: int
     embedded_at: Optional[datetime] = None
+    duplicate_of_id: Optional[int] = None
+    centroid_distance: Optional[float] = None
+    outlier_score: Optional[float] = None
     created_at: datetime
     updated_at: datetime
 
@@ -50,6 +53,25 @@ class ClaimsPage(BaseModel):
     items: list[ClaimRead]
 
 
+class ClaimSearchHit(BaseModel):
+    score: float
+    text_rank: Optional[int] = None
+    vector_rank: Optional[int] = None
+    claim: ClaimRead
+
+
+class ClaimDuplicate(BaseModel):
+    is_canonical: bool
+    similarity: Optional[float] = None
+    claim: ClaimRead
+
+
+class ClaimDuplicates(BaseModel):
+    claim_id: int
+    canonical_id: int
+    duplicates: list[ClaimDuplicate]
+
+
 class ClusterBase(BaseModel):
     label: str
     root_cause_hypothesis: Optional[str] = None
@@ -60,6 +82,9 @@ class ClusterBase(BaseModel):
 
 class ClusterRead(ORMModelMixin, ClusterBase):
     id: int
+    segment: Optional[str] = None
+    level: int = 0
+    parent_id: Optional[int] = None
     num_claims: int
     total_cost_usd: Decimal = Field(..., decimal_places=2)
     first_failure_date: Optional[date] = None
@@ -67,6 +92,38 @@ class ClusterRead(ORMModelMixin, ClusterBase):
     created_at: datetime
     updated_at: datetime
 
+
+class RepresentativeClaim(BaseModel):
+    id: int
+    claim_id: str
+    model: str
+    region: Optional[str] = None
+    component: str
+    dtc_codes: str
+    symptom_text: str
+    claim_cost_usd: Decimal = Field(..., decimal_places=2)
+    failure_date: date
+    distance: float
+
+
+class BreakdownEntry(BaseModel):
+    key: Optional[str] = None
+    claim_count: int
+    total_cost_usd: Decimal = Field(..., decimal_places=2)
+
+
+class CostHistogram(BaseModel):
+    bin_edges: list[float]
+    counts: list[int]
+
+
+class ClusterDetailRead(ClusterRead):
+    representative_claims: list[RepresentativeClaim] = []
+    model_breakdown: list[BreakdownEntry] = []
+    region_breakdown: list[BreakdownEntry] = []
+    cost_histogram: Optional[CostHistogram] = None
+    computed_at: Optional[datetime] = None
+
 class UserBase(BaseModel):
     email: EmailStr
     name: str | None = None
@@ -96,3 +153,27 @@ class JobStatus(BaseModel):
     processed: int
     inserted: int
     message: Optional[str] = None
+
+
+class JobStageRead(BaseModel):
+    status: str
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    checkpoint: dict = Field(default_factory=dict)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class JobRead(ORMModelMixin, BaseModel):
+    id: str
+    kind: str
+    status: str
+    stages: dict[str, JobStageRead] = Field(default_factory=dict)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -5,4 +5,10 @@ __all__ = [
     "clustering_service",
     "analytics_service",
     "ai_reasoning_service",
+    "trend_service",
+    "export_service",
+    "geo_service",
+    "job_service",
+    "recluster_service",
+    "scheduler_service",
 ]
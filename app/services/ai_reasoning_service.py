@@ -2,14 +2,15 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import List
+from typing import Callable, List
 
 from openai import OpenAI
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..config import Settings
-from ..models import Claim, Cluster
+from ..core.metrics import external_call, stage_timer
+from ..models import Claim, ClaimDtcCode, Cluster
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,19 +24,21 @@ def _get_openai_client(settings: Settings) -> OpenAI | None:
     return OpenAI(api_key=settings.openai_api_key)
 
 
-def _build_prompt(cluster: Cluster, sample_claims: List[Claim]) -> str:
+def _sample_dtc_codes(db: Session, sample_claims: List[Claim]) -> List[str]:
+    count = func.count(ClaimDtcCode.claim_id)
+    stmt = (
+        select(ClaimDtcCode.code)
+        .where(ClaimDtcCode.claim_id.in_([claim.id for claim in sample_claims]))
+        .group_by(ClaimDtcCode.code)
+        .order_by(count.desc(), ClaimDtcCode.code.asc())
+    )
+    return list(db.execute(stmt).scalars().all())
+
+
+def _build_prompt(cluster: Cluster, sample_claims: List[Claim], dtcs: List[str]) -> str:
     models = {claim.model for claim in sample_claims if claim.model}
     regions = {claim.region for claim in sample_claims if claim.region}
-    dtcs = []
-    components = []
-    for claim in sample_claims:
-        if claim.dtc_codes:
-            dtcs.extend([code.strip() for code in claim.dtc_codes.split(",") if code.strip()])
-        if claim.component:
-            components.append(claim.component)
-
-    dtcs = list(dict.fromkeys(dtcs))  # preserve order
-    components = list(dict.fromkeys(components))
+    components = list(dict.fromkeys(claim.component for claim in sample_claims if claim.component))
 
     symptom_lines = "\n".join(
         f"  * \"{claim.symptom_text}\"" for claim in sample_claims if claim.symptom_text
@@ -70,14 +73,15 @@ Respond in valid JSON with the following structure:
 
 def _call_model(client: OpenAI, settings: Settings, prompt: str) -> dict | None:
     try:
-        response = client.chat.completions.create(
-            model=settings.openai_completion_model,
-            messages=[
-                {"role": "system", "content": "You are a helpful automotive quality engineer."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
+        with external_call("openai", "chat_completion"):
+            response = client.chat.completions.create(
+                model=settings.openai_completion_model,
+                messages=[
+                    {"role": "system", "content": "You are a helpful automotive quality engineer."},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.2,
+            )
     except Exception as exc:  # pragma: no cover - network errors
         LOGGER.exception("Failed to generate AI explanation: %s", exc)
         return None
@@ -101,14 +105,18 @@ def _call_model(client: OpenAI, settings: Settings, prompt: str) -> dict | None:
     return None
 
 
-def update_ai_explanations_for_all_clusters(db: Session, settings: Settings) -> int:
+def update_ai_explanations_for_all_clusters(
+    db: Session,
+    settings: Settings,
+    on_progress: Callable[..., None] | None = None,
+) -> int:
     client = _get_openai_client(settings)
     if client is None:
         return 0
 
     clusters = (
         db.execute(
-            select(Cluster).order_by(Cluster.num_claims.desc())
+            select(Cluster).where(Cluster.level == 0).order_by(Cluster.num_claims.desc())
         ).scalars().all()
     )
 
@@ -119,20 +127,24 @@ def update_ai_explanations_for_all_clusters(db: Session, settings: Settings) ->
         if cluster.root_cause_hypothesis and cluster.recommended_actions:
             continue
 
-        sample_claims = (
-            db.execute(
-                select(Claim)
-                .where(Claim.cluster_id == cluster.id)
-                .limit(MAX_SAMPLE_CLAIMS)
+        with stage_timer("ai_reasoning", "sample_claims"):
+            sample_claims = (
+                db.execute(
+                    select(Claim)
+                    .where(Claim.cluster_id == cluster.id)
+                    .limit(MAX_SAMPLE_CLAIMS)
+                )
+                .scalars()
+                .all()
             )
-            .scalars()
-            .all()
-        )
         if not sample_claims:
             continue
 
-        prompt = _build_prompt(cluster, sample_claims)
-        result = _call_model(client, settings, prompt)
+        with stage_timer("ai_reasoning", "build_prompt"):
+            dtcs = [] if cluster.sample_dtc_codes else _sample_dtc_codes(db, sample_claims)
+            prompt = _build_prompt(cluster, sample_claims, dtcs)
+        with stage_timer("ai_reasoning", "call_model"):
+            result = _call_model(client, settings, prompt)
         if not result:
             continue
 
@@ -143,9 +155,10 @@ def update_ai_explanations_for_all_clusters(db: Session, settings: Settings) ->
         elif isinstance(actions, str):
             cluster.recommended_actions = actions
         db.add(cluster)
-        updated += 1
-
-    if updated:
+        # Commit per cluster so an interrupted run keeps the explanations it already paid for.
         db.commit()
+        updated += 1
+        if on_progress is not None:
+            on_progress(updated=updated, last_cluster_id=cluster.id)
 
     return updated
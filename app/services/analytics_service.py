@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from datetime import timedelta
+
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from ..models import Claim, Cluster
+from ..models import Claim, ClaimDtcCode, Cluster, FailureTrend, GeoHotspot
 
 
 def get_top_failure_clusters(db: Session, limit: int = 5):
@@ -14,7 +16,7 @@ def get_top_failure_clusters(db: Session, limit: int = 5):
             Cluster.num_claims,
             Cluster.total_cost_usd,
         )
-        .where(Cluster.num_claims > 0)
+        .where(Cluster.level == 0, Cluster.num_claims > 0)
         .order_by(Cluster.num_claims.desc(), Cluster.total_cost_usd.desc())
         .limit(limit)
     )
@@ -32,3 +34,105 @@ def get_cost_by_component(db: Session):
         .order_by(func.coalesce(func.sum(Claim.claim_cost_usd), 0).desc())
     )
     return db.execute(stmt).mappings().all()
+
+
+def get_dtc_frequency(db: Session, cluster_id: int | None = None, limit: int = 20):
+    claim_count = func.count(ClaimDtcCode.claim_id)
+    stmt = select(
+        ClaimDtcCode.code,
+        claim_count.label("claim_count"),
+        func.coalesce(func.sum(Claim.claim_cost_usd), 0).label("total_cost_usd"),
+    ).join(Claim, Claim.id == ClaimDtcCode.claim_id)
+    if cluster_id is not None:
+        stmt = stmt.where(Claim.cluster_id == cluster_id)
+    stmt = stmt.group_by(ClaimDtcCode.code).order_by(claim_count.desc(), ClaimDtcCode.code.asc()).limit(limit)
+    return db.execute(stmt).mappings().all()
+
+
+def _trend_columns():
+    return (
+        FailureTrend.dimension,
+        FailureTrend.dimension_key.label("key"),
+        FailureTrend.label,
+        FailureTrend.week_start,
+        FailureTrend.claim_count,
+        FailureTrend.total_cost_usd,
+        FailureTrend.rolling_claim_count,
+        FailureTrend.rolling_cost_usd,
+        FailureTrend.ewma,
+        FailureTrend.baseline_mean,
+        FailureTrend.upper_control_limit,
+        FailureTrend.is_spike,
+    )
+
+
+def _latest_trend_week(db: Session, dimension: str | None = None):
+    stmt = select(func.max(FailureTrend.week_start))
+    if dimension:
+        stmt = stmt.where(FailureTrend.dimension == dimension)
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def get_failure_trends(db: Session, dimension: str = "cluster", key: str | None = None, weeks: int = 12):
+    latest_week = _latest_trend_week(db, dimension)
+    if latest_week is None:
+        return []
+
+    stmt = select(*_trend_columns()).where(
+        FailureTrend.dimension == dimension,
+        FailureTrend.week_start >= latest_week - timedelta(weeks=weeks - 1),
+    )
+    if key is not None:
+        stmt = stmt.where(FailureTrend.dimension_key == key)
+    stmt = stmt.order_by(FailureTrend.dimension_key.asc(), FailureTrend.week_start.asc())
+    return db.execute(stmt).mappings().all()
+
+
+def get_spike_alerts(db: Session, dimension: str | None = None, weeks: int = 4, limit: int = 50):
+    latest_week = _latest_trend_week(db, dimension)
+    if latest_week is None:
+        return []
+
+    stmt = select(*_trend_columns()).where(
+        FailureTrend.is_spike.is_(True),
+        FailureTrend.week_start >= latest_week - timedelta(weeks=weeks - 1),
+    )
+    if dimension:
+        stmt = stmt.where(FailureTrend.dimension == dimension)
+    stmt = stmt.order_by(FailureTrend.week_start.desc(), FailureTrend.claim_count.desc()).limit(limit)
+    return db.execute(stmt).mappings().all()
+
+
+def get_geo_hotspots(
+    db: Session,
+    cluster_id: int | None = None,
+    hotspots_only: bool = True,
+    bbox: tuple[float, float, float, float] | None = None,
+    limit: int = 200,
+):
+    stmt = select(
+        GeoHotspot.cluster_id,
+        GeoHotspot.cell,
+        GeoHotspot.precision,
+        GeoHotspot.center_latitude,
+        GeoHotspot.center_longitude,
+        GeoHotspot.claim_count,
+        GeoHotspot.total_cost_usd,
+        GeoHotspot.lift,
+        GeoHotspot.z_score,
+        GeoHotspot.is_hotspot,
+    )
+    if cluster_id is None:
+        stmt = stmt.where(GeoHotspot.cluster_id.is_(None))
+    else:
+        stmt = stmt.where(GeoHotspot.cluster_id == cluster_id)
+    if hotspots_only:
+        stmt = stmt.where(GeoHotspot.is_hotspot.is_(True))
+    if bbox is not None:
+        min_lat, min_lon, max_lat, max_lon = bbox
+        stmt = stmt.where(
+            GeoHotspot.center_latitude.between(min_lat, max_lat),
+            GeoHotspot.center_longitude.between(min_lon, max_lon),
+        )
+    stmt = stmt.order_by(GeoHotspot.z_score.desc()).limit(limit)
+    return db.execute(stmt).mappings().all()
@@ -1,22 +1,36 @@
 from __future__ import annotations
 
+import io
 import logging
+import multiprocessing
+import os
+import tempfile
+import time
 from collections import Counter, defaultdict
-from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Sequence
 
 import numpy as np
 from sklearn.cluster import KMeans
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
 from ..config import Settings
-from ..models import Claim, Cluster
+from ..core.metrics import CLUSTERS_CREATED, stage_timer
+from ..models import Claim, ClaimDtcCode, Cluster, ClusterDetail, ClusterRun
 from . import vector_store
 
 LOGGER = logging.getLogger(__name__)
 
+KMEANS_RANDOM_STATE = 42
+UNKNOWN_SEGMENT = "unknown"
+# Scales a median absolute deviation to a standard deviation for normal data.
+MAD_TO_STD = 1.4826
+MIN_DISTANCE_SCALE = 1e-6
+
 
 def _compute_label(components: Counter, dtcs: Counter, index: int) -> str:
     label_parts: list[str] = []
@@ -29,46 +43,706 @@ def _compute_label(components: Counter, dtcs: Counter, index: int) -> str:
     return " / ".join(label_parts)
 
 
-def _aggregate_cluster_stats(claims: Iterable[Claim], index: int) -> dict:
-    num_claims = 0
-    total_cost = Decimal("0")
-    first_date: date | None = None
-    last_date: date | None = None
-    dtc_counter: Counter[str] = Counter()
-    component_counter: Counter[str] = Counter()
-
-    for claim in claims:
-        num_claims += 1
-        total_cost += Decimal(str(claim.claim_cost_usd))
-        if claim.failure_date:
-            if first_date is None or claim.failure_date < first_date:
-                first_date = claim.failure_date
-            if last_date is None or claim.failure_date > last_date:
-                last_date = claim.failure_date
-        if claim.dtc_codes:
-            codes = [code.strip() for code in claim.dtc_codes.split(",") if code.strip()]
-            dtc_counter.update(codes)
-        if claim.component:
-            component_counter.update([claim.component])
-
-    sample_dtc = ", ".join(code for code, _ in dtc_counter.most_common(5)) or None
-    sample_components = ", ".join(component for component, _ in component_counter.most_common(5)) or None
-    if num_claims:
-        total_cost = total_cost.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-
-    return {
-        "num_claims": num_claims,
-        "total_cost_usd": total_cost,
-        "first_failure_date": first_date,
-        "last_failure_date": last_date,
-        "sample_dtc_codes": sample_dtc,
-        "sample_components": sample_components,
-        "label": _compute_label(component_counter, dtc_counter, index),
+def _counters_by_cluster(db: Session, stmt) -> Dict[int, Counter]:
+    counters: Dict[int, Counter] = defaultdict(Counter)
+    for cluster_id, key, count in db.execute(stmt):
+        if key:
+            counters[cluster_id][key] = count
+    return counters
+
+
+def _sample_keys(counter: Counter) -> str | None:
+    return ", ".join(key for key, _ in counter.most_common(5)) or None
+
+
+def _aggregate_cluster_stats(db: Session, cluster_ids: List[int]) -> Dict[int, dict]:
+    """Aggregate the statistics of freshly assigned clusters with grouped SQL queries."""
+
+    if not cluster_ids:
+        return {}
+
+    in_clusters = Claim.cluster_id.in_(cluster_ids)
+    totals = db.execute(
+        select(
+            Claim.cluster_id,
+            func.count(Claim.id),
+            func.coalesce(func.sum(Claim.claim_cost_usd), 0),
+            func.min(Claim.failure_date),
+            func.max(Claim.failure_date),
+        )
+        .where(in_clusters)
+        .group_by(Claim.cluster_id)
+    ).all()
+    component_counts = _counters_by_cluster(
+        db,
+        select(Claim.cluster_id, Claim.component, func.count(Claim.id))
+        .where(in_clusters)
+        .group_by(Claim.cluster_id, Claim.component)
+        .order_by(func.count(Claim.id).desc(), Claim.component.asc()),
+    )
+    dtc_counts = _counters_by_cluster(
+        db,
+        select(Claim.cluster_id, ClaimDtcCode.code, func.count(ClaimDtcCode.claim_id))
+        .join(ClaimDtcCode, ClaimDtcCode.claim_id == Claim.id)
+        .where(in_clusters)
+        .group_by(Claim.cluster_id, ClaimDtcCode.code)
+        .order_by(func.count(ClaimDtcCode.claim_id).desc(), ClaimDtcCode.code.asc()),
+    )
+
+    stats: Dict[int, dict] = {}
+    for cluster_id, num_claims, total_cost, first_date, last_date in totals:
+        components = component_counts.get(cluster_id, Counter())
+        dtcs = dtc_counts.get(cluster_id, Counter())
+        stats[cluster_id] = {
+            "num_claims": num_claims,
+            "total_cost_usd": Decimal(str(total_cost)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+            "first_failure_date": first_date,
+            "last_failure_date": last_date,
+            "sample_dtc_codes": _sample_keys(dtcs),
+            "sample_components": _sample_keys(components),
+            "components": components,
+            "dtcs": dtcs,
+        }
+    return stats
+
+
+def _representatives(
+    labels: np.ndarray,
+    distances: np.ndarray,
+    claim_ids: List[int],
+    k: int,
+) -> Dict[int, List[tuple[int, float]]]:
+    """Return the ``k`` claims nearest to each centroid as (claim id, distance) pairs."""
+
+    representatives: Dict[int, List[tuple[int, float]]] = {}
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        take = min(max(k, 1), len(members))
+        nearest = members[np.argpartition(distances[members], take - 1)[:take]]
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        representatives[int(label)] = [(claim_ids[i], float(distances[i])) for i in nearest]
+    return representatives
+
+
+def _breakdowns_by_cluster(db: Session, column, cluster_ids: List[int]) -> Dict[int, list[dict]]:
+    claim_count = func.count(Claim.id)
+    stmt = (
+        select(
+            Claim.cluster_id,
+            column,
+            claim_count,
+            func.coalesce(func.sum(Claim.claim_cost_usd), 0),
+        )
+        .where(Claim.cluster_id.in_(cluster_ids))
+        .group_by(Claim.cluster_id, column)
+        .order_by(claim_count.desc(), column.asc())
+    )
+    breakdowns: Dict[int, list[dict]] = defaultdict(list)
+    for cluster_id, key, count, total_cost in db.execute(stmt):
+        breakdowns[cluster_id].append(
+            {"key": key, "claim_count": count, "total_cost_usd": str(total_cost)}
+        )
+    return breakdowns
+
+
+def _cost_histograms(db: Session, cluster_ids: List[int], bins: int) -> Dict[int, dict]:
+    stmt = (
+        select(Claim.cluster_id, Claim.claim_cost_usd)
+        .where(Claim.cluster_id.in_(cluster_ids))
+        .execution_options(yield_per=5000)
+    )
+    costs: Dict[int, list[float]] = defaultdict(list)
+    for cluster_id, cost in db.execute(stmt):
+        costs[cluster_id].append(float(cost))
+
+    histograms: Dict[int, dict] = {}
+    for cluster_id, values in costs.items():
+        counts, edges = np.histogram(np.asarray(values, dtype=np.float64), bins=max(1, bins))
+        histograms[cluster_id] = {
+            "bin_edges": [round(float(edge), 2) for edge in edges],
+            "counts": [int(count) for count in counts],
+        }
+    return histograms
+
+
+def _build_cluster_details(
+    db: Session,
+    settings: Settings,
+    clusters_by_label: Dict[int, Cluster],
+    representatives: Dict[int, List[tuple[int, float]]],
+) -> List[ClusterDetail]:
+    cluster_ids = [cluster.id for cluster in clusters_by_label.values()]
+    representative_ids = [claim_id for pairs in representatives.values() for claim_id, _ in pairs]
+    claim_rows = {
+        row.id: row
+        for row in db.execute(
+            select(
+                Claim.id,
+                Claim.claim_id,
+                Claim.model,
+                Claim.region,
+                Claim.component,
+                Claim.dtc_codes,
+                Claim.symptom_text,
+                Claim.claim_cost_usd,
+                Claim.failure_date,
+            ).where(Claim.id.in_(representative_ids))
+        )
     }
+    model_breakdowns = _breakdowns_by_cluster(db, Claim.model, cluster_ids)
+    region_breakdowns = _breakdowns_by_cluster(db, Claim.region, cluster_ids)
+    histograms = _cost_histograms(db, cluster_ids, settings.cluster_cost_histogram_bins)
+
+    computed_at = datetime.utcnow()
+    details: List[ClusterDetail] = []
+    for label, cluster in clusters_by_label.items():
+        representative_claims = []
+        for claim_id, distance in representatives.get(label, []):
+            row = claim_rows.get(claim_id)
+            if row is None:
+                continue
+            representative_claims.append(
+                {
+                    "id": row.id,
+                    "claim_id": row.claim_id,
+                    "model": row.model,
+                    "region": row.region,
+                    "component": row.component,
+                    "dtc_codes": row.dtc_codes,
+                    "symptom_text": row.symptom_text,
+                    "claim_cost_usd": str(row.claim_cost_usd),
+                    "failure_date": row.failure_date.isoformat(),
+                    "distance": distance,
+                }
+            )
+        details.append(
+            ClusterDetail(
+                cluster_id=cluster.id,
+                representative_claims=representative_claims,
+                model_breakdown=model_breakdowns.get(cluster.id, []),
+                region_breakdown=region_breakdowns.get(cluster.id, []),
+                cost_histogram=histograms.get(cluster.id),
+                computed_at=computed_at,
+            )
+        )
+    return details
+
+
+def centroids_to_bytes(centroids: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(centroids, dtype=np.float32), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def centroids_from_bytes(data: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(data), allow_pickle=False)
 
 
-def recalculate_clusters(db: Session, settings: Settings) -> int:
-    embeddings = vector_store.fetch_all_embeddings(settings)
+def _previous_centroids(db: Session, dim: int, segment_by: str | None) -> tuple[np.ndarray, list[str] | None] | None:
+    """Centroids of the latest successful run with the same segmentation and vector size.
+
+    Also returns the segment of every centroid for segmented runs.
+    """
+
+    row = db.execute(
+        select(ClusterRun.centroids, ClusterRun.centroid_segments)
+        .where(
+            ClusterRun.status == "succeeded",
+            ClusterRun.centroids.is_not(None),
+            ClusterRun.segment_by.is_(None) if segment_by is None else ClusterRun.segment_by == segment_by,
+        )
+        .order_by(ClusterRun.finished_at.desc(), ClusterRun.id.desc())
+        .limit(1)
+    ).one_or_none()
+    if row is None:
+        return None
+    centroids = centroids_from_bytes(row.centroids)
+    if centroids.ndim != 2 or centroids.shape[1] != dim or not len(centroids):
+        LOGGER.info("Stored centroids have shape %s, embeddings have %s dimensions; starting cold", centroids.shape, dim)
+        return None
+    return centroids, row.centroid_segments
+
+
+def _squared_distances(vectors: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    distances = (
+        np.einsum("ij,ij->i", vectors, vectors)[:, None]
+        - 2.0 * vectors @ centers.T
+        + np.einsum("ij,ij->i", centers, centers)[None, :]
+    )
+    return np.maximum(distances, 0.0)
+
+
+def warm_start_centroids(
+    previous: np.ndarray,
+    vectors: np.ndarray,
+    k: int,
+    reseed_distance_factor: float,
+    random_state: int = KMEANS_RANDOM_STATE,
+) -> tuple[np.ndarray, int]:
+    """Initial centroids for ``k`` clusters from the previous run's; also returns how many were re-seeded.
+
+    Previous centroids that still attract claims keep their place and order, so cluster
+    identities carry over. A claim is *far* when its distance to the nearest centroid
+    exceeds ``reseed_distance_factor`` times the median distance. New seeds are drawn by
+    k-means++ D² sampling from the far claims, i.e. where new mass has appeared:
+
+    * into slots left free by empty centroids or by a larger ``k``;
+    * in place of the lightest kept centroid, as long as the far claims outnumber it.
+    """
+
+    rng = np.random.default_rng(random_state)
+    previous = np.asarray(previous, dtype=vectors.dtype)
+    initial = _squared_distances(vectors, previous)
+    mass = np.bincount(initial.argmin(axis=1), minlength=len(previous))
+    kept = sorted(int(index) for index in np.argsort(-mass, kind="stable")[:k] if mass[index] > 0)
+    limit = reseed_distance_factor * float(np.median(np.sqrt(initial.min(axis=1))))
+
+    seeds: list[np.ndarray] = []
+    while len(seeds) < k:
+        centers = np.vstack([previous[kept], *seeds]) if kept or seeds else previous[:0]
+        nearest = _squared_distances(vectors, centers).min(axis=1) if len(centers) else np.ones(len(vectors))
+        far = np.sqrt(nearest) > limit
+        if len(centers) < k:
+            pool = np.flatnonzero(far) if far.any() else np.arange(len(vectors))
+        elif kept and far.sum() >= mass[min(kept, key=lambda index: mass[index])]:
+            kept.remove(min(kept, key=lambda index: mass[index]))
+            pool = np.flatnonzero(far)
+        else:
+            break
+        weights = nearest[pool]
+        total = float(weights.sum())
+        chosen = rng.choice(pool, p=weights / total) if total > 0 else rng.choice(pool)
+        seeds.append(vectors[chosen])
+
+    return np.vstack([previous[kept], *seeds]), len(seeds)
+
+
+@dataclass
+class KMeansFit:
+    labels: np.ndarray
+    distances: np.ndarray
+    centroids: np.ndarray
+    iterations: int
+    seconds: float
+    reseeded: int | None  # None for a cold start
+
+
+def outlier_scores(
+    labels: np.ndarray, distances: np.ndarray, num_centroids: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Robust z-scores of every claim's distance to its centroid, within its cluster.
+
+    A claim scores ``(distance - median) / (1.4826 * MAD)`` over its cluster's distances,
+    so scores compare across tight and loose clusters and a few far claims do not
+    inflate the scale. Clusters whose distances do not vary fall back to the scale of
+    all claims. Returns the median and scale of every centroid, which incremental
+    assignment reuses, and the score of every claim.
+    """
+
+    medians = np.zeros(num_centroids, dtype=np.float64)
+    scales = np.zeros(num_centroids, dtype=np.float64)
+    for label in np.unique(labels):
+        members = distances[labels == label]
+        medians[label] = np.median(members)
+        scales[label] = MAD_TO_STD * np.median(np.abs(members - medians[label]))
+    overall = MAD_TO_STD * np.median(np.abs(distances - np.median(distances)))
+    scales = np.where(scales > 0, scales, max(overall, MIN_DISTANCE_SCALE))
+    return medians, scales, (distances - medians[labels]) / scales[labels]
+
+
+def assign_new_claims(db: Session, settings: Settings, claims: Sequence[Claim], vectors: np.ndarray) -> int:
+    """Attach freshly embedded ``claims`` to their nearest leaf cluster and score them.
+
+    Uses the centroids and distance scales the last clustering run stored on the leaf
+    clusters, so new claims get an outlier score on arrival rather than at the next
+    recluster. With CLUSTERING_SEGMENT_BY set a claim only joins clusters of its own
+    segment and stays unassigned if there are none. Cluster statistics are left for the
+    next run to refresh. Returns how many claims were assigned; the caller commits.
+    """
+
+    if not claims:
+        return 0
+    leaves = db.execute(
+        select(Cluster.id, Cluster.segment, Cluster.centroid, Cluster.distance_median, Cluster.distance_scale)
+        .where(Cluster.level == 0, Cluster.centroid.is_not(None))
+        .order_by(Cluster.id)
+    ).all()
+    if not leaves:
+        return 0
+    centroids = np.vstack([np.frombuffer(leaf.centroid, dtype=np.float32) for leaf in leaves])
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if centroids.shape[1] != vectors.shape[1]:
+        LOGGER.warning("Stored centroids have %s dimensions, embeddings %s; skipping", centroids.shape[1], vectors.shape[1])
+        return 0
+
+    distances = np.sqrt(_squared_distances(vectors, centroids))
+    segment_by = settings.clustering_segment_by
+    if segment_by and any(leaf.segment is not None for leaf in leaves):
+        values = [getattr(claim, segment_by) for claim in claims]
+        keys = np.array([UNKNOWN_SEGMENT if value is None else str(value) for value in values], dtype=object)
+        segments = np.array([leaf.segment for leaf in leaves], dtype=object)
+        distances[keys[:, None] != segments[None, :]] = np.inf
+    nearest = np.argmin(distances, axis=1)
+    nearest_distances = distances[np.arange(len(claims)), nearest]
+    medians = np.array([leaf.distance_median for leaf in leaves], dtype=np.float64)
+    scales = np.array([leaf.distance_scale for leaf in leaves], dtype=np.float64)
+    scores = (nearest_distances - medians[nearest]) / scales[nearest]
+
+    assigned = 0
+    for claim, index, distance, score in zip(claims, nearest, nearest_distances, scores):
+        if not np.isfinite(distance):
+            continue
+        claim.cluster_id = leaves[index].id
+        claim.centroid_distance = float(distance)
+        claim.outlier_score = float(score)
+        assigned += 1
+    return assigned
+
+
+def _cluster_count(num_claims: int, settings: Settings) -> int:
+    return min(settings.num_clusters_default, max(2, num_claims // 50), num_claims)
+
+
+def _fit_kmeans(
+    vectors: np.ndarray,
+    k: int,
+    previous: np.ndarray | None,
+    reseed_distance_factor: float,
+) -> KMeansFit:
+    if previous is not None:
+        init, reseeded = warm_start_centroids(previous, vectors, k, reseed_distance_factor)
+        kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=KMEANS_RANDOM_STATE)
+    else:
+        reseeded = None
+        kmeans = KMeans(n_clusters=k, random_state=KMEANS_RANDOM_STATE, n_init=10)
+    started = time.perf_counter()
+    labels = kmeans.fit_predict(vectors)
+    seconds = time.perf_counter() - started
+    centroids = kmeans.cluster_centers_.astype(np.float32)
+    return KMeansFit(
+        labels=labels,
+        distances=np.linalg.norm(vectors - centroids[labels], axis=1),
+        centroids=centroids,
+        iterations=int(kmeans.n_iter_),
+        seconds=seconds,
+        reseeded=reseeded,
+    )
+
+
+def _fit_segment(
+    path: str,
+    shape: tuple[int, int],
+    start: int,
+    stop: int,
+    k: int,
+    previous: np.ndarray | None,
+    reseed_distance_factor: float,
+    threads: int | None = None,
+) -> KMeansFit:
+    """Cluster rows ``start:stop`` of the memory-mapped matrix; runs in a pool process.
+
+    Only the file path and row range cross the process boundary. ``threads`` caps the
+    BLAS/OpenMP threads so several workers do not oversubscribe the cores.
+    """
+
+    from threadpoolctl import threadpool_limits
+
+    vectors = np.memmap(path, dtype=np.float32, mode="r", shape=shape)[start:stop]
+    with threadpool_limits(limits=threads):
+        return _fit_kmeans(vectors, k, previous, reseed_distance_factor)
+
+
+def _segment_keys(db: Session, segment_by: str, claim_ids: List[int]) -> np.ndarray:
+    column = getattr(Claim, segment_by)
+    stmt = select(Claim.id, column).execution_options(yield_per=10000)
+    values = {claim_id: value for claim_id, value in db.execute(stmt)}
+    return np.array(
+        [UNKNOWN_SEGMENT if values.get(claim_id) is None else str(values[claim_id]) for claim_id in claim_ids],
+        dtype=object,
+    )
+
+
+def _fit_segments(
+    db: Session,
+    settings: Settings,
+    claim_ids: List[int],
+    vectors: np.ndarray,
+    previous: tuple[np.ndarray, list[str] | None] | None,
+) -> tuple[KMeansFit, list[str]]:
+    """Cluster each segment of ``vectors`` on its own, in parallel across processes.
+
+    Rows are reordered so that every segment is a contiguous block of one memory-mapped
+    file; pool workers map the file and read their block instead of receiving a pickled
+    copy. Returns the fits stitched back into the original row order, with labels
+    numbered across segments, and the segment of every centroid.
+    """
+
+    keys = _segment_keys(db, settings.clustering_segment_by, claim_ids)
+    order = np.argsort(keys, kind="stable")
+    names, starts = np.unique(keys[order], return_index=True)
+    stops = np.append(starts[1:], len(keys))
+
+    previous_by_segment: Dict[str, np.ndarray] = {}
+    if previous is not None and previous[1] is not None:
+        centroids, centroid_segments = previous
+        segments_of_rows = np.asarray(centroid_segments, dtype=object)
+        previous_by_segment = {name: centroids[segments_of_rows == name] for name in set(centroid_segments)}
+
+    workers = min(len(names), settings.clustering_workers or os.cpu_count() or 1)
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="warrantrix-clustering-") as workdir:
+        path = os.path.join(workdir, "vectors.f32")
+        matrix = np.memmap(path, dtype=np.float32, mode="w+", shape=vectors.shape)
+        matrix[:] = vectors[order]
+        matrix.flush()
+        del matrix
+
+        tasks = {
+            str(name): (
+                path,
+                vectors.shape,
+                int(start),
+                int(stop),
+                _cluster_count(int(stop - start), settings),
+                previous_by_segment.get(str(name)),
+                settings.cluster_reseed_distance_factor,
+            )
+            for name, start, stop in zip(names, starts, stops)
+        }
+        if workers > 1:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            # Spawned, not forked: the parent holds database connections and client threads.
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                # Largest segments first, so the pool does not finish on one big straggler.
+                largest_first = sorted(tasks, key=lambda name: tasks[name][3] - tasks[name][2], reverse=True)
+                futures = {name: pool.submit(_fit_segment, *tasks[name], threads) for name in largest_first}
+                fits = {name: future.result() for name, future in futures.items()}
+        else:
+            fits = {name: _fit_segment(*task) for name, task in tasks.items()}
+    seconds = time.perf_counter() - started
+
+    labels = np.empty(len(keys), dtype=np.int64)
+    distances = np.empty(len(keys), dtype=np.float32)
+    centroids: list[np.ndarray] = []
+    centroid_segments: list[str] = []
+    for name, start, stop in zip(names, starts, stops):
+        fit = fits[str(name)]
+        rows = order[start:stop]
+        labels[rows] = fit.labels + len(centroid_segments)
+        distances[rows] = fit.distances
+        centroids.append(fit.centroids)
+        centroid_segments.extend([str(name)] * len(fit.centroids))
+        LOGGER.debug(
+            "Segment %s: %s claims, k=%s, %s iterations in %.2fs",
+            name,
+            stop - start,
+            len(fit.centroids),
+            fit.iterations,
+            fit.seconds,
+        )
+
+    reseeded = [fit.reseeded for fit in fits.values() if fit.reseeded is not None]
+    combined = KMeansFit(
+        labels=labels,
+        distances=distances,
+        centroids=np.vstack(centroids),
+        iterations=sum(fit.iterations for fit in fits.values()),
+        seconds=seconds,
+        reseeded=sum(reseeded) if reseeded else None,
+    )
+    LOGGER.info(
+        "Clustered %s segments by %s on %s worker(s): %s centroids, %s iterations in total, %.2fs",
+        len(names),
+        settings.clustering_segment_by,
+        workers,
+        len(centroid_segments),
+        combined.iterations,
+        seconds,
+    )
+    return combined, centroid_segments
+
+
+def ward_agglomerate(centroids: np.ndarray, sizes: np.ndarray, target: int) -> np.ndarray:
+    """Merge centroids into ``target`` groups with size-weighted Ward linkage.
+
+    Returns the group of every centroid, numbered in the order of each group's first
+    member. Inputs are a few dozen leaf centroids, so the quadratic scan per merge is cheap.
+    """
+
+    centers = np.asarray(centroids, dtype=np.float64).copy()
+    weights = np.asarray(sizes, dtype=np.float64).copy()
+    members = [[index] for index in range(len(centers))]
+    active = list(range(len(centers)))
+    while len(active) > max(1, target):
+        w = weights[active]
+        cost = (w[:, None] * w[None, :] / (w[:, None] + w[None, :])) * _squared_distances(centers[active], centers[active])
+        np.fill_diagonal(cost, np.inf)
+        first, second = np.unravel_index(np.argmin(cost), cost.shape)
+        keep, merged = active[min(first, second)], active[max(first, second)]
+        total = weights[keep] + weights[merged]
+        centers[keep] = (weights[keep] * centers[keep] + weights[merged] * centers[merged]) / total
+        weights[keep] = total
+        members[keep].extend(members[merged])
+        active.remove(merged)
+
+    groups = np.empty(len(centers), dtype=np.int64)
+    for number, index in enumerate(sorted(active, key=lambda index: min(members[index]))):
+        groups[members[index]] = number
+    return groups
+
+
+def cluster_tree(
+    centroids: np.ndarray,
+    sizes: Sequence[float],
+    segments: Sequence[str | None],
+    branching: int,
+) -> List[np.ndarray]:
+    """The levels above the leaf clusters, each a partition of the level below.
+
+    Each level merges the nodes below it into about ``1 / branching`` as many with
+    :func:`ward_agglomerate`, never across segments, until every segment is down to a
+    single node. Returns, per level, the index of the parent of every node one level down.
+    """
+
+    branching = max(2, branching)
+    centers = np.asarray(centroids, dtype=np.float64)
+    weights = np.asarray(sizes, dtype=np.float64)
+    groups = list(segments)
+    levels: List[np.ndarray] = []
+    while len(groups) > len(set(groups)):
+        parents = np.empty(len(groups), dtype=np.int64)
+        next_centers: list[np.ndarray] = []
+        next_weights: list[float] = []
+        next_groups: list[str | None] = []
+        for group in dict.fromkeys(groups):
+            members = np.array([index for index, value in enumerate(groups) if value == group])
+            assignment = ward_agglomerate(centers[members], weights[members], -(-len(members) // branching))
+            for number in range(int(assignment.max()) + 1):
+                children = members[assignment == number]
+                parents[children] = len(next_groups)
+                next_centers.append(np.average(centers[children], axis=0, weights=weights[children]))
+                next_weights.append(float(weights[children].sum()))
+                next_groups.append(group)
+        levels.append(parents)
+        centers, weights, groups = np.vstack(next_centers), np.asarray(next_weights), next_groups
+    return levels
+
+
+def _merge_breakdowns(breakdowns: Iterable[list[dict]]) -> list[dict]:
+    totals: Dict[object, tuple[int, Decimal]] = {}
+    for entries in breakdowns:
+        for entry in entries:
+            count, cost = totals.get(entry["key"], (0, Decimal("0")))
+            totals[entry["key"]] = (count + entry["claim_count"], cost + Decimal(entry["total_cost_usd"]))
+    merged = [{"key": key, "claim_count": count, "total_cost_usd": str(cost)} for key, (count, cost) in totals.items()]
+    merged.sort(key=lambda entry: (-entry["claim_count"], entry["key"] is None, str(entry["key"])))
+    return merged
+
+
+def _build_hierarchy(
+    db: Session,
+    settings: Settings,
+    leaves: List[Cluster],
+    centroids: np.ndarray,
+    counters: Dict[int, tuple[Counter, Counter]],
+    details: List[ClusterDetail],
+) -> tuple[List[Cluster], List[ClusterDetail]]:
+    """Persist the levels of :func:`cluster_tree` above ``leaves`` as parent clusters.
+
+    Statistics, labels and breakdowns of each node are aggregated from its children in
+    one bottom-up pass; nothing is queried again. Representative claims are the
+    children's, ranked by the distance to their own leaf centroid. Claims stay assigned
+    to the leaves.
+    """
+
+    k = settings.cluster_representatives_k
+    details_by_cluster = {detail.cluster_id: detail for detail in details}
+    tree = cluster_tree(
+        centroids,
+        [leaf.num_claims for leaf in leaves],
+        [leaf.segment for leaf in leaves],
+        settings.cluster_hierarchy_branching,
+    )
+
+    nodes = leaves
+    node_counters = [counters[leaf.id] for leaf in leaves]
+    node_details = [details_by_cluster.get(leaf.id) for leaf in leaves]
+    created: List[Cluster] = []
+    created_details: List[ClusterDetail] = []
+    computed_at = datetime.utcnow()
+    for level, parents in enumerate(tree, start=1):
+        families = [np.flatnonzero(parents == parent) for parent in range(int(parents.max()) + 1)]
+        level_nodes: List[Cluster] = []
+        level_counters: list[tuple[Counter, Counter]] = []
+        for index, family in enumerate(families):
+            children = [nodes[child] for child in family]
+            components = sum((node_counters[child][0] for child in family), Counter())
+            dtcs = sum((node_counters[child][1] for child in family), Counter())
+            first_dates = [child.first_failure_date for child in children if child.first_failure_date]
+            last_dates = [child.last_failure_date for child in children if child.last_failure_date]
+            node = Cluster(
+                label=_compute_label(components, dtcs, index),
+                segment=children[0].segment,
+                level=level,
+                num_claims=sum(child.num_claims for child in children),
+                total_cost_usd=sum((child.total_cost_usd for child in children), Decimal("0.00")),
+                first_failure_date=min(first_dates, default=None),
+                last_failure_date=max(last_dates, default=None),
+                sample_dtc_codes=_sample_keys(dtcs),
+                sample_components=_sample_keys(components),
+            )
+            if node.segment is not None:
+                node.label = f"{node.segment}: {node.label}"
+            level_nodes.append(node)
+            level_counters.append((components, dtcs))
+        db.add_all(level_nodes)
+        db.flush()
+
+        level_details: list[ClusterDetail] = []
+        for node, family in zip(level_nodes, families):
+            child_details = [node_details[child] for child in family if node_details[child] is not None]
+            for child in family:
+                nodes[child].parent_id = node.id
+            representatives = sorted(
+                (claim for detail in child_details for claim in detail.representative_claims),
+                key=lambda claim: claim["distance"],
+            )[: max(k, 1)]
+            level_details.append(
+                ClusterDetail(
+                    cluster_id=node.id,
+                    representative_claims=representatives,
+                    model_breakdown=_merge_breakdowns(detail.model_breakdown for detail in child_details),
+                    region_breakdown=_merge_breakdowns(detail.region_breakdown for detail in child_details),
+                    cost_histogram=None,
+                    computed_at=computed_at,
+                )
+            )
+        created.extend(level_nodes)
+        created_details.extend(level_details)
+        nodes, node_counters, node_details = level_nodes, level_counters, level_details
+
+    LOGGER.info("Built a %s-level cluster tree with %s parent clusters", len(tree), len(created))
+    return created, created_details
+
+
+def recalculate_clusters(db: Session, settings: Settings, run: ClusterRun | None = None) -> int:
+    """Cluster every embedded claim and rebuild the clusters and their details.
+
+    With CLUSTERING_SEGMENT_BY set, every value of that claim field is clustered on its
+    own (see :func:`_fit_segments`) and the clusters are tagged with their segment.
+    KMeans starts from the centroids of the previous successful run with the same
+    segmentation when there is one (see :func:`warm_start_centroids`), otherwise from
+    k-means++ with ten restarts. When ``run`` is given, the final centroids and the KMeans
+    iteration count and wall time are recorded on it.
+    """
+
+    with stage_timer("clustering", "fetch_embeddings"):
+        embeddings = vector_store.fetch_all_embeddings(settings)
+    if settings.dedup_skip_duplicates and embeddings:
+        # Claims embedded before they were flagged would otherwise inflate their cluster.
+        duplicate_ids = set(db.execute(select(Claim.id).where(Claim.duplicate_of_id.is_not(None))).scalars())
+        embeddings = [embedding for embedding in embeddings if embedding.id not in duplicate_ids]
     if not embeddings:
         LOGGER.info("No embeddings available for clustering")
         return 0
@@ -82,61 +756,118 @@ def recalculate_clusters(db: Session, settings: Settings) -> int:
         return 0
 
     vectors = np.array([embedding.vector for embedding in embeddings], dtype=np.float32)
-    inferred_clusters = max(2, len(embeddings) // 50)
-    k = min(settings.num_clusters_default, inferred_clusters)
-    if k < 2:
-        k = 2
+    claim_ids = [embedding.id for embedding in embeddings]
+    segment_by = settings.clustering_segment_by
+    previous = _previous_centroids(db, vectors.shape[1], segment_by) if settings.cluster_warm_start else None
 
-    LOGGER.info("Running KMeans clustering with k=%s on %s claims", k, len(embeddings))
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-    labels = kmeans.fit_predict(vectors)
+    centroid_segments: list[str] | None = None
+    with stage_timer("clustering", "kmeans"):
+        if segment_by:
+            fit, centroid_segments = _fit_segments(db, settings, claim_ids, vectors, previous)
+        else:
+            k = _cluster_count(len(embeddings), settings)
+            LOGGER.info("Running KMeans clustering with k=%s on %s claims", k, len(embeddings))
+            fit = _fit_kmeans(
+                vectors, k, previous[0] if previous is not None else None, settings.cluster_reseed_distance_factor
+            )
+    labels, distances = fit.labels, fit.distances
+    if fit.reseeded is not None:
+        LOGGER.info(
+            "KMeans warm start (%s re-seeded): %s iterations in %.2fs", fit.reseeded, fit.iterations, fit.seconds
+        )
+    else:
+        LOGGER.info("KMeans cold start (n_init=10): %s iterations in the best restarts, %.2fs", fit.iterations, fit.seconds)
+    if run is not None:
+        run.centroids = centroids_to_bytes(fit.centroids)
+        run.segment_by = segment_by
+        run.centroid_segments = centroid_segments
+        run.warm_started = fit.reseeded is not None
+        run.reseeded_centroids = fit.reseeded
+        run.kmeans_iterations = fit.iterations
+        run.kmeans_seconds = round(fit.seconds, 3)
+    representatives = _representatives(labels, distances, claim_ids, settings.cluster_representatives_k)
+    medians, scales, scores = outlier_scores(labels, distances, len(fit.centroids))
+    score_rows = [
+        {"id": claim_id, "centroid_distance": float(distance), "outlier_score": float(score)}
+        for claim_id, distance, score in zip(claim_ids, distances, scores)
+    ]
 
     assignments: Dict[int, List[int]] = defaultdict(list)
     for embedding, label in zip(embeddings, labels):
         assignments[int(label)].append(embedding.id)
 
-    LOGGER.info("Clearing existing cluster assignments")
-    db.execute(update(Claim).values(cluster_id=None))
-    db.query(Cluster).delete(synchronize_session=False)
-    db.flush()
+    with stage_timer("clustering", "assign_claims"):
+        LOGGER.info("Clearing existing cluster assignments")
+        db.execute(update(Claim).values(cluster_id=None, centroid_distance=None, outlier_score=None))
+        db.query(ClusterDetail).delete(synchronize_session=False)
+        db.query(Cluster).delete(synchronize_session=False)
+        db.flush()
 
-    created_clusters = 0
-    payload_updates: dict[int, int] = {}
+        payload_updates: dict[int, int] = {}
+        clusters_by_label: Dict[int, Cluster] = {}
 
-    for index, (label, claim_ids) in enumerate(sorted(assignments.items())):
-        claim_rows = (
-            db.execute(select(Claim).where(Claim.id.in_(claim_ids))).scalars().all()
-        )
-        if not claim_rows:
-            continue
+        for index, (label, claim_ids) in enumerate(sorted(assignments.items())):
+            segment = centroid_segments[label] if centroid_segments is not None else None
+            cluster = Cluster(
+                label=f"Cluster {index + 1}",
+                segment=segment,
+                centroid=fit.centroids[label].astype(np.float32).tobytes(),
+                distance_median=float(medians[label]),
+                distance_scale=float(scales[label]),
+            )
+            db.add(cluster)
+            db.flush()
 
-        stats = _aggregate_cluster_stats(claim_rows, index)
-        cluster_label = stats.pop("label")
-        cluster = Cluster(
-            label=cluster_label or f"Cluster {index + 1}",
-            num_claims=stats["num_claims"],
-            total_cost_usd=stats["total_cost_usd"],
-            first_failure_date=stats["first_failure_date"],
-            last_failure_date=stats["last_failure_date"],
-            sample_dtc_codes=stats["sample_dtc_codes"],
-            sample_components=stats["sample_components"],
-        )
-        db.add(cluster)
-        db.flush()
+            assigned = db.execute(
+                update(Claim)
+                .where(Claim.id.in_(claim_ids))
+                .values(cluster_id=cluster.id)
+            ).rowcount
+            if not assigned:
+                db.delete(cluster)
+                continue
 
-        db.execute(
-            update(Claim)
-            .where(Claim.id.in_(claim_ids))
-            .values(cluster_id=cluster.id)
-        )
-        for claim_id in claim_ids:
-            payload_updates[claim_id] = cluster.id
+            for claim_id in claim_ids:
+                payload_updates[claim_id] = cluster.id
+            clusters_by_label[label] = cluster
 
-        created_clusters += 1
+        db.flush()
+    with stage_timer("clustering", "outlier_scores"):
+        # The vector store can still hold points of deleted claims; bulk updates by primary
+        # key must only name rows that exist.
+        assigned_ids = set(db.execute(select(Claim.id).where(Claim.cluster_id.is_not(None))).scalars())
+        score_rows = [row for row in score_rows if row["id"] in assigned_ids]
+        if score_rows:
+            db.execute(update(Claim), score_rows)
+    clusters = list(clusters_by_label.values())
+    counters: Dict[int, tuple[Counter, Counter]] = {}
+    with stage_timer("clustering", "aggregate_stats"):
+        stats_by_cluster = _aggregate_cluster_stats(db, [cluster.id for cluster in clusters])
+        for index, cluster in enumerate(clusters):
+            stats = stats_by_cluster[cluster.id]
+            counters[cluster.id] = (stats.pop("components"), stats.pop("dtcs"))
+            cluster.label = _compute_label(*counters[cluster.id], index)
+            if cluster.segment is not None:
+                cluster.label = f"{cluster.segment}: {cluster.label}"
+            for field, value in stats.items():
+                setattr(cluster, field, value)
+    with stage_timer("clustering", "build_details"):
+        details = _build_cluster_details(db, settings, clusters_by_label, representatives)
+    if settings.cluster_hierarchy and len(clusters) > 1:
+        with stage_timer("clustering", "build_hierarchy"):
+            _, parent_details = _build_hierarchy(
+                db, settings, clusters, fit.centroids[list(clusters_by_label)], counters, details
+            )
+        details.extend(parent_details)
+    db.add_all(details)
 
-    db.commit()
+    created_clusters = len(clusters)
+    with stage_timer("clustering", "commit"):
+        db.commit()
+    CLUSTERS_CREATED.inc(created_clusters)
     try:
-        vector_store.update_claim_cluster_payload(settings, payload_updates)
+        with stage_timer("clustering", "update_payloads"):
+            vector_store.update_claim_cluster_payload(settings, payload_updates)
     except Exception as exc:  # pragma: no cover - vector DB failures
         LOGGER.warning("Failed to update vector store payloads: %s", exc)
 
@@ -0,0 +1,257 @@
+"""Near-duplicate claim detection with MinHash signatures and LSH buckets.
+
+Dealers resubmit the same repair under a new claim_id. Each claim is reduced to a set of
+shingles: character shingles of the normalised symptom text and of the VIN, plus one
+token per DTC code. A MinHash signature of that set estimates Jaccard similarity. The
+signature is cut into ``dedup_bands`` bands and each band is hashed into a bucket stored
+in ``claim_lsh_buckets``, so candidates are found with indexed equality lookups rather
+than by comparing against every claim.
+
+The VIN makes up about half of every set, so identical symptoms on different vehicles
+score roughly 1/3 whatever the text length, while a resubmission for the same vehicle
+with lightly edited text stays above the default threshold.
+
+A duplicate links to the canonical (earliest) claim of its group, never to another
+duplicate, so every group is one level deep.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from collections import defaultdict
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..config import Settings
+from ..core.metrics import stage_timer
+from ..models import Claim, ClaimLshBucket
+from .ingest_service import parse_dtc_codes
+
+LOGGER = logging.getLogger(__name__)
+
+# Changing the seed, or DEDUP_NUM_PERM / DEDUP_BANDS, invalidates stored signatures;
+# run ``python -m app.dedup_claims --rebuild`` afterwards.
+MINHASH_SEED = 1_729
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+LOOKUP_CHUNK_SIZE = 500
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+def _normalise(text: object) -> str:
+    if not isinstance(text, str):
+        return ""
+    return _NON_ALPHANUMERIC.sub(" ", text.lower()).strip()
+
+
+def _char_shingles(text: str, size: int, prefix: str) -> set[str]:
+    if not text:
+        return set()
+    if len(text) <= size:
+        return {prefix + text}
+    return {prefix + text[start : start + size] for start in range(len(text) - size + 1)}
+
+
+def claim_shingles(vin: object, dtc_codes: object, symptom_text: object, size: int) -> set[str]:
+    """The set a claim's MinHash signature is computed over."""
+
+    shingles = _char_shingles(_normalise(symptom_text), size, "s:")
+    shingles |= {f"d:{code}" for code in parse_dtc_codes(dtc_codes)}
+    vin_shingles = _char_shingles(_normalise(vin).replace(" ", ""), size, "")
+    if vin_shingles:
+        # Repeat the VIN shingles until they are about half of the set, so the VIN
+        # weighs the same against a one-line symptom as against a paragraph.
+        copies = max(1, math.ceil(len(shingles) / len(vin_shingles)))
+        shingles |= {f"v{copy}:{shingle}" for copy in range(copies) for shingle in vin_shingles}
+    return shingles
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(MINHASH_SEED)
+    prime = int(MERSENNE_PRIME)
+    a = rng.integers(1, prime, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, prime, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(shingles: Iterable[str], num_perm: int) -> np.ndarray | None:
+    """A ``uint32`` MinHash signature of ``shingles``; ``None`` for an empty set."""
+
+    # blake2b rather than hash(): signatures are stored and must not depend on the
+    # interpreter's per-process string hash seed.
+    hashes = np.fromiter(
+        (int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little") for shingle in shingles),
+        dtype=np.uint64,
+    )
+    if not hashes.size:
+        return None
+    a, b = _permutations(num_perm)
+    # Universal hashing (a * x + b) mod p; the uint64 product wraps, as in datasketch.
+    permuted = (hashes[:, None] * a[None, :] + b[None, :]) % MERSENNE_PRIME & MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_buckets(signature: np.ndarray, bands: int) -> list[int]:
+    """One signed 64-bit bucket key per band of ``signature``."""
+
+    rows = len(signature) // bands
+    digests = (blake2b(signature[band * rows : (band + 1) * rows].tobytes(), digest_size=8) for band in range(bands))
+    return [int.from_bytes(digest.digest(), "little", signed=True) for digest in digests]
+
+
+def estimate_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the share of equal signature slots."""
+
+    return float(np.count_nonzero(left == right)) / len(left)
+
+
+def _chunks(values: list, size: int = LOOKUP_CHUNK_SIZE) -> Iterable[list]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _indexed_candidates(db: Session, buckets: dict[int, list[int]]) -> dict[int, set[int]]:
+    """Already indexed claims sharing at least one band bucket with each new claim."""
+
+    claims_by_key: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for claim_pk, keys in buckets.items():
+        for band, bucket in enumerate(keys):
+            claims_by_key[(band, bucket)].append(claim_pk)
+
+    candidates: dict[int, set[int]] = defaultdict(set)
+    bands = max((len(keys) for keys in buckets.values()), default=0)
+    for band in range(bands):
+        band_keys = sorted({keys[band] for keys in buckets.values()})
+        for chunk in _chunks(band_keys):
+            stmt = select(ClaimLshBucket.bucket, ClaimLshBucket.claim_id).where(
+                ClaimLshBucket.band == band, ClaimLshBucket.bucket.in_(chunk)
+            )
+            for bucket, other_pk in db.execute(stmt):
+                for claim_pk in claims_by_key[(band, bucket)]:
+                    if other_pk != claim_pk:
+                        candidates[claim_pk].add(other_pk)
+    return candidates
+
+
+def index_claims(db: Session, claims: Sequence, settings: Settings) -> int:
+    """Sign, bucket and link ``claims``; returns how many were flagged as duplicates.
+
+    ``claims`` are flushed ORM claims or rows with ``id``, ``vin``, ``dtc_codes`` and
+    ``symptom_text``. They are compared with every indexed claim and with the earlier
+    claims of the same batch. The caller commits.
+    """
+
+    num_perm = max(1, settings.dedup_num_perm)
+    bands = min(max(1, settings.dedup_bands), num_perm)
+    size = max(1, settings.dedup_shingle_size)
+
+    with stage_timer("dedup", "signatures"):
+        signatures: dict[int, np.ndarray] = {}
+        for claim in sorted(claims, key=lambda item: item.id):
+            shingles = claim_shingles(claim.vin, claim.dtc_codes, claim.symptom_text, size)
+            signature = minhash_signature(shingles, num_perm)
+            if signature is not None:
+                signatures[claim.id] = signature
+        if not signatures:
+            return 0
+        buckets = {claim_pk: band_buckets(signature, bands) for claim_pk, signature in signatures.items()}
+
+    with stage_timer("dedup", "lookup"):
+        candidates = _indexed_candidates(db, buckets)
+        indexed_ids = sorted({other_pk for others in candidates.values() for other_pk in others})
+        indexed: dict[int, tuple[np.ndarray, int | None]] = {}
+        for chunk in _chunks(indexed_ids):
+            stmt = select(Claim.id, Claim.minhash, Claim.duplicate_of_id).where(
+                Claim.id.in_(chunk), Claim.minhash.is_not(None)
+            )
+            for other_pk, minhash, duplicate_of_id in db.execute(stmt):
+                indexed[other_pk] = (np.frombuffer(minhash, dtype=np.uint32), duplicate_of_id)
+
+    links: dict[int, tuple[int, float]] = {}
+    seen_in_batch: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for claim_pk, signature in signatures.items():
+        matches = {other_pk: indexed[other_pk] for other_pk in candidates.get(claim_pk, ()) if other_pk in indexed}
+        for band, bucket in enumerate(buckets[claim_pk]):
+            for other_pk in seen_in_batch[(band, bucket)]:
+                canonical = links.get(other_pk)
+                matches[other_pk] = (signatures[other_pk], canonical[0] if canonical else None)
+            seen_in_batch[(band, bucket)].append(claim_pk)
+
+        # Most similar match wins; ties go to the oldest canonical claim.
+        best: tuple[float, int] | None = None
+        for other_pk, (other_signature, duplicate_of_id) in matches.items():
+            if len(other_signature) != len(signature):
+                continue
+            similarity = estimate_similarity(signature, other_signature)
+            if similarity < settings.dedup_threshold:
+                continue
+            candidate = (-similarity, duplicate_of_id or other_pk)
+            if best is None or candidate < best:
+                best = candidate
+        if best is not None and best[1] < claim_pk:
+            links[claim_pk] = (best[1], -best[0])
+
+    with stage_timer("dedup", "store"):
+        db.execute(
+            update(Claim),
+            [
+                {
+                    "id": claim_pk,
+                    "minhash": signature.tobytes(),
+                    "duplicate_of_id": links[claim_pk][0] if claim_pk in links else None,
+                    "duplicate_similarity": round(links[claim_pk][1], 4) if claim_pk in links else None,
+                }
+                for claim_pk, signature in signatures.items()
+            ],
+        )
+        db.execute(
+            insert(ClaimLshBucket),
+            [
+                {"band": band, "bucket": bucket, "claim_id": claim_pk}
+                for claim_pk, keys in buckets.items()
+                for band, bucket in enumerate(keys)
+            ],
+        )
+
+    if links:
+        LOGGER.info("Flagged %s of %s claims as near-duplicates", len(links), len(signatures))
+    return len(links)
+
+
+def reindex_claims(db: Session, settings: Settings, batch_size: int = 1000, rebuild: bool = False) -> dict:
+    """Index every claim without a signature, oldest first, committing per batch.
+
+    ``rebuild`` first drops all signatures, buckets and links, for example after changing
+    DEDUP_NUM_PERM, DEDUP_BANDS or DEDUP_SHINGLE_SIZE.
+    """
+
+    if rebuild:
+        db.execute(delete(ClaimLshBucket))
+        db.execute(update(Claim).values(minhash=None, duplicate_of_id=None, duplicate_similarity=None))
+        db.commit()
+
+    indexed = flagged = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Claim.id, Claim.vin, Claim.dtc_codes, Claim.symptom_text)
+            .where(Claim.id > last_id, Claim.minhash.is_(None))
+            .order_by(Claim.id)
+            .limit(max(1, batch_size))
+        ).all()
+        if not rows:
+            break
+        flagged += index_claims(db, rows, settings)
+        db.commit()
+        indexed += len(rows)
+        last_id = rows[-1].id
+    return {"indexed": indexed, "duplicates": flagged}
@@ -2,18 +2,40 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Iterable
+from typing import Callable, Iterable, Sequence
 
 from openai import OpenAI
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
 from ..config import Settings
+from ..core.metrics import CLAIMS_EMBEDDED, external_call, stage_timer
 from ..models import Claim
 from . import vector_store
+from .fake_embeddings import FakeEmbeddingClient
 
 LOGGER = logging.getLogger(__name__)
 
+# Arbitrary application-wide key for the advisory lock that serializes embedding rounds:
+# scheduler ticks in any process and the recluster job's embed stage. Without it they
+# would pick up the same pending claims and embed (and pay for) them twice.
+EMBEDDING_LOCK_KEY = 7_311_026
+
+
+def acquire_embedding_lock(db: Session, wait: bool = False) -> bool:
+    """Take the embedding lock until ``db``'s transaction ends; returns whether it was taken.
+
+    ``wait`` blocks until the holder is done instead of giving up. Off PostgreSQL there is
+    no advisory lock and this always succeeds.
+    """
+
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    if wait:
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": EMBEDDING_LOCK_KEY})
+        return True
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": EMBEDDING_LOCK_KEY}).scalar())
+
 
 def _build_embedding_input(claim: Claim) -> str:
     return (
@@ -33,14 +55,51 @@ def _batched(iterable: Iterable[Claim], size: int) -> Iterable[list[Claim]]:
         yield batch
 
 
-def _get_openai_client(settings: Settings) -> OpenAI | None:
+def _get_openai_client(settings: Settings) -> OpenAI | FakeEmbeddingClient | None:
+    if settings.embedding_provider == "fake":
+        return FakeEmbeddingClient(settings.embedding_dim)
     if not settings.openai_api_key:
         LOGGER.warning("OPENAI_API_KEY not configured; skipping embedding generation")
         return None
     return OpenAI(api_key=settings.openai_api_key)
 
 
-def embed_new_claims(db: Session, settings: Settings) -> int:
+def embed_query(settings: Settings, text: str) -> list[float] | None:
+    """Embed a search query with the claims' embedding model; ``None`` without a provider."""
+
+    client = _get_openai_client(settings)
+    if client is None:
+        return None
+    with external_call("openai", "embeddings"):
+        response = client.embeddings.create(model=settings.openai_embedding_model, input=[text])
+    return list(response.data[0].embedding)
+
+
+def pending_claim_ids(db: Session, limit: int, skip_duplicates: bool = False) -> list[int]:
+    """Ids of the oldest claims that have not been embedded yet."""
+
+    stmt = (
+        select(Claim.id)
+        .where(Claim.embedded_at.is_(None))
+        .order_by(Claim.id.asc())
+        .limit(limit)
+    )
+    if skip_duplicates:
+        stmt = stmt.where(Claim.duplicate_of_id.is_(None))
+    return list(db.execute(stmt).scalars().all())
+
+
+def embed_new_claims(
+    db: Session,
+    settings: Settings,
+    on_progress: Callable[..., None] | None = None,
+    claim_ids: Sequence[int] | None = None,
+) -> int:
+    """Embed claims without an embedding, or only those among ``claim_ids`` when given.
+
+    Claims flagged as near-duplicates are skipped when DEDUP_SKIP_DUPLICATES is set.
+    """
+
     client = _get_openai_client(settings)
     if client is None:
         return 0
@@ -50,7 +109,12 @@ def embed_new_claims(db: Session, settings: Settings) -> int:
         .where(Claim.embedded_at.is_(None))
         .order_by(Claim.id.asc())
     )
-    claims = db.execute(stmt).scalars().all()
+    if claim_ids is not None:
+        stmt = stmt.where(Claim.id.in_(claim_ids))
+    if settings.dedup_skip_duplicates:
+        stmt = stmt.where(Claim.duplicate_of_id.is_(None))
+    with stage_timer("embedding", "load_claims"):
+        claims = db.execute(stmt).scalars().all()
     if not claims:
         return 0
 
@@ -62,10 +126,11 @@ def embed_new_claims(db: Session, settings: Settings) -> int:
     for batch in _batched(claims, batch_size):
         inputs = [_build_embedding_input(claim) for claim in batch]
         try:
-            response = client.embeddings.create(
-                model=settings.openai_embedding_model,
-                input=inputs,
-            )
+            with stage_timer("embedding", "create_embeddings"), external_call("openai", "embeddings"):
+                response = client.embeddings.create(
+                    model=settings.openai_embedding_model,
+                    input=inputs,
+                )
         except Exception as exc:  # pragma: no cover - network errors
             LOGGER.exception("Failed to create embeddings: %s", exc)
             db.rollback()
@@ -77,40 +142,39 @@ def embed_new_claims(db: Session, settings: Settings) -> int:
             db.rollback()
             break
 
+        vectors = [list(data.embedding) for data in embeddings]  # type: ignore[attr-defined]
+        if settings.cluster_assign_on_embed:
+            # Imported here: clustering_service pulls in scikit-learn.
+            from .clustering_service import assign_new_claims
+
+            with stage_timer("embedding", "assign_clusters"):
+                assign_new_claims(db, settings, batch, vectors)
+
         points: list[vector_store.ClaimEmbedding] = []
         now = datetime.utcnow()
-        for claim, data in zip(batch, embeddings):
-            vector = list(data.embedding)  # type: ignore[attr-defined]
+        for claim, vector in zip(batch, vectors):
             claim.embedded_at = now
-            payload = {
-                "claim_id": claim.claim_id,
-                "model": claim.model,
-                "model_year": claim.model_year,
-                "region": claim.region,
-                "component": claim.component,
-                "part_number": claim.part_number,
-                "dtc_codes": claim.dtc_codes,
-                "symptom_text": claim.symptom_text,
-                "claim_cost_usd": float(claim.claim_cost_usd),
-                "failure_date": claim.failure_date.isoformat() if claim.failure_date else None,
-                "cluster_id": claim.cluster_id,
-            }
             points.append(
                 vector_store.ClaimEmbedding(
                     id=claim.id,
                     vector=vector,
-                    payload=payload,
+                    payload=vector_store.claim_payload(claim, settings),
                 )
             )
 
         try:
-            vector_store.upsert_claim_embeddings(settings, points)
+            with stage_timer("embedding", "upsert_vectors"):
+                vector_store.upsert_claim_embeddings(settings, points)
         except Exception as exc:  # pragma: no cover - vector DB failures
             LOGGER.exception("Failed to upsert embeddings to vector store: %s", exc)
             db.rollback()
             break
 
-        db.commit()
+        with stage_timer("embedding", "commit"):
+            db.commit()
         total_embedded += len(batch)
+        CLAIMS_EMBEDDED.inc(len(batch))
+        if on_progress is not None:
+            on_progress(embedded=total_embedded, last_claim_id=batch[-1].id)
 
     return total_embedded
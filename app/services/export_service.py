@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import Settings
+from ..models import Claim
+
+EXPORT_COLUMNS = (
+    "id",
+    "claim_id",
+    "vin",
+    "model",
+    "model_year",
+    "region",
+    "mileage_km",
+    "failure_date",
+    "component",
+    "part_number",
+    "dtc_codes",
+    "symptom_text",
+    "repair_action",
+    "claim_cost_usd",
+    "dealer_id",
+    "latitude",
+    "longitude",
+    "cluster_id",
+    "embedded_at",
+    "created_at",
+    "updated_at",
+)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def export_select() -> Select:
+    """Select the exported columns as plain row tuples, never as ORM instances."""
+
+    return select(*(getattr(Claim, column) for column in EXPORT_COLUMNS))
+
+
+async def _partitions(db: AsyncSession, stmt: Select, batch_size: int) -> AsyncIterator[Sequence[tuple]]:
+    # db.stream() runs on a server-side cursor, so only one partition of ``batch_size``
+    # rows is held in memory no matter how many rows match the filters.
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    try:
+        async for rows in result.partitions():
+            yield rows
+    finally:
+        await result.close()
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _CsvEncoder:
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def start(self) -> bytes:
+        self._writer.writerow(EXPORT_COLUMNS)
+        return self._drain()
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        self._writer.writerows(rows)
+        return self._drain()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _NdjsonEncoder:
+    def start(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        lines = (json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) for row in rows)
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever the Parquet writer emitted."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(),
+        "model_year": pa.int32(),
+        "mileage_km": pa.int64(),
+        "failure_date": pa.date32(),
+        "claim_cost_usd": pa.decimal128(12, 2),
+        "latitude": pa.float64(),
+        "longitude": pa.float64(),
+        "cluster_id": pa.int64(),
+        "embedded_at": pa.timestamp("us"),
+        "created_at": pa.timestamp("us"),
+        "updated_at": pa.timestamp("us"),
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column in EXPORT_COLUMNS])
+
+
+class _ParquetEncoder:
+    """Writes every partition as one row group; Parquet compresses each column chunk itself."""
+
+    def __init__(self) -> None:
+        import pyarrow.parquet as pq
+
+        self._schema = _parquet_schema()
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+
+    def start(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        import pyarrow as pa
+
+        columns = list(zip(*rows))
+        self._writer.write_table(
+            pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+                schema=self._schema,
+            )
+        )
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+EXPORT_ENCODERS = {
+    "csv": _CsvEncoder,
+    "ndjson": _NdjsonEncoder,
+    "parquet": _ParquetEncoder,
+}
+
+
+async def stream_claims_export(
+    db: AsyncSession,
+    settings: Settings,
+    stmt: Select,
+    export_format: str,
+    compress: bool,
+) -> AsyncIterator[bytes]:
+    encoder = EXPORT_ENCODERS[export_format]()
+    compressor = zlib.compressobj(settings.export_compression_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    header = emit(encoder.start())
+    if header:
+        yield header
+    async for rows in _partitions(db, stmt, max(1, settings.export_batch_size)):
+        data = emit(encoder.encode(rows))
+        if data:
+            yield data
+    tail = emit(encoder.finish())
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,60 @@
+"""Deterministic, offline stand-in for the OpenAI embeddings API.
+
+Each ``Key: value`` field of the embedding input contributes a fixed pseudo-random
+direction, so claims that share a model, component or DTC codes end up close together
+and clustering behaves much like it does on real embeddings.
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+NOISE_SCALE = 0.15
+
+
+@lru_cache(maxsize=4096)
+def _direction(token: str, dim: int) -> np.ndarray:
+    rng = np.random.default_rng(zlib.crc32(token.encode("utf-8")))
+    vector = rng.standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def fake_embedding(text: str, dim: int) -> list[float]:
+    vector = np.zeros(dim, dtype=np.float32)
+    for field in text.split(", "):
+        vector += _direction(field.strip(), dim)
+    noise = np.random.default_rng(zlib.crc32(text.encode("utf-8"))).standard_normal(dim).astype(np.float32)
+    vector += NOISE_SCALE * noise
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+@dataclass(slots=True)
+class _Embedding:
+    embedding: list[float]
+    index: int
+
+
+@dataclass(slots=True)
+class _EmbeddingResponse:
+    data: list[_Embedding]
+
+
+class _Embeddings:
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    def create(self, model: str, input: list[str]) -> _EmbeddingResponse:
+        return _EmbeddingResponse(
+            data=[_Embedding(embedding=fake_embedding(text, self.dim), index=index) for index, text in enumerate(input)]
+        )
+
+
+class FakeEmbeddingClient:
+    """Mimics the part of ``openai.OpenAI`` that the embedding service calls."""
+
+    def __init__(self, dim: int) -> None:
+        self.embeddings = _Embeddings(dim)
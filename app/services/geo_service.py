@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import TYPE_CHECKING, Sequence
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..config import Settings
+from ..models import Claim, GeoHotspot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+LOGGER = logging.getLogger(__name__)
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+KM_PER_DEGREE = 111.32
+
+
+@dataclass(slots=True)
+class GeoFilter:
+    min_lat: float | None = None
+    min_lon: float | None = None
+    max_lat: float | None = None
+    max_lon: float | None = None
+    near_lat: float | None = None
+    near_lon: float | None = None
+    radius_km: float | None = None
+
+    @property
+    def has_bbox(self) -> bool:
+        return None not in (self.min_lat, self.min_lon, self.max_lat, self.max_lon)
+
+    @property
+    def has_radius(self) -> bool:
+        return None not in (self.near_lat, self.near_lon, self.radius_km)
+
+
+def encode_geohashes(latitudes: Sequence[float], longitudes: Sequence[float], precision: int) -> list[str | None]:
+    """Vectorised geohash encoding; rows without valid coordinates map to ``None``."""
+
+    # numpy/pandas are imported where they are used: the claims API only needs GeoFilter
+    # and geo_conditions, and should not pay for loading them at startup.
+    import numpy as np
+
+    lat = np.asarray(latitudes, dtype=np.float64)
+    lon = np.asarray(longitudes, dtype=np.float64)
+    valid = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    if not len(lat):
+        return []
+
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    lat_cells = np.clip(np.floor((np.nan_to_num(lat) + 90.0) / 180.0 * (1 << lat_bits)), 0, (1 << lat_bits) - 1)
+    lon_cells = np.clip(np.floor((np.nan_to_num(lon) + 180.0) / 360.0 * (1 << lon_bits)), 0, (1 << lon_bits) - 1)
+    lat_cells = lat_cells.astype(np.int64)
+    lon_cells = lon_cells.astype(np.int64)
+
+    # Geohash interleaves longitude and latitude bits, starting with longitude.
+    code = np.zeros(len(lat), dtype=np.int64)
+    for position in range(total_bits):
+        if position % 2 == 0:
+            bit = (lon_cells >> (lon_bits - 1 - position // 2)) & 1
+        else:
+            bit = (lat_cells >> (lat_bits - 1 - position // 2)) & 1
+        code = (code << 1) | bit
+
+    shifts = 5 * np.arange(precision - 1, -1, -1, dtype=np.int64)
+    characters = np.array(list(GEOHASH_ALPHABET))[(code[:, None] >> shifts) & 31]
+    hashes = np.ascontiguousarray(characters.astype("<U1")).view(f"<U{precision}").ravel()
+    return [str(value) if ok else None for value, ok in zip(hashes, valid)]
+
+
+def geo_conditions(geo: GeoFilter | None) -> list:
+    """SQL conditions for bounding-box and radius filters on claim coordinates.
+
+    The radius filter first narrows to its enclosing box, which the (latitude, longitude)
+    index can serve, then applies an equirectangular distance check. Only arithmetic is
+    used, so the same expression runs on Postgres and SQLite.
+    """
+
+    if geo is None:
+        return []
+
+    conditions = []
+    if geo.has_bbox:
+        conditions.extend(
+            [
+                Claim.latitude.between(geo.min_lat, geo.max_lat),
+                Claim.longitude.between(geo.min_lon, geo.max_lon),
+            ]
+        )
+    if geo.has_radius:
+        lat_delta = geo.radius_km / KM_PER_DEGREE
+        lon_scale = max(math.cos(math.radians(geo.near_lat)), 1e-6)
+        lon_delta = lat_delta / lon_scale
+        dy = (Claim.latitude - geo.near_lat) * KM_PER_DEGREE
+        dx = (Claim.longitude - geo.near_lon) * (KM_PER_DEGREE * lon_scale)
+        conditions.extend(
+            [
+                Claim.latitude.between(geo.near_lat - lat_delta, geo.near_lat + lat_delta),
+                Claim.longitude.between(geo.near_lon - lon_delta, geo.near_lon + lon_delta),
+                dx * dx + dy * dy <= geo.radius_km * geo.radius_km,
+            ]
+        )
+    return conditions
+
+
+def compute_hotspots(cells: pd.DataFrame, min_claims: int, z_threshold: float) -> pd.DataFrame:
+    """Score (cluster, cell) counts against the count expected from the overall map.
+
+    ``cells`` holds one row per cluster and cell with ``claim_count``, ``total_cost_usd``
+    and coordinate sums. A cell is a hotspot for a cluster when it holds markedly more of
+    that cluster's claims than the cell's share of all claims predicts (Poisson z-score).
+    Rows with ``cluster_id`` set to ``None`` describe the cells across all claims.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    columns = ["cluster_id", "cell", "claim_count", "total_cost_usd", "latitude_sum", "longitude_sum"]
+    if cells.empty:
+        return cells.reindex(columns=columns + ["center_latitude", "center_longitude", "lift", "z_score", "is_hotspot"])
+
+    overall = cells.groupby("cell", as_index=False)[columns[2:]].sum()
+    overall["cluster_id"] = None
+    total_claims = overall["claim_count"].sum()
+    cell_share = overall.set_index("cell")["claim_count"] / total_claims
+
+    clustered = cells.dropna(subset=["cluster_id"]).copy()
+    cluster_totals = clustered.groupby("cluster_id")["claim_count"].transform("sum")
+    expected = cluster_totals * clustered["cell"].map(cell_share)
+    clustered["lift"] = (clustered["claim_count"] / cluster_totals) / clustered["cell"].map(cell_share)
+    clustered["z_score"] = (clustered["claim_count"] - expected) / np.sqrt(expected)
+
+    mean_per_cell = overall["claim_count"].mean()
+    overall["lift"] = overall["claim_count"] / mean_per_cell
+    overall["z_score"] = (overall["claim_count"] - mean_per_cell) / math.sqrt(mean_per_cell)
+
+    result = pd.concat([overall, clustered], ignore_index=True)
+    result["center_latitude"] = result["latitude_sum"] / result["claim_count"]
+    result["center_longitude"] = result["longitude_sum"] / result["claim_count"]
+    result["is_hotspot"] = (result["claim_count"] >= min_claims) & (result["z_score"] >= z_threshold)
+    return result
+
+
+def _to_money(value: float) -> Decimal:
+    return Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def recalculate_hotspots(db: Session, settings: Settings) -> int:
+    import pandas as pd
+
+    cell = func.substr(Claim.geohash, 1, settings.hotspot_geohash_precision).label("cell")
+    stmt = (
+        select(
+            Claim.cluster_id,
+            cell,
+            func.count(Claim.id).label("claim_count"),
+            func.coalesce(func.sum(Claim.claim_cost_usd), 0).label("total_cost_usd"),
+            func.sum(Claim.latitude).label("latitude_sum"),
+            func.sum(Claim.longitude).label("longitude_sum"),
+        )
+        .where(Claim.geohash.is_not(None))
+        .group_by(Claim.cluster_id, cell)
+    )
+    cells = pd.DataFrame(db.execute(stmt).mappings().all())
+    if not cells.empty:
+        for column in ("claim_count", "total_cost_usd", "latitude_sum", "longitude_sum"):
+            cells[column] = cells[column].astype(float)
+
+    hotspots = compute_hotspots(
+        cells,
+        min_claims=settings.hotspot_min_claims,
+        z_threshold=settings.hotspot_z_threshold,
+    )
+
+    computed_at = datetime.utcnow()
+    rows = [
+        {
+            "cluster_id": None if pd.isna(record["cluster_id"]) else int(record["cluster_id"]),
+            "cell": record["cell"],
+            "precision": settings.hotspot_geohash_precision,
+            "center_latitude": float(record["center_latitude"]),
+            "center_longitude": float(record["center_longitude"]),
+            "claim_count": int(record["claim_count"]),
+            "total_cost_usd": _to_money(record["total_cost_usd"]),
+            "lift": float(record["lift"]),
+            "z_score": float(record["z_score"]),
+            "is_hotspot": bool(record["is_hotspot"]),
+            "computed_at": computed_at,
+        }
+        for record in hotspots.to_dict(orient="records")
+    ]
+
+    db.execute(delete(GeoHotspot))
+    if rows:
+        db.execute(insert(GeoHotspot), rows)
+    db.commit()
+
+    LOGGER.info(
+        "Stored %s geo cells (%s hotspots)",
+        len(rows),
+        sum(1 for row in rows if row["is_hotspot"] and row["cluster_id"] is not None),
+    )
+    return len(rows)
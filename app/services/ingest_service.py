@@ -9,7 +9,10 @@ import pandas as pd
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
 
-from ..models import Claim
+from ..config import Settings
+from ..core.metrics import INGEST_ROWS
+from ..models import Claim, ClaimDtcCode
+from .geo_service import encode_geohashes
 
 
 @dataclass
@@ -19,8 +22,11 @@ class IngestSummary:
     total_cost_usd: Decimal
     earliest_failure_date: date | None
     latest_failure_date: date | None
+    duplicates: int = 0
 
 
+DTC_CODE_MAX_LENGTH = 32
+
 CSV_COLUMNS = [
     "claim_id",
     "vin",
@@ -41,7 +47,20 @@ CSV_COLUMNS = [
 ]
 
 
-def ingest_claims_from_csv(db: Session, file: UploadFile) -> IngestSummary:
+def parse_dtc_codes(raw: object) -> list[str]:
+    """Split a comma-separated DTC string into unique, upper-cased codes in order.
+
+    Fragments longer than ``DTC_CODE_MAX_LENGTH`` are free text rather than codes and are
+    left out of the index; the raw string is still stored on the claim.
+    """
+
+    if not isinstance(raw, str):
+        return []
+    codes = (code.strip().upper() for code in raw.split(","))
+    return list(dict.fromkeys(code for code in codes if code and len(code) <= DTC_CODE_MAX_LENGTH))
+
+
+def ingest_claims_from_csv(db: Session, file: UploadFile, settings: Settings) -> IngestSummary:
     file.file.seek(0)
     raw_data = file.file.read()
     df = pd.read_csv(StringIO(raw_data.decode("utf-8")))
@@ -56,12 +75,18 @@ def ingest_claims_from_csv(db: Session, file: UploadFile) -> IngestSummary:
 
     df["failure_date"] = pd.to_datetime(df["failure_date"]).dt.date
     df["claim_cost_usd"] = df["claim_cost_usd"].astype(float)
+    df["geohash"] = encode_geohashes(
+        pd.to_numeric(df["latitude"], errors="coerce").to_numpy(),
+        pd.to_numeric(df["longitude"], errors="coerce").to_numpy(),
+        settings.geohash_precision,
+    )
 
     earliest_failure_date: date | None = None
     latest_failure_date: date | None = None
     total_cost = Decimal("0")
 
     inserted = 0
+    claims: list[Claim] = []
     for record in df.to_dict(orient="records"):
         claim = Claim(
             claim_id=record["claim_id"],
@@ -80,8 +105,11 @@ def ingest_claims_from_csv(db: Session, file: UploadFile) -> IngestSummary:
             dealer_id=record["dealer_id"],
             latitude=float(record["latitude"]) if pd.notna(record["latitude"]) else None,
             longitude=float(record["longitude"]) if pd.notna(record["longitude"]) else None,
+            geohash=record["geohash"],
+            dtc_entries=[ClaimDtcCode(code=code) for code in parse_dtc_codes(record["dtc_codes"])],
         )
         db.add(claim)
+        claims.append(claim)
         inserted += 1
         total_cost += Decimal(str(record["claim_cost_usd"]))
 
@@ -92,7 +120,16 @@ def ingest_claims_from_csv(db: Session, file: UploadFile) -> IngestSummary:
             if latest_failure_date is None or failure_date > latest_failure_date:
                 latest_failure_date = failure_date
 
+    duplicates = 0
+    if settings.dedup_enabled and claims:
+        # Imported here: dedup_service itself imports parse_dtc_codes from this module.
+        from .dedup_service import index_claims
+
+        db.flush()
+        duplicates = index_claims(db, claims, settings)
+
     db.commit()
+    INGEST_ROWS.labels("inserted").inc(inserted)
 
     return IngestSummary(
         processed=processed,
@@ -100,4 +137,5 @@ def ingest_claims_from_csv(db: Session, file: UploadFile) -> IngestSummary:
         total_cost_usd=total_cost,
         earliest_failure_date=earliest_failure_date,
         latest_failure_date=latest_failure_date,
+        duplicates=duplicates,
     )
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import copy
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..models import Job
+
+LOGGER = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Job kinds live here rather than next to their handlers so enqueueing a job does not
+# import the (heavy) code that runs it.
+RECLUSTER_JOB = "recluster"
+
+Checkpoint = Callable[..., None]
+
+
+def _active_job(db: Session, kind: str) -> Job | None:
+    return (
+        db.execute(select(Job).where(Job.kind == kind, Job.status.in_(ACTIVE_STATUSES)).order_by(Job.created_at))
+        .scalars()
+        .first()
+    )
+
+
+def enqueue_job(db: Session, kind: str) -> tuple[Job, bool]:
+    """Queue a job of ``kind`` unless one is already queued or running.
+
+    Returns the job and whether it was newly created. Concurrent callers race on the
+    ``uq_jobs_active_kind`` index, so exactly one of them creates the job.
+    """
+
+    existing = _active_job(db, kind)
+    if existing is not None:
+        return existing, False
+
+    job = Job(id=uuid.uuid4().hex, kind=kind, status=QUEUED, stages={})
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing = _active_job(db, kind)
+        if existing is None:
+            raise
+        return existing, False
+    db.refresh(job)
+    return job, True
+
+
+def requeue_stale_jobs(db: Session, stale_after_seconds: float, max_attempts: int = 0) -> int:
+    """Hand jobs whose worker stopped sending heartbeats back to the queue.
+
+    A job that has already been claimed ``max_attempts`` times is marked failed instead,
+    so one that kills its worker every time does not hold its kind's slot forever.
+    ``max_attempts`` of 0 requeues without limit.
+    """
+
+    now = datetime.utcnow()
+    stale = (Job.status == RUNNING, Job.heartbeat_at < now - timedelta(seconds=stale_after_seconds))
+    abandoned = 0
+    if max_attempts > 0:
+        abandoned = db.execute(
+            update(Job)
+            .where(*stale, Job.attempts >= max_attempts)
+            .values(
+                status=FAILED,
+                worker_id=None,
+                finished_at=now,
+                error=f"Worker stopped responding on each of {max_attempts} attempt(s); giving up",
+            )
+        ).rowcount
+    requeued = db.execute(update(Job).where(*stale).values(status=QUEUED, worker_id=None)).rowcount
+    db.commit()
+    if abandoned:
+        LOGGER.error("Failed %s stale job(s) that reached %s attempts", abandoned, max_attempts)
+    if requeued:
+        LOGGER.warning("Requeued %s stale job(s)", requeued)
+    return requeued
+
+
+def claim_next_job(db: Session, worker_id: str) -> Job | None:
+    candidates = db.execute(
+        select(Job.id).where(Job.status == QUEUED).order_by(Job.created_at).limit(10)
+    ).scalars().all()
+    now = datetime.utcnow()
+    for job_id in candidates:
+        # Compare-and-set on the status, so two workers can never claim the same job.
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == QUEUED)
+            .values(
+                status=RUNNING,
+                worker_id=worker_id,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=Job.attempts + 1,
+            )
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    return None
+
+
+def touch_job(db: Session, job_id: str) -> None:
+    db.execute(update(Job).where(Job.id == job_id).values(heartbeat_at=datetime.utcnow()))
+    db.commit()
+
+
+class JobContext:
+    """Records per-stage status, timings and checkpoints of a running job.
+
+    Every update is written and committed through its own short session, so progress
+    stays visible (and survives) no matter what the stage does with its work session.
+    """
+
+    def __init__(self, session_factory: sessionmaker, job_id: str) -> None:
+        self.session_factory = session_factory
+        self.job_id = job_id
+
+    def _update_stages(self, mutate: Callable[[dict], None]) -> None:
+        with self.session_factory() as db:
+            job = db.get(Job, self.job_id)
+            stages = copy.deepcopy(job.stages or {})
+            mutate(stages)
+            job.stages = stages
+            job.heartbeat_at = datetime.utcnow()
+            db.commit()
+
+    def stage_state(self, name: str) -> dict:
+        with self.session_factory() as db:
+            job = db.get(Job, self.job_id)
+            return dict((job.stages or {}).get(name, {}))
+
+    def checkpoint(self, name: str, **values: Any) -> None:
+        def mutate(stages: dict) -> None:
+            stages.setdefault(name, {}).setdefault("checkpoint", {}).update(values)
+
+        self._update_stages(mutate)
+
+    def run_stage(self, name: str, fn: Callable[[Checkpoint], dict]) -> dict:
+        """Run ``fn`` as stage ``name`` unless a previous attempt already finished it."""
+
+        state = self.stage_state(name)
+        if state.get("status") == SUCCEEDED:
+            LOGGER.info("Job %s: stage %s already done, skipping", self.job_id, name)
+            return state.get("result") or {}
+
+        def start(stages: dict) -> None:
+            stage = stages.setdefault(name, {})
+            stage.update(status=RUNNING, started_at=datetime.utcnow().isoformat(), finished_at=None, error=None)
+
+        self._update_stages(start)
+        started = time.perf_counter()
+
+        def finish(status: str, **fields: Any) -> Callable[[dict], None]:
+            def mutate(stages: dict) -> None:
+                stages[name].update(
+                    status=status,
+                    finished_at=datetime.utcnow().isoformat(),
+                    duration_seconds=round(time.perf_counter() - started, 3),
+                    **fields,
+                )
+
+            return mutate
+
+        try:
+            result = fn(lambda **values: self.checkpoint(name, **values))
+        except Exception as exc:
+            self._update_stages(finish(FAILED, error=str(exc)))
+            raise
+        self._update_stages(finish(SUCCEEDED, result=result))
+        return result
+
+
+def run_job(
+    session_factory: sessionmaker,
+    job: Job,
+    handler: Callable[[JobContext], dict],
+) -> None:
+    context = JobContext(session_factory, job.id)
+    status, result, error = SUCCEEDED, None, None
+    try:
+        result = handler(context)
+    except Exception as exc:
+        LOGGER.exception("Job %s (%s) failed", job.id, job.kind)
+        status, error = FAILED, str(exc)
+
+    with session_factory() as db:
+        db.execute(
+            update(Job)
+            .where(Job.id == job.id)
+            .values(status=status, result=result, error=error, finished_at=datetime.utcnow())
+        )
+        db.commit()
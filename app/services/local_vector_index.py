@@ -0,0 +1,368 @@
+"""In-process vector index for deployments that don't run Qdrant.
+
+Vectors live in a memory-mapped float32 matrix (``vectors.f32``), normalised on
+insert so cosine similarity is a dot product. Payload fields are kept as column arrays:
+keyword fields are dictionary-encoded into int32 codes, integer fields are int64 with
+``MISSING`` for ``None``. Filters become boolean masks over those columns.
+
+Searches are exact NumPy top-k. Once a collection reaches ``ivf_min_points`` rows an
+inverted-file index (k-means coarse quantizer) narrows the scan to the ``ivf_probes``
+nearest lists; it is built in memory on first search and rebuilt as the data grows.
+
+One directory holds one index. Several processes may read it; writes take an exclusive
+``flock`` and readers pick changes up when ``meta.json`` changes.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+MISSING = np.iinfo(np.int64).min
+INITIAL_CAPACITY = 1024
+IVF_TRAIN_SAMPLE = 20_000
+IVF_TRAIN_ITERATIONS = 10
+
+# (field, operator, value) with operator "eq" or one of "gt", "gte", "lt", "lte".
+Condition = tuple[str, str, object]
+
+
+class LocalVectorIndex:
+    def __init__(
+        self,
+        path: Optional[str],
+        dim: int,
+        keyword_fields: Sequence[str],
+        integer_fields: Sequence[str],
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.dim = dim
+        self.keyword_fields = tuple(keyword_fields)
+        self.integer_fields = tuple(integer_fields)
+        self._lock = threading.RLock()
+        self._meta_mtime: int | None = None
+        self._ivf: _IvfIndex | None = None
+        self._reset()
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._refresh()
+
+    # -- storage -------------------------------------------------------------------
+
+    def _reset(self) -> None:
+        self.count = 0
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._keywords = {field: np.zeros(0, dtype=np.int32) for field in self.keyword_fields}
+        self._integers = {field: np.zeros(0, dtype=np.int64) for field in self.integer_fields}
+        self._vocabularies: dict[str, list[str]] = {field: [] for field in self.keyword_fields}
+        self._codes: dict[str, dict[str, int]] = {field: {} for field in self.keyword_fields}
+        self._rows: dict[int, int] = {}
+        self._ivf = None
+
+    def _file(self, name: str) -> Path:
+        return self.path / name
+
+    def _open_vectors(self, capacity: int) -> np.ndarray:
+        if self.path is None:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[: self.count] = self._vectors[: self.count]
+            return grown
+        vectors_path = self._file("vectors.f32")
+        with open(vectors_path, "ab") as handle:
+            if handle.tell() < capacity * self.dim * 4:
+                handle.truncate(capacity * self.dim * 4)
+        return np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _refresh(self) -> None:
+        """Reload the columns if another process changed the index since we last looked."""
+
+        if self.path is None:
+            return
+        meta_path = self._file("meta.json")
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Local vector index at {self.path} has dim {meta['dim']}, expected {self.dim}")
+        self._reset()
+        self.count = meta["count"]
+        self._vocabularies = {field: list(meta["vocabularies"].get(field, [])) for field in self.keyword_fields}
+        self._codes = {field: {value: code for code, value in enumerate(values)} for field, values in self._vocabularies.items()}
+        capacity = max(INITIAL_CAPACITY, self.count)
+        with np.load(self._file("columns.npz")) as columns:
+            self._ids = _grow(columns["ids"][: self.count], capacity, 0)
+            for field in self.keyword_fields:
+                stored = columns[f"kw_{field}"][: self.count] if f"kw_{field}" in columns else np.full(self.count, -1, np.int32)
+                self._keywords[field] = _grow(stored, capacity, -1)
+            for field in self.integer_fields:
+                stored = columns[f"int_{field}"][: self.count] if f"int_{field}" in columns else np.full(self.count, MISSING)
+                self._integers[field] = _grow(stored, capacity, MISSING)
+        self._vectors = self._open_vectors(capacity)
+        self._rows = {int(claim_id): row for row, claim_id in enumerate(self._ids[: self.count])}
+        self._meta_mtime = mtime
+
+    def _persist(self) -> None:
+        if self.path is None:
+            return
+        self._vectors.flush()
+        columns = {"ids": self._ids[: self.count]}
+        columns.update({f"kw_{field}": values[: self.count] for field, values in self._keywords.items()})
+        columns.update({f"int_{field}": values[: self.count] for field, values in self._integers.items()})
+        # Columns first, meta last: readers only reload when meta.json changes.
+        with open(self._file("columns.tmp.npz"), "wb") as handle:
+            np.savez(handle, **columns)
+        os.replace(self._file("columns.tmp.npz"), self._file("columns.npz"))
+        meta = {"dim": self.dim, "count": self.count, "vocabularies": self._vocabularies}
+        self._file("meta.tmp.json").write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(self._file("meta.tmp.json"), self._file("meta.json"))
+        self._meta_mtime = self._file("meta.json").stat().st_mtime_ns
+
+    @contextmanager
+    def _writing(self):
+        with self._lock:
+            if self.path is None:
+                yield
+                return
+            with open(self._file("lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()
+                    yield
+                    self._persist()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        capacity = max(INITIAL_CAPACITY, capacity)
+        while capacity < needed:
+            capacity *= 2
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        self._vectors = self._open_vectors(capacity)
+        self._ids = _grow(self._ids[: self.count], capacity, 0)
+        self._keywords = {field: _grow(values[: self.count], capacity, -1) for field, values in self._keywords.items()}
+        self._integers = {field: _grow(values[: self.count], capacity, MISSING) for field, values in self._integers.items()}
+
+    def _encode(self, field: str, value) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(self._vocabularies[field])
+            self._vocabularies[field].append(value)
+        return codes[value]
+
+    # -- operations ------------------------------------------------------------------
+
+    def upsert(self, points: Iterable[tuple[int, Sequence[float], dict]]) -> None:
+        points = list(points)
+        if not points:
+            return
+        with self._writing():
+            self._ensure_capacity(self.count + len(points))
+            for claim_id, vector, payload in points:
+                row = self._rows.get(int(claim_id))
+                if row is None:
+                    row = self.count
+                    self.count += 1
+                    self._rows[int(claim_id)] = row
+                    self._ids[row] = claim_id
+                elif self._ivf is not None:
+                    self._ivf.invalidate(row)
+                vector = np.asarray(vector, dtype=np.float32)
+                norm = float(np.linalg.norm(vector))
+                self._vectors[row] = vector / norm if norm else vector
+                for field in self.keyword_fields:
+                    self._keywords[field][row] = self._encode(field, payload.get(field))
+                for field in self.integer_fields:
+                    value = payload.get(field)
+                    self._integers[field][row] = MISSING if value is None else int(value)
+
+    def set_integer(self, field: str, values_by_id: dict[int, int]) -> None:
+        with self._writing():
+            column = self._integers[field]
+            for claim_id, value in values_by_id.items():
+                row = self._rows.get(int(claim_id))
+                if row is not None:
+                    column[row] = MISSING if value is None else int(value)
+
+    def payload(self, row: int) -> dict:
+        payload = {}
+        for field in self.keyword_fields:
+            code = int(self._keywords[field][row])
+            payload[field] = self._vocabularies[field][code] if code >= 0 else None
+        for field in self.integer_fields:
+            value = int(self._integers[field][row])
+            payload[field] = None if value == MISSING else value
+        return payload
+
+    def _mask(self, conditions: Sequence[Condition]) -> Optional[np.ndarray]:
+        if not conditions:
+            return None
+        mask = np.ones(self.count, dtype=bool)
+        for field, operator, value in conditions:
+            if field in self._keywords:
+                if operator != "eq":
+                    raise ValueError(f"Keyword payload field '{field}' only supports equality filters")
+                code = self._codes[field].get(str(value))
+                if code is None:
+                    return np.zeros(self.count, dtype=bool)
+                mask &= self._keywords[field][: self.count] == code
+            elif field in self._integers:
+                column = self._integers[field][: self.count]
+                mask &= column != MISSING
+                if operator == "eq":
+                    mask &= column == int(value)
+                elif operator == "gt":
+                    mask &= column > value
+                elif operator == "gte":
+                    mask &= column >= value
+                elif operator == "lt":
+                    mask &= column < value
+                elif operator == "lte":
+                    mask &= column <= value
+                else:
+                    raise ValueError(f"Unsupported filter operator '{operator}'")
+            else:
+                raise ValueError(f"Payload field '{field}' is not stored in the local vector index")
+        return mask
+
+    def search(
+        self,
+        vector: Sequence[float],
+        limit: int,
+        conditions: Sequence[Condition] = (),
+        *,
+        ivf_min_points: int = 0,
+        ivf_lists: int = 0,
+        ivf_probes: int = 8,
+    ) -> list[tuple[int, float, dict]]:
+        with self._lock:
+            self._refresh()
+            if not self.count or limit <= 0:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            norm = float(np.linalg.norm(query))
+            if norm:
+                query = query / norm
+
+            mask = self._mask(conditions)
+            vectors = self._vectors[: self.count]
+            if ivf_min_points and self.count >= ivf_min_points:
+                candidates = self._ivf_index(ivf_lists).candidates(query, ivf_probes)
+                if mask is not None:
+                    candidates = candidates[mask[candidates]]
+            elif mask is not None:
+                candidates = np.flatnonzero(mask)
+            else:
+                candidates = None
+
+            if candidates is None:
+                scores = vectors @ query
+                rows = np.arange(self.count)
+            else:
+                scores = vectors[candidates] @ query
+                rows = candidates
+            if not len(rows):
+                return []
+            top = min(limit, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            return [(int(self._ids[rows[i]]), float(scores[i]), self.payload(int(rows[i]))) for i in best]
+
+    def _ivf_index(self, lists: int) -> "_IvfIndex":
+        if self._ivf is None or self._ivf.stale(self.count):
+            lists = lists or max(1, int(np.sqrt(self.count)))
+            self._ivf = _IvfIndex.train(self._vectors[: self.count], lists)
+        self._ivf.assign_pending(self._vectors, self.count)
+        return self._ivf
+
+    def items(self) -> list[tuple[int, np.ndarray, dict]]:
+        with self._lock:
+            self._refresh()
+            vectors = np.array(self._vectors[: self.count])
+            return [(int(self._ids[row]), vectors[row], self.payload(row)) for row in range(self.count)]
+
+    def drop(self) -> None:
+        with self._lock:
+            if self.path is not None and self.path.exists():
+                shutil.rmtree(self.path)
+                self.path.mkdir(parents=True, exist_ok=True)
+            self._meta_mtime = None
+            self._reset()
+
+
+class _IvfIndex:
+    """k-means coarse quantizer: every row lives in the list of its nearest centroid."""
+
+    def __init__(self, centroids: np.ndarray, trained_count: int) -> None:
+        self.centroids = centroids
+        self.trained_count = trained_count
+        self.assignments = np.zeros(0, dtype=np.int32)
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, lists: int) -> "_IvfIndex":
+        rng = np.random.default_rng(0)
+        sample = vectors
+        if len(vectors) > IVF_TRAIN_SAMPLE:
+            sample = vectors[np.sort(rng.choice(len(vectors), IVF_TRAIN_SAMPLE, replace=False))]
+        sample = np.asarray(sample)
+        lists = min(lists, len(sample))
+        centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+        for _ in range(IVF_TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for index in range(lists):
+                members = sample[labels == index]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[index] = centroid / (np.linalg.norm(centroid) or 1.0)
+        LOGGER.info("Trained IVF index with %s lists on %s vectors", lists, len(sample))
+        return cls(centroids, len(vectors))
+
+    def stale(self, count: int) -> bool:
+        # Centroids drift as the data grows; retrain once the collection has doubled.
+        return count > 2 * self.trained_count
+
+    def invalidate(self, row: int) -> None:
+        if row < len(self.assignments):
+            self.assignments[row] = -1
+
+    def assign_pending(self, vectors: np.ndarray, count: int) -> None:
+        assigned = len(self.assignments)
+        if assigned < count:
+            new = np.argmax(np.asarray(vectors[assigned:count]) @ self.centroids.T, axis=1).astype(np.int32)
+            self.assignments = np.concatenate([self.assignments, new])
+        pending = np.flatnonzero(self.assignments[:count] < 0)
+        if len(pending):
+            self.assignments[pending] = np.argmax(np.asarray(vectors[pending]) @ self.centroids.T, axis=1)
+
+    def candidates(self, query: np.ndarray, probes: int) -> np.ndarray:
+        nearest = np.argsort(-(self.centroids @ query))[: max(1, probes)]
+        return np.flatnonzero(np.isin(self.assignments, nearest))
+
+
+def _grow(values: np.ndarray, capacity: int, fill) -> np.ndarray:
+    grown = np.full(capacity, fill, dtype=values.dtype)
+    grown[: len(values)] = values
+    return grown
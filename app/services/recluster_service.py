@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from ..config import Settings
+from ..models import Claim, ClusterRun
+from .ai_reasoning_service import update_ai_explanations_for_all_clusters
+from .clustering_service import recalculate_clusters
+from .embedding_service import acquire_embedding_lock, embed_new_claims
+from .geo_service import recalculate_hotspots
+from .job_service import Checkpoint, JobContext
+from .trend_service import recalculate_trends
+
+LOGGER = logging.getLogger(__name__)
+
+RECLUSTER_STAGES = ("embed", "cluster", "explain", "trends", "hotspots")
+
+
+def _cluster_stage(db, settings: Settings, context: JobContext, checkpoint: Checkpoint) -> dict:
+    run = ClusterRun(job_id=context.job_id, status="running")
+    db.add(run)
+    db.commit()
+    checkpoint(run_id=run.id)
+
+    try:
+        created = recalculate_clusters(db, settings, run=run)
+    except Exception:
+        db.rollback()
+        run.status = "failed"
+        run.finished_at = datetime.utcnow()
+        db.commit()
+        raise
+
+    run.status = "succeeded"
+    run.num_clusters = created
+    run.num_claims = db.execute(select(func.count(Claim.id)).where(Claim.cluster_id.is_not(None))).scalar_one()
+    run.finished_at = datetime.utcnow()
+    db.commit()
+    return {"run_id": run.id, "clusters_created": created}
+
+
+def _embed_stage(db, settings: Settings, context: JobContext, checkpoint: Checkpoint) -> dict:
+    # The lock lives in its own session: embed_new_claims commits per batch, which would
+    # release a transaction-scoped lock taken on ``db``.
+    with context.session_factory() as lock_db:
+        acquire_embedding_lock(lock_db, wait=True)
+        return {"embedded": embed_new_claims(db, settings, on_progress=checkpoint)}
+
+
+def run_recluster(context: JobContext, settings: Settings) -> dict:
+    """Embed, cluster, explain and refresh analytics, one checkpointed stage at a time.
+
+    A retried job skips the stages that already succeeded. Embedding and explanations
+    also resume inside their stage: both only pick up claims and clusters that still
+    lack their output.
+    """
+
+    with context.session_factory() as db:
+        stages = {
+            "embed": lambda checkpoint: _embed_stage(db, settings, context, checkpoint),
+            "cluster": lambda checkpoint: _cluster_stage(db, settings, context, checkpoint),
+            "explain": lambda checkpoint: {
+                "clusters_updated_with_ai": update_ai_explanations_for_all_clusters(db, settings, on_progress=checkpoint)
+            },
+            "trends": lambda checkpoint: {"trend_rows": recalculate_trends(db, settings)},
+            "hotspots": lambda checkpoint: {"hotspot_cells": recalculate_hotspots(db, settings)},
+        }
+        summary: dict = {}
+        for name in RECLUSTER_STAGES:
+            summary.update(context.run_stage(name, stages[name]))
+    return summary
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config import Settings
+from ..models import Claim, ClusterRun
+from .embedding_service import acquire_embedding_lock, embed_new_claims, pending_claim_ids
+from .job_service import RECLUSTER_JOB, enqueue_job
+
+LOGGER = logging.getLogger(__name__)
+
+def _chunks(ids: list[int], size: int) -> list[list[int]]:
+    return [ids[start : start + size] for start in range(0, len(ids), size)]
+
+
+def _embed_chunk(session_factory: sessionmaker, settings: Settings, claim_ids: list[int]) -> int:
+    with session_factory() as db:
+        return embed_new_claims(db, settings, claim_ids=claim_ids)
+
+
+def _embed_pending(db: Session, session_factory: sessionmaker, settings: Settings) -> int:
+    batch_size = max(1, settings.scheduler_embed_batch_size)
+    concurrency = max(1, settings.scheduler_embed_concurrency)
+    chunks = _chunks(
+        pending_claim_ids(db, batch_size * concurrency, skip_duplicates=settings.dedup_skip_duplicates), batch_size
+    )
+    if not chunks:
+        return 0
+    if len(chunks) == 1:
+        return _embed_chunk(session_factory, settings, chunks[0])
+    with ThreadPoolExecutor(max_workers=len(chunks), thread_name_prefix="embed") as executor:
+        return sum(executor.map(lambda chunk: _embed_chunk(session_factory, settings, chunk), chunks))
+
+
+def _recluster_due(db: Session, settings: Settings, now: datetime) -> str | None:
+    last_run_at = db.execute(
+        select(func.max(ClusterRun.finished_at)).where(ClusterRun.status == "succeeded")
+    ).scalar_one_or_none()
+
+    new_claims = select(func.count(Claim.id)).where(Claim.embedded_at.is_not(None))
+    if last_run_at is not None:
+        new_claims = new_claims.where(Claim.embedded_at > last_run_at)
+    pending = db.execute(new_claims).scalar_one()
+    if not pending:
+        return None
+
+    if last_run_at is None:
+        return f"{pending} claims embedded and no clustering run yet"
+    if pending >= settings.scheduler_recluster_min_new_claims:
+        return f"{pending} claims embedded since the last clustering run"
+    if now - last_run_at >= timedelta(
+        seconds=settings.scheduler_recluster_max_interval_seconds
+    ):
+        return f"{pending} claims waiting and no clustering run for too long"
+    return None
+
+
+def run_scheduler_tick(session_factory: sessionmaker, settings: Settings) -> dict:
+    """Embed one small round of pending claims, then queue a recluster if one is due."""
+
+    with session_factory() as db:
+        # Held for the whole tick, so other schedulers and a running embed stage skip or wait.
+        if not acquire_embedding_lock(db):
+            LOGGER.debug("Another scheduler or recluster job is embedding; skipping")
+            return {"skipped": True}
+
+        embedded = _embed_pending(db, session_factory, settings)
+        reason = _recluster_due(db, settings, datetime.utcnow())
+        job_id = None
+        if reason:
+            job, created = enqueue_job(db, RECLUSTER_JOB)
+            job_id = job.id
+            if created:
+                LOGGER.info("Queued recluster job %s: %s", job.id, reason)
+        db.commit()
+
+    return {"skipped": False, "embedded": embedded, "recluster_job_id": job_id}
+
+
+class PipelineScheduler:
+    """Calls :func:`run_scheduler_tick` every ``scheduler_interval_seconds`` on a daemon thread."""
+
+    def __init__(self, session_factory: sessionmaker, settings: Settings) -> None:
+        self.session_factory = session_factory
+        self.settings = settings
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_forever(self) -> None:
+        LOGGER.info("Scheduler ticking every %.0fs", self.settings.scheduler_interval_seconds)
+        while not self._stop.is_set():
+            try:
+                run_scheduler_tick(self.session_factory, self.settings)
+            except Exception:  # pragma: no cover - keep ticking through transient failures
+                LOGGER.exception("Scheduler tick failed")
+            self._stop.wait(self.settings.scheduler_interval_seconds)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run_forever, name="pipeline-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,145 @@
+"""Hybrid claim search: Postgres full-text ranking fused with vector similarity.
+
+Exact tokens such as DTC codes and part numbers are what embeddings handle worst and
+full-text search handles best; paraphrased symptoms are the reverse. Both candidate
+lists are fetched concurrently and merged with reciprocal rank fusion, which needs no
+score calibration between the two.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import Select, and_, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import Settings
+from ..core.metrics import stage_timer
+from ..models import Claim
+
+LOGGER = logging.getLogger(__name__)
+
+# Must match the configuration of the generated claims.search_vector column
+# (migration 20261025_add_claim_search_vector).
+TEXT_SEARCH_CONFIG = "english"
+
+# Only exists on PostgreSQL, so it is not mapped on the model.
+search_vector = literal_column("claims.search_vector", type_=TSVECTOR)
+
+SEARCHED_COLUMNS = (Claim.symptom_text, Claim.repair_action, Claim.dtc_codes, Claim.part_number)
+
+
+@dataclass(slots=True)
+class SearchHit:
+    claim_id: int
+    score: float
+    text_rank: Optional[int] = None
+    vector_rank: Optional[int] = None
+
+
+def _query_terms(query: str) -> list[str]:
+    return [term for term in re.split(r"[\s,]+", query.strip()) if term]
+
+
+async def text_search(db: AsyncSession, stmt: Select, query: str, limit: int) -> list[int]:
+    """Claim ids matching ``query``, best first.
+
+    ``stmt`` selects ``Claim.id`` with any filters applied. PostgreSQL ranks matches on
+    the GIN-indexed ``search_vector``; other databases fall back to a substring match
+    on every term (unranked, newest first), which is enough for tests and SQLite demos.
+    """
+
+    if db.bind.dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+        stmt = (
+            stmt.where(search_vector.op("@@")(tsquery))
+            .order_by(func.ts_rank_cd(search_vector, tsquery).desc(), Claim.id.desc())
+        )
+    else:
+        terms = _query_terms(query)
+        if not terms:
+            return []
+        stmt = stmt.where(
+            and_(*(or_(*(column.icontains(term, autoescape=True) for column in SEARCHED_COLUMNS)) for term in terms))
+        ).order_by(Claim.id.desc())
+    with stage_timer("search", "text"):
+        return list((await db.execute(stmt.limit(limit))).scalars().all())
+
+
+def vector_search(settings: Settings, query: str, limit: int, payload_filter=None) -> list[int]:
+    """Claim ids nearest to the embedded ``query``; empty when no embedding provider is set."""
+
+    # Imported here: the read API only loads the embedding client when a search runs.
+    from . import vector_store
+    from .embedding_service import embed_query
+
+    with stage_timer("search", "embed_query"):
+        vector = embed_query(settings, query)
+    if vector is None:
+        return []
+    with stage_timer("search", "vector"):
+        hits = vector_store.query_similar_claims(settings, vector, limit=limit, filter=payload_filter)
+    return [int(hit["id"]) for hit in hits]
+
+
+def vector_filter(settings: Settings, *, date_from=None, date_to=None, **matches):
+    """A payload filter over the criteria the vector store can evaluate.
+
+    Criteria on fields left out of QDRANT_PAYLOAD_FIELDS are dropped here; the SQL
+    filters applied to the vector hits afterwards still enforce them.
+    """
+
+    from .vector_store import payload_fields, payload_filter
+
+    stored = set(payload_fields(settings))
+    if "failure_date" not in stored:
+        date_from = date_to = None
+    return payload_filter(
+        date_from=date_from,
+        date_to=date_to,
+        **{field: value for field, value in matches.items() if field in stored},
+    )
+
+
+def reciprocal_rank_fusion(rankings: dict[str, Sequence[int]], k: int) -> list[SearchHit]:
+    """Score every id by ``sum(1 / (k + rank))`` over the rankings it appears in."""
+
+    hits: dict[int, SearchHit] = {}
+    for source, claim_ids in rankings.items():
+        for rank, claim_id in enumerate(claim_ids, start=1):
+            hit = hits.setdefault(claim_id, SearchHit(claim_id=claim_id, score=0.0))
+            hit.score += 1.0 / (k + rank)
+            setattr(hit, f"{source}_rank", rank)
+    return sorted(hits.values(), key=lambda hit: (-hit.score, -hit.claim_id))
+
+
+async def hybrid_search(
+    db: AsyncSession,
+    settings: Settings,
+    stmt: Select,
+    query: str,
+    limit: int,
+    payload_filter=None,
+) -> list[SearchHit]:
+    candidates = max(limit, settings.search_candidates)
+    text_ids, vector_ids = await asyncio.gather(
+        text_search(db, stmt, query, candidates),
+        asyncio.to_thread(vector_search, settings, query, candidates, payload_filter),
+        return_exceptions=True,
+    )
+    if isinstance(text_ids, BaseException):
+        raise text_ids
+    if isinstance(vector_ids, BaseException):
+        # Text results alone are still useful when the vector store is unavailable.
+        LOGGER.warning("Vector search failed; returning text matches only: %s", vector_ids)
+        vector_ids = []
+    if vector_ids:
+        # The vector store only knows the payload fields; apply the full SQL filters too.
+        allowed = set((await db.execute(stmt.where(Claim.id.in_(vector_ids)))).scalars())
+        vector_ids = [claim_id for claim_id in vector_ids if claim_id in allowed]
+    return reciprocal_rank_fusion({"text": text_ids, "vector": vector_ids}, settings.search_rrf_k)[:limit]
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ..config import Settings
+from ..models import Claim, Cluster, FailureTrend
+
+LOGGER = logging.getLogger(__name__)
+
+TREND_DIMENSIONS = {"cluster": "cluster_id", "component": "component"}
+
+_WEEKLY_COLUMNS = ["key", "week_start", "claim_count", "total_cost_usd"]
+_EXTRACT_COLUMNS = ["cluster_id", "component", "failure_date", "claim_cost_usd"]
+
+
+def _week_start(dates: pd.Series) -> pd.Series:
+    timestamps = pd.to_datetime(dates)
+    return (timestamps - pd.to_timedelta(timestamps.dt.weekday, unit="D")).dt.normalize()
+
+
+def _extract_weekly_counts(db: Session, settings: Settings) -> pd.DataFrame:
+    """Stream the claims table and reduce it to weekly counts per cluster and component.
+
+    Each partition is aggregated before the next one is fetched, so memory is bounded
+    by the number of (cluster, component, week) groups rather than by the claim count.
+    """
+
+    stmt = select(
+        Claim.cluster_id,
+        Claim.component,
+        Claim.failure_date,
+        Claim.claim_cost_usd,
+    ).execution_options(yield_per=max(1, settings.trend_extract_batch_size))
+
+    partials: list[pd.DataFrame] = []
+    for rows in db.execute(stmt).partitions():
+        chunk = pd.DataFrame(rows, columns=_EXTRACT_COLUMNS)
+        chunk["week_start"] = _week_start(chunk["failure_date"])
+        chunk["claim_cost_usd"] = chunk["claim_cost_usd"].astype(float)
+        partials.append(
+            chunk.groupby(["cluster_id", "component", "week_start"], dropna=False).agg(
+                claim_count=("failure_date", "size"),
+                total_cost_usd=("claim_cost_usd", "sum"),
+            )
+        )
+
+    if not partials:
+        return pd.DataFrame(columns=["cluster_id", "component", "week_start", "claim_count", "total_cost_usd"])
+
+    return pd.concat(partials).groupby(level=[0, 1, 2], dropna=False).sum().reset_index()
+
+
+def compute_weekly_trends(
+    weekly: pd.DataFrame,
+    *,
+    rolling_weeks: int,
+    baseline_weeks: int,
+    spike_rule: str,
+    ewma_alpha: float,
+    control_limit_sigma: float,
+    min_spike_claims: int,
+) -> pd.DataFrame:
+    """Compute rolling totals, EWMA and control limits for weekly counts keyed by ``key``.
+
+    Weeks without claims are filled with zeros from each key's first claim onwards. The
+    baseline for week ``t`` only uses the ``baseline_weeks`` weeks before it, so a spike
+    never inflates its own control limit.
+    """
+
+    if weekly.empty:
+        return weekly.reindex(columns=_WEEKLY_COLUMNS)
+
+    weekly = weekly.groupby(["key", "week_start"])[["claim_count", "total_cost_usd"]].sum()
+    week_values = weekly.index.get_level_values("week_start")
+    weeks = pd.date_range(week_values.min(), week_values.max(), freq="7D")
+    keys = weekly.index.get_level_values("key").unique()
+    frame = weekly.reindex(
+        pd.MultiIndex.from_product([keys, weeks], names=["key", "week_start"]),
+        fill_value=0,
+    )
+    frame = frame[frame.groupby(level="key")["claim_count"].cumsum() > 0].copy()
+
+    counts = frame.groupby(level="key")["claim_count"]
+    costs = frame.groupby(level="key")["total_cost_usd"]
+    window = max(1, rolling_weeks)
+    history = max(2, baseline_weeks)
+
+    frame["rolling_claim_count"] = counts.transform(lambda s: s.rolling(window, min_periods=1).sum())
+    frame["rolling_cost_usd"] = costs.transform(lambda s: s.rolling(window, min_periods=1).sum())
+    frame["ewma"] = counts.transform(lambda s: s.ewm(alpha=ewma_alpha, adjust=False).mean())
+    frame["baseline_mean"] = counts.transform(lambda s: s.shift(1).rolling(history, min_periods=2).mean())
+    baseline_std = counts.transform(lambda s: s.shift(1).rolling(history, min_periods=2).std())
+
+    # Weekly claim counts are roughly Poisson: a flat history must not collapse the
+    # limit onto the mean, otherwise a single extra claim would raise an alert.
+    sigma = np.maximum(baseline_std.fillna(0.0), np.sqrt(frame["baseline_mean"].clip(lower=1.0)))
+    if spike_rule == "ewma":
+        spread = sigma * np.sqrt(ewma_alpha / (2.0 - ewma_alpha))
+        statistic = frame["ewma"]
+    else:
+        spread = sigma
+        statistic = frame["claim_count"]
+
+    frame["upper_control_limit"] = frame["baseline_mean"] + control_limit_sigma * spread
+    frame["is_spike"] = (
+        frame["baseline_mean"].notna()
+        & (statistic > frame["upper_control_limit"])
+        & (frame["claim_count"] >= min_spike_claims)
+    )
+    return frame.reset_index()
+
+
+def _to_money(value: float) -> Decimal:
+    return Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _optional_float(value) -> float | None:
+    return None if pd.isna(value) else float(value)
+
+
+def recalculate_trends(db: Session, settings: Settings) -> int:
+    weekly = _extract_weekly_counts(db, settings)
+    cluster_labels = dict(db.execute(select(Cluster.id, Cluster.label)).all())
+    computed_at = datetime.utcnow()
+
+    rows: list[dict] = []
+    for dimension, column in TREND_DIMENSIONS.items():
+        per_key = weekly.dropna(subset=[column]).rename(columns={column: "key"})
+        if dimension == "cluster":
+            per_key["key"] = per_key["key"].astype(int)
+
+        trends = compute_weekly_trends(
+            per_key[_WEEKLY_COLUMNS],
+            rolling_weeks=settings.trend_rolling_weeks,
+            baseline_weeks=settings.trend_baseline_weeks,
+            spike_rule=settings.trend_spike_rule,
+            ewma_alpha=settings.trend_ewma_alpha,
+            control_limit_sigma=settings.trend_control_limit_sigma,
+            min_spike_claims=settings.trend_min_spike_claims,
+        )
+        for record in trends.to_dict(orient="records"):
+            key = record["key"]
+            rows.append(
+                {
+                    "dimension": dimension,
+                    "dimension_key": str(key),
+                    "label": cluster_labels.get(key) if dimension == "cluster" else key,
+                    "week_start": record["week_start"].date(),
+                    "claim_count": int(record["claim_count"]),
+                    "total_cost_usd": _to_money(record["total_cost_usd"]),
+                    "rolling_claim_count": int(record["rolling_claim_count"]),
+                    "rolling_cost_usd": _to_money(record["rolling_cost_usd"]),
+                    "ewma": _optional_float(record["ewma"]),
+                    "baseline_mean": _optional_float(record["baseline_mean"]),
+                    "upper_control_limit": _optional_float(record["upper_control_limit"]),
+                    "is_spike": bool(record["is_spike"]),
+                    "computed_at": computed_at,
+                }
+            )
+
+    db.execute(delete(FailureTrend))
+    if rows:
+        db.execute(insert(FailureTrend), rows)
+    db.commit()
+
+    LOGGER.info(
+        "Stored %s weekly trend rows (%s spikes)",
+        len(rows),
+        sum(1 for row in rows if row["is_spike"]),
+    )
+    return len(rows)
@@ -1,23 +1,47 @@
 from __future__ import annotations
 
+import calendar
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
+from datetime import date, datetime
 from functools import lru_cache
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Sequence
 
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qmodels
 
 from ..config import Settings
+from ..core.metrics import timed_external_call
+from ..models import Claim
+from .local_vector_index import Condition, LocalVectorIndex
 
 LOGGER = logging.getLogger(__name__)
 
+# Readers and writers always go through this name. It is a Qdrant alias pointing at a
+# versioned physical collection, so the collection can be rebuilt with a different
+# storage layout and swapped in without touching callers.
 COLLECTION_NAME = "claim_embeddings"
-OPENAI_EMBEDDING_DIM = 1536
+IN_MEMORY_URL = ":memory:"
+
+# Points only carry the fields searches filter on; everything else is read from the
+# database by id (see search_claims in app/routers/claims.py). failure_date is stored
+# as epoch seconds so it can be range-filtered through an integer index.
+PAYLOAD_SCHEMA = {
+    "model": qmodels.PayloadSchemaType.KEYWORD,
+    "model_year": qmodels.PayloadSchemaType.INTEGER,
+    "region": qmodels.PayloadSchemaType.KEYWORD,
+    "component": qmodels.PayloadSchemaType.KEYWORD,
+    "failure_date": qmodels.PayloadSchemaType.INTEGER,
+    "cluster_id": qmodels.PayloadSchemaType.INTEGER,
+}
 
 
 @lru_cache(maxsize=1)
 def _get_client(url: str, api_key: Optional[str]) -> QdrantClient:
+    if url == IN_MEMORY_URL:
+        # Local in-process mode for offline runs; cached so every caller sees the same data.
+        return QdrantClient(location=IN_MEMORY_URL)
     return QdrantClient(url=url, api_key=api_key)
 
 
@@ -25,6 +49,45 @@ def get_client(settings: Settings) -> QdrantClient:
     return _get_client(settings.qdrant_url, settings.qdrant_api_key)
 
 
+def uses_local_index(settings: Settings) -> bool:
+    return settings.vector_backend == "local"
+
+
+@lru_cache(maxsize=4)
+def _get_local_index(path: str, dim: int) -> LocalVectorIndex:
+    keyword_fields = [field for field, kind in PAYLOAD_SCHEMA.items() if kind == qmodels.PayloadSchemaType.KEYWORD]
+    integer_fields = [field for field, kind in PAYLOAD_SCHEMA.items() if kind == qmodels.PayloadSchemaType.INTEGER]
+    return LocalVectorIndex(None if path == IN_MEMORY_URL else path, dim, keyword_fields, integer_fields)
+
+
+def get_local_index(settings: Settings) -> LocalVectorIndex:
+    return _get_local_index(settings.local_vector_path, settings.embedding_dim)
+
+
+def _local_conditions(qdrant_filter: Optional[qmodels.Filter]) -> list[Condition]:
+    """Translate the Filter shapes payload_filter builds into local index conditions."""
+
+    if qdrant_filter is None:
+        return []
+    if qdrant_filter.should or qdrant_filter.must_not or qdrant_filter.min_should:
+        raise ValueError("The local vector index only supports 'must' filters")
+    must = qdrant_filter.must or []
+    conditions: list[Condition] = []
+    for condition in must if isinstance(must, list) else [must]:
+        if not isinstance(condition, qmodels.FieldCondition):
+            raise ValueError("The local vector index only supports field conditions")
+        if isinstance(condition.match, qmodels.MatchValue):
+            conditions.append((condition.key, "eq", condition.match.value))
+        elif isinstance(condition.range, qmodels.Range):
+            for operator in ("gt", "gte", "lt", "lte"):
+                bound = getattr(condition.range, operator)
+                if bound is not None:
+                    conditions.append((condition.key, operator, bound))
+        else:
+            raise ValueError(f"Unsupported filter on '{condition.key}' for the local vector index")
+    return conditions
+
+
 @dataclass(slots=True)
 class ClaimEmbedding:
     id: int
@@ -32,33 +95,278 @@ class ClaimEmbedding:
     payload: dict
 
 
-def init_vector_store(settings: Settings) -> None:
+def payload_fields(settings: Settings) -> tuple[str, ...]:
+    unknown = set(settings.qdrant_payload_fields) - PAYLOAD_SCHEMA.keys()
+    if unknown:
+        raise ValueError(f"Unsupported QDRANT_PAYLOAD_FIELDS: {', '.join(sorted(unknown))}")
+    return tuple(settings.qdrant_payload_fields)
+
+
+def date_to_epoch(value: date) -> int:
+    return calendar.timegm(value.timetuple())
+
+
+def _payload_value(field: str, value):
+    if field == "failure_date" and value is not None:
+        if isinstance(value, str):
+            value = date.fromisoformat(value)
+        return date_to_epoch(value)
+    return value
+
+
+def claim_payload(claim: Claim, settings: Settings) -> dict:
+    return {field: _payload_value(field, getattr(claim, field)) for field in payload_fields(settings)}
+
+
+def _slim_payload(payload: dict, fields: Sequence[str]) -> dict:
+    # Points written before the payload was slimmed carry the whole claim.
+    return {field: _payload_value(field, payload[field]) for field in fields if field in payload}
+
+
+def payload_filter(
+    *,
+    model: Optional[str] = None,
+    model_year: Optional[int] = None,
+    region: Optional[str] = None,
+    component: Optional[str] = None,
+    cluster_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Optional[qmodels.Filter]:
+    conditions = [
+        qmodels.FieldCondition(key=key, match=qmodels.MatchValue(value=value))
+        for key, value in (
+            ("model", model),
+            ("model_year", model_year),
+            ("region", region),
+            ("component", component),
+            ("cluster_id", cluster_id),
+        )
+        if value is not None
+    ]
+    if date_from is not None or date_to is not None:
+        conditions.append(
+            qmodels.FieldCondition(
+                key="failure_date",
+                range=qmodels.Range(
+                    gte=date_to_epoch(date_from) if date_from else None,
+                    lte=date_to_epoch(date_to) if date_to else None,
+                ),
+            )
+        )
+    return qmodels.Filter(must=conditions) if conditions else None
+
+
+def _quantization_config(settings: Settings):
+    if settings.qdrant_quantization == "scalar":
+        return qmodels.ScalarQuantization(
+            scalar=qmodels.ScalarQuantizationConfig(
+                type=qmodels.ScalarType.INT8,
+                quantile=settings.qdrant_scalar_quantile,
+                always_ram=settings.qdrant_quantization_always_ram,
+            )
+        )
+    if settings.qdrant_quantization == "binary":
+        return qmodels.BinaryQuantization(
+            binary=qmodels.BinaryQuantizationConfig(always_ram=settings.qdrant_quantization_always_ram)
+        )
+    return None
+
+
+def collection_config(settings: Settings) -> dict:
+    """Keyword arguments for ``create_collection`` built from the QDRANT_* settings."""
+
+    return {
+        "vectors_config": qmodels.VectorParams(
+            size=settings.embedding_dim,
+            distance=qmodels.Distance.COSINE,
+            on_disk=settings.qdrant_on_disk_vectors,
+        ),
+        "hnsw_config": qmodels.HnswConfigDiff(
+            m=settings.qdrant_hnsw_m,
+            ef_construct=settings.qdrant_hnsw_ef_construct,
+        ),
+        "quantization_config": _quantization_config(settings),
+        "on_disk_payload": settings.qdrant_on_disk_payload,
+    }
+
+
+def search_params(settings: Settings) -> qmodels.SearchParams:
+    quantization = None
+    if settings.qdrant_quantization != "none":
+        # Quantized scores only pick candidates; rescoring re-ranks the oversampled
+        # candidates with the original vectors so recall stays close to exact search.
+        quantization = qmodels.QuantizationSearchParams(
+            rescore=settings.qdrant_search_rescore,
+            oversampling=settings.qdrant_search_oversampling,
+        )
+    return qmodels.SearchParams(hnsw_ef=settings.qdrant_hnsw_ef, quantization=quantization)
+
+
+def _versioned_name() -> str:
+    return f"{COLLECTION_NAME}_{datetime.utcnow():%Y%m%d%H%M%S%f}"
+
+
+def current_collection(client: QdrantClient) -> Optional[str]:
+    """The physical collection behind ``COLLECTION_NAME``, if there is one.
+
+    Deployments from before the alias was introduced have a plain collection under that
+    name; it is returned as is.
+    """
+
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == COLLECTION_NAME:
+            return alias.collection_name
+    return COLLECTION_NAME if client.collection_exists(COLLECTION_NAME) else None
+
+
+def create_payload_indexes(client: QdrantClient, collection_name: str, settings: Settings) -> None:
+    for field in payload_fields(settings):
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field,
+            field_schema=PAYLOAD_SCHEMA[field],
+        )
+
+
+def _point_alias_at(client: QdrantClient, collection_name: str, *, replace: bool) -> None:
+    operations = []
+    if replace:
+        operations.append(qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=COLLECTION_NAME)))
+    operations.append(
+        qmodels.CreateAliasOperation(
+            create_alias=qmodels.CreateAlias(collection_name=collection_name, alias_name=COLLECTION_NAME)
+        )
+    )
+    # Qdrant applies the alias changes of one request atomically.
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+
+@timed_external_call("qdrant", "init_collection")
+def _init_qdrant(settings: Settings) -> None:
     client = get_client(settings)
-    try:
-        client.get_collection(collection_name=COLLECTION_NAME)
+    if client.collection_exists(COLLECTION_NAME):
         return
-    except Exception:  # pragma: no cover - qdrant raises client-specific errors
-        LOGGER.info("Creating Qdrant collection '%s'", COLLECTION_NAME)
 
-    vectors_config = qmodels.VectorParams(
-        size=OPENAI_EMBEDDING_DIM,
-        distance=qmodels.Distance.COSINE,
-    )
+    physical = _versioned_name()
+    LOGGER.info("Creating Qdrant collection '%s' behind alias '%s'", physical, COLLECTION_NAME)
     try:
+        client.create_collection(collection_name=physical, **collection_config(settings))
+        create_payload_indexes(client, physical, settings)
+        _point_alias_at(client, physical, replace=False)
+    except Exception as exc:  # pragma: no cover - another process may have won the race
+        LOGGER.warning("Failed to create collection '%s': %s", physical, exc)
+
+
+def drop_vector_store(settings: Settings) -> None:
+    """Delete the collection behind ``COLLECTION_NAME`` and the alias itself."""
+
+    if uses_local_index(settings):
+        get_local_index(settings).drop()
+        return
+    client = get_client(settings)
+    physical = current_collection(client)
+    if physical is None:
+        return
+    if physical != COLLECTION_NAME:
+        client.update_collection_aliases(
+            change_aliases_operations=[
+                qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=COLLECTION_NAME))
+            ]
+        )
+    client.delete_collection(collection_name=physical)
+
+
+@timed_external_call("qdrant", "migrate_collection")
+def migrate_vector_store(settings: Settings, *, batch_size: int = 256, keep_old: bool = False) -> str:
+    """Rebuild the collection with the current settings and switch the alias to it.
+
+    Points are copied with their stored vectors, so nothing is re-embedded; payloads are
+    cut down to ``QDRANT_PAYLOAD_FIELDS`` on the way. Writes that
+    land in the old collection while the copy runs are not carried over; pause the
+    worker and scheduler for the duration. Returns the new collection's name.
+
+    A plain legacy collection named ``COLLECTION_NAME`` has to give that name up to the
+    alias and cannot be renamed, so ``keep_old`` keeps an untouched copy of it under
+    ``<name>_legacy_<timestamp>`` instead.
+    """
+
+    if uses_local_index(settings):
+        raise ValueError("Collection migration only applies to VECTOR_BACKEND=qdrant")
+    client = get_client(settings)
+    previous = current_collection(client)
+    target = _versioned_name()
+    client.create_collection(collection_name=target, **collection_config(settings))
+    create_payload_indexes(client, target, settings)
+    fields = payload_fields(settings)
+    backup = None
+    if previous == COLLECTION_NAME and keep_old:
+        backup = f"{COLLECTION_NAME}_legacy_{datetime.utcnow():%Y%m%d%H%M%S%f}"
         client.create_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=vectors_config,
+            collection_name=backup, vectors_config=client.get_collection(previous).config.params.vectors
         )
-    except Exception as exc:  # pragma: no cover - collection may already exist
-        LOGGER.warning("Failed to create collection '%s': %s", COLLECTION_NAME, exc)
 
+    copied = 0
+    offset = None
+    while previous is not None:
+        points, offset = client.scroll(
+            collection_name=previous,
+            limit=batch_size,
+            with_payload=True,
+            with_vectors=True,
+            offset=offset,
+        )
+        if points:
+            client.upsert(
+                collection_name=target,
+                points=[
+                    qmodels.PointStruct(id=point.id, vector=point.vector, payload=_slim_payload(point.payload or {}, fields))
+                    for point in points
+                ],
+            )
+            if backup is not None:
+                client.upsert(
+                    collection_name=backup,
+                    points=[
+                        qmodels.PointStruct(id=point.id, vector=point.vector, payload=point.payload or {})
+                        for point in points
+                    ],
+                )
+            copied += len(points)
+        if offset is None:
+            break
 
-def upsert_claim_embeddings(settings: Settings, claim_vectors: Iterable[ClaimEmbedding]) -> None:
-    claim_vectors = list(claim_vectors)
-    if not claim_vectors:
-        return
+    try:
+        if previous == COLLECTION_NAME:
+            # A plain collection holds the name the alias needs; it has to go first, which
+            # leaves a short window in which searches find no collection.
+            client.delete_collection(collection_name=previous)
+            _point_alias_at(client, target, replace=False)
+        else:
+            _point_alias_at(client, target, replace=previous is not None)
+    except Exception as exc:
+        LOGGER.error(
+            "Copied %s points into '%s' but could not point alias '%s' at it%s",
+            copied,
+            target,
+            COLLECTION_NAME,
+            f"; the legacy points are kept in '{backup}'" if backup else "",
+        )
+        raise RuntimeError(
+            f"Alias '{COLLECTION_NAME}' was not switched; the migrated points are in '{target}'"
+        ) from exc
+    if previous not in (None, COLLECTION_NAME) and not keep_old:
+        client.delete_collection(collection_name=previous)
+    if backup is not None:
+        LOGGER.info("Kept a copy of the legacy collection as '%s'", backup)
+
+    LOGGER.info("Copied %s points from '%s' into '%s'; alias switched", copied, previous, target)
+    return target
 
-    init_vector_store(settings)
+
+@timed_external_call("qdrant", "upsert")
+def _upsert_qdrant(settings: Settings, claim_vectors: list[ClaimEmbedding]) -> None:
+    _init_qdrant(settings)
     client = get_client(settings)
     points = [
         qmodels.PointStruct(
@@ -71,27 +379,22 @@ def upsert_claim_embeddings(settings: Settings, claim_vectors: Iterable[ClaimEmb
     client.upsert(collection_name=COLLECTION_NAME, points=points)
 
 
-def query_similar_claims(
+@timed_external_call("qdrant", "search")
+def _search_qdrant(
     settings: Settings,
     vector: list[float],
-    limit: int = 10,
-    filter: Optional[dict] = None,
+    limit: int,
+    qdrant_filter: Optional[qmodels.Filter],
 ) -> list[dict]:
     client = get_client(settings)
-    qdrant_filter = None
-    if filter:
-        if isinstance(filter, qmodels.Filter):
-            qdrant_filter = filter
-        else:
-            qdrant_filter = qmodels.Filter(**filter)
-
-    results = client.search(
+    results = client.query_points(
         collection_name=COLLECTION_NAME,
-        query_vector=vector,
+        query=vector,
         limit=limit,
         with_payload=True,
-        filter=qdrant_filter,
-    )
+        query_filter=qdrant_filter,
+        search_params=search_params(settings),
+    ).points
 
     return [
         {
@@ -103,11 +406,10 @@ def query_similar_claims(
     ]
 
 
-def fetch_all_embeddings(settings: Settings) -> list[ClaimEmbedding]:
+@timed_external_call("qdrant", "scroll_all")
+def _fetch_all_qdrant(settings: Settings) -> list[ClaimEmbedding]:
     client = get_client(settings)
-    try:
-        client.get_collection(collection_name=COLLECTION_NAME)
-    except Exception:
+    if current_collection(client) is None:
         LOGGER.info("Vector collection '%s' not initialised yet", COLLECTION_NAME)
         return []
     result: list[ClaimEmbedding] = []
@@ -142,14 +444,80 @@ def fetch_all_embeddings(settings: Settings) -> list[ClaimEmbedding]:
     return result
 
 
-def update_claim_cluster_payload(settings: Settings, assignments: dict[int, int]) -> None:
-    if not assignments:
-        return
+@timed_external_call("qdrant", "set_payload")
+def _set_cluster_ids_qdrant(settings: Settings, assignments: dict[int, int]) -> None:
+    points_by_cluster: dict[int, list[int]] = defaultdict(list)
+    for claim_id, cluster_id in assignments.items():
+        points_by_cluster[cluster_id].append(claim_id)
 
     client = get_client(settings)
-    for claim_id, cluster_id in assignments.items():
+    for cluster_id, claim_ids in points_by_cluster.items():
         client.set_payload(
             collection_name=COLLECTION_NAME,
             payload={"cluster_id": cluster_id},
-            points=[claim_id],
+            points=claim_ids,
         )
+
+
+def init_vector_store(settings: Settings) -> None:
+    if uses_local_index(settings):
+        get_local_index(settings)
+        return
+    _init_qdrant(settings)
+
+
+def upsert_claim_embeddings(settings: Settings, claim_vectors: Iterable[ClaimEmbedding]) -> None:
+    claim_vectors = list(claim_vectors)
+    if not claim_vectors:
+        return
+    if uses_local_index(settings):
+        get_local_index(settings).upsert(
+            (embedding.id, embedding.vector, embedding.payload) for embedding in claim_vectors
+        )
+        return
+    _upsert_qdrant(settings, claim_vectors)
+
+
+def query_similar_claims(
+    settings: Settings,
+    vector: list[float],
+    limit: int = 10,
+    filter: Optional[dict] = None,
+) -> list[dict]:
+    qdrant_filter = None
+    if filter:
+        if isinstance(filter, qmodels.Filter):
+            qdrant_filter = filter
+        else:
+            qdrant_filter = qmodels.Filter(**filter)
+
+    if not uses_local_index(settings):
+        return _search_qdrant(settings, vector, limit, qdrant_filter)
+
+    results = get_local_index(settings).search(
+        vector,
+        limit,
+        _local_conditions(qdrant_filter),
+        ivf_min_points=settings.local_vector_ivf_min_points,
+        ivf_lists=settings.local_vector_ivf_lists,
+        ivf_probes=settings.local_vector_ivf_probes,
+    )
+    return [{"id": claim_id, "score": score, "payload": payload} for claim_id, score, payload in results]
+
+
+def fetch_all_embeddings(settings: Settings) -> list[ClaimEmbedding]:
+    if not uses_local_index(settings):
+        return _fetch_all_qdrant(settings)
+    return [
+        ClaimEmbedding(id=claim_id, vector=vector.tolist(), payload=payload)
+        for claim_id, vector, payload in get_local_index(settings).items()
+    ]
+
+
+def update_claim_cluster_payload(settings: Settings, assignments: dict[int, int]) -> None:
+    if not assignments or "cluster_id" not in payload_fields(settings):
+        return
+    if uses_local_index(settings):
+        get_local_index(settings).set_integer("cluster_id", assignments)
+        return
+    _set_cluster_ids_qdrant(settings, assignments)
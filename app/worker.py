@@ -0,0 +1,106 @@
+"""Background job worker.
+
+Run one or more next to the API::
+
+    python -m app.worker
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable
+
+from .config import Settings, get_settings
+from .core.logging import setup_logging
+from .database import get_session_factory
+from .models import Job
+from .services.job_service import RECLUSTER_JOB, JobContext, claim_next_job, requeue_stale_jobs, run_job, touch_job
+from .services.recluster_service import run_recluster
+
+LOGGER = logging.getLogger(__name__)
+
+JobHandler = Callable[[JobContext, Settings], dict]
+
+JOB_HANDLERS: dict[str, JobHandler] = {
+    RECLUSTER_JOB: run_recluster,
+}
+
+
+def _heartbeat(session_factory, job_id: str, interval: float, stop: threading.Event) -> None:
+    while not stop.wait(interval):
+        try:
+            with session_factory() as db:
+                touch_job(db, job_id)
+        except Exception as exc:  # pragma: no cover - transient database errors
+            LOGGER.warning("Failed to record heartbeat for job %s: %s", job_id, exc)
+
+
+def _handler_for(kind: str, settings: Settings) -> Callable[[JobContext], dict]:
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        def unknown(context: JobContext) -> dict:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+
+        return unknown
+    return lambda context: handler(context, settings)
+
+
+def process_job(job: Job, settings: Settings, session_factory=None) -> None:
+    session_factory = session_factory or get_session_factory()
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat,
+        args=(session_factory, job.id, settings.job_heartbeat_interval_seconds, stop),
+        daemon=True,
+    )
+    heartbeat.start()
+    try:
+        LOGGER.info("Running job %s (%s), attempt %s", job.id, job.kind, job.attempts)
+        run_job(session_factory, job, _handler_for(job.kind, settings))
+    finally:
+        stop.set()
+        heartbeat.join()
+
+
+def run_once(settings: Settings, worker_id: str, session_factory=None) -> bool:
+    """Claim and run at most one job. Returns whether a job was found."""
+
+    session_factory = session_factory or get_session_factory()
+    with session_factory() as db:
+        requeue_stale_jobs(db, settings.job_stale_after_seconds, settings.job_max_attempts)
+        job = claim_next_job(db, worker_id)
+        if job is not None:
+            db.expunge(job)
+    if job is None:
+        return False
+    process_job(job, settings, session_factory)
+    return True
+
+
+def run_worker(settings: Settings, *, once: bool = False) -> None:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    LOGGER.info("Worker %s polling for jobs every %.1fs", worker_id, settings.job_poll_interval_seconds)
+    while True:
+        found = run_once(settings, worker_id)
+        if once:
+            return
+        if not found:
+            time.sleep(settings.job_poll_interval_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process queued background jobs.")
+    parser.add_argument("--once", action="store_true", help="Run at most one job, then exit")
+    args = parser.parse_args()
+
+    setup_logging()
+    run_worker(get_settings(), once=args.once)
+
+
+if __name__ == "__main__":
+    main()
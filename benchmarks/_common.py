@@ -0,0 +1,46 @@
+"""Helpers shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+
+def latency_summary(samples_ms: Iterable[float]) -> dict:
+    values = sorted(samples_ms)
+    if not values:
+        return {"count": 0}
+
+    def percentile(fraction: float) -> float:
+        index = min(len(values) - 1, max(0, round(fraction * (len(values) - 1))))
+        return round(values[index], 3)
+
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.fmean(values), 3),
+        "p50_ms": percentile(0.50),
+        "p90_ms": percentile(0.90),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def write_results(name: str, results: dict, output: str | None) -> None:
+    """Print ``results`` as JSON and optionally write them to ``output`` for later comparison."""
+
+    document = {
+        "benchmark": name,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(document, indent=2, default=str)
+    print(text)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
@@ -0,0 +1,120 @@
+"""Login latency under concurrent read traffic.
+
+Logins and reads run side by side against a live server, so the login p99 shows how
+much bcrypt work costs the rest of the API and vice versa::
+
+    python -m benchmarks.bench_login_latency --base-url http://localhost:8000 \
+        --login-concurrency 16 --read-concurrency 32 --duration 30 --output login.json
+
+A benchmark account is created on first use; pass ``--email``/``--password`` to reuse one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from ._common import latency_summary, write_results
+from .bench_read_throughput import DEFAULT_PATHS
+
+DEFAULT_EMAIL = "bench-login@example.com"
+DEFAULT_PASSWORD = "bench-login-password"
+
+
+async def _ensure_account(client: httpx.AsyncClient, email: str, password: str) -> None:
+    response = await client.post("/api/v1/auth/signup", json={"email": email, "name": "Benchmark", "password": password})
+    if response.status_code not in (200, 400):
+        response.raise_for_status()
+
+
+async def _loop(send, deadline: float, latencies: list[float], statuses: dict[int, int]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            status_code = (await send()).status_code
+        except httpx.HTTPError:
+            status_code = 0
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[status_code] = statuses.get(status_code, 0) + 1
+
+
+async def run(
+    base_url: str,
+    email: str,
+    password: str,
+    login_concurrency: int,
+    read_concurrency: int,
+    duration: float,
+) -> dict:
+    limits = httpx.Limits(max_connections=login_concurrency + read_concurrency)
+    login_latencies: list[float] = []
+    read_latencies: list[float] = []
+    login_statuses: dict[int, int] = {}
+    read_statuses: dict[int, int] = {}
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await _ensure_account(client, email, password)
+        credentials = {"email": email, "password": password}
+
+        def login():
+            return client.post("/api/v1/auth/login", json=credentials)
+
+        def reader(offset: int):
+            requests = iter(range(offset, 1 << 62))
+            return lambda: client.get(DEFAULT_PATHS[next(requests) % len(DEFAULT_PATHS)])
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(_loop(login, deadline, login_latencies, login_statuses) for _ in range(login_concurrency)),
+            *(_loop(reader(offset), deadline, read_latencies, read_statuses) for offset in range(read_concurrency)),
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "base_url": base_url,
+        "login_concurrency": login_concurrency,
+        "read_concurrency": read_concurrency,
+        "duration_s": round(elapsed, 3),
+        "login": {
+            "throughput_rps": round(len(login_latencies) / elapsed, 2) if elapsed else 0.0,
+            "statuses": login_statuses,
+            "latency": latency_summary(login_latencies),
+        },
+        "reads": {
+            "throughput_rps": round(len(read_latencies) / elapsed, 2) if elapsed else 0.0,
+            "statuses": read_statuses,
+            "latency": latency_summary(read_latencies),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default=DEFAULT_EMAIL)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    parser.add_argument("--read-concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        run(
+            args.base_url,
+            args.email,
+            args.password,
+            args.login_concurrency,
+            args.read_concurrency,
+            args.duration,
+        )
+    )
+    write_results("login_latency", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
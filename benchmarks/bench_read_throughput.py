@@ -0,0 +1,89 @@
+"""Load benchmark for the read endpoints.
+
+Run it against a live server, once per build you want to compare::
+
+    python -m benchmarks.bench_read_throughput --base-url http://localhost:8000 \
+        --concurrency 64 --duration 30 --output before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+
+import httpx
+
+from ._common import latency_summary, write_results
+
+DEFAULT_PATHS = [
+    "/api/v1/claims?page=1&page_size=25",
+    "/api/v1/claims?page=20&page_size=100",
+    "/api/v1/clusters?sort_by=count",
+    "/api/v1/analytics/top-failures",
+    "/api/v1/analytics/cost-by-component",
+]
+
+
+async def _worker(client: httpx.AsyncClient, paths, deadline: float, latencies: list[float], errors: list[int]) -> None:
+    for path in paths:
+        if time.perf_counter() >= deadline:
+            return
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(base_url: str, paths: list[str], concurrency: int, duration: float, token: str | None) -> dict:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies: list[float] = []
+    errors: list[int] = []
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        # Warm up connection pools on both sides before measuring.
+        await asyncio.gather(*(client.get(path) for path in paths))
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(
+                _worker(client, itertools.islice(itertools.cycle(paths), offset, None), deadline, latencies, errors)
+                for offset in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "base_url": base_url,
+        "paths": paths,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency": latency_summary(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", dest="paths", help="Path to request; repeatable")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--token", help="Bearer token for authenticated endpoints")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.base_url, args.paths or DEFAULT_PATHS, args.concurrency, args.duration, args.token))
+    write_results("read_throughput", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
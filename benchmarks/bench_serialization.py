@@ -0,0 +1,96 @@
+"""Per-page serialization cost of the list endpoints, without a database or server.
+
+Compares the old path — a ``ClaimRead`` per ORM row, validated and encoded again by
+FastAPI's ``response_model`` — with the row-tuple path the endpoints use now::
+
+    python -m benchmarks.bench_serialization --page-sizes 25 100 --repeat 500 --output serialization.json
+
+Rows come from the synthetic claim generator, so field widths are realistic.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from app.core.responses import dumps, rows_as_dicts
+from app.schemas import ClaimRead, ClaimsPage
+
+from ._common import latency_summary, write_results
+from .synthetic import generate_claims
+
+
+def _claim_rows(count: int, seed: int) -> list[tuple]:
+    now = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    rows = []
+    for index, record in enumerate(generate_claims(count, seed=seed).to_dict(orient="records")):
+        record.update(
+            id=index + 1,
+            cluster_id=index % 40,
+            claim_cost_usd=Decimal(str(record["claim_cost_usd"])),
+            embedded_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        rows.append(tuple(record[field] for field in ClaimRead.model_fields))
+    return rows
+
+
+def _time(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run(page_sizes: list[int], repeat: int, seed: int) -> dict:
+    page_adapter = TypeAdapter(ClaimsPage)
+    results = {}
+    for page_size in page_sizes:
+        rows = _claim_rows(page_size, seed)
+        orm_rows = [SimpleNamespace(**dict(zip(ClaimRead.model_fields, row))) for row in rows]
+
+        def pydantic_path() -> bytes:
+            page = ClaimsPage(
+                total=10_000,
+                page=1,
+                page_size=page_size,
+                items=[ClaimRead.from_orm(row) for row in orm_rows],
+            )
+            # What response_model does with the returned page: validate, then encode.
+            return page_adapter.dump_json(page_adapter.validate_python(page, from_attributes=True))
+
+        def row_path() -> bytes:
+            return dumps({"total": 10_000, "page": 1, "page_size": page_size, "items": rows_as_dicts(ClaimRead, rows)})
+
+        pydantic = latency_summary(_time(pydantic_path, repeat))
+        fast = latency_summary(_time(row_path, repeat))
+        results[f"page_size_{page_size}"] = {
+            "pydantic": pydantic,
+            "rows_orjson": fast,
+            "speedup_p50": round(pydantic["p50_ms"] / fast["p50_ms"], 1) if fast["p50_ms"] else None,
+            "body_bytes": len(row_path()),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[25, 100])
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results JSON to this file as well")
+    args = parser.parse_args()
+
+    write_results("serialization", run(args.page_sizes, args.repeat, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
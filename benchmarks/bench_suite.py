@@ -0,0 +1,249 @@
+"""End-to-end offline benchmark suite over synthetic claims.
+
+For every size it ingests seeded synthetic claims through the CSV ingest service. It
+then measures ``GET /claims`` pagination at increasing depth, embeds the claims with
+the fake provider into in-memory Qdrant, times clustering (with peak memory) cold and
+then warm-started from the first run's centroids, times the vector payload updates,
+and finally times the analytics queries::
+
+    python -m benchmarks.bench_suite --sizes 10000 100000 --output suite.json
+
+Nothing leaves the machine: embeddings are fake and Qdrant runs in-process. Pass
+``--vector-backend local`` to use the built-in vector index instead, and
+``--database-url`` to benchmark against PostgreSQL instead of a throwaway SQLite file.
+``--segment-by model`` clusters every vehicle model separately across worker processes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+from fastapi import UploadFile
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.database import Base, get_read_db, to_async_url
+from app.main import app
+from app.models import Claim, ClusterRun
+from app.services import analytics_service, vector_store
+from app.services.clustering_service import recalculate_clusters
+from app.services.embedding_service import embed_new_claims
+from app.services.ingest_service import ingest_claims_from_csv
+
+from ._common import latency_summary, write_results
+from .synthetic import generate_claims
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+PAGE_SIZE = 50
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _timed(fn, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return latency_summary(samples)
+
+
+def bench_ingest(session_factory, settings, size: int, seed: int, chunk_rows: int) -> dict:
+    elapsed = 0.0
+    for start in range(0, size, chunk_rows):
+        frame = generate_claims(min(chunk_rows, size - start), seed=seed, start_index=start)
+        upload = UploadFile(file=io.BytesIO(frame.to_csv(index=False).encode("utf-8")), filename="claims.csv")
+        started = time.perf_counter()
+        with session_factory() as db:
+            ingest_claims_from_csv(db, upload, settings)
+        elapsed += time.perf_counter() - started
+    return {"rows": size, "seconds": round(elapsed, 3), "rows_per_s": round(size / elapsed, 1)}
+
+
+async def _bench_pagination(async_factory, size: int, repeats: int) -> dict:
+    async def override_get_read_db():
+        async with async_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    last_page = max(1, -(-size // PAGE_SIZE))
+    pages = sorted({1, 10, 100, 1000, last_page} & set(range(1, last_page + 1)))
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for page in pages:
+                samples = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    response = await client.get("/api/v1/claims", params={"page": page, "page_size": PAGE_SIZE})
+                    response.raise_for_status()
+                    samples.append((time.perf_counter() - started) * 1000)
+                results[f"page_{page}"] = latency_summary(samples)
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+    return results
+
+
+def bench_embedding_and_clustering(session_factory, settings) -> dict:
+    with session_factory() as db:
+        started = time.perf_counter()
+        embedded = embed_new_claims(db, settings)
+        embed_seconds = time.perf_counter() - started
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        cold = ClusterRun(status="running")
+        db.add(cold)
+        clusters = recalculate_clusters(db, settings, run=cold)
+        cluster_seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        cold.status = "succeeded"
+        cold.finished_at = datetime.utcnow()
+        db.commit()
+
+        # Same claims again: the second run starts from the first run's centroids.
+        warm = ClusterRun(status="running")
+        db.add(warm)
+        started = time.perf_counter()
+        recalculate_clusters(db, settings.model_copy(update={"cluster_warm_start": True}), run=warm)
+        warm_seconds = time.perf_counter() - started
+        db.commit()
+        cold_kmeans = {"iterations": cold.kmeans_iterations, "seconds": cold.kmeans_seconds}
+        warm_kmeans = {"iterations": warm.kmeans_iterations, "seconds": warm.kmeans_seconds, "reseeded": warm.reseeded_centroids}
+
+    return {
+        "embedding": {
+            "claims": embedded,
+            "seconds": round(embed_seconds, 3),
+            "claims_per_s": round(embedded / embed_seconds, 1) if embed_seconds else 0.0,
+        },
+        "clustering": {
+            "clusters": clusters,
+            "seconds": round(cluster_seconds, 3),
+            "traced_peak_mb": round(peak / 2**20, 1),
+            "process_peak_rss_mb": _peak_rss_mb(),
+            "kmeans": cold_kmeans,
+        },
+        "clustering_warm_start": {
+            "seconds": round(warm_seconds, 3),
+            "kmeans": warm_kmeans,
+        },
+    }
+
+
+def bench_payload_updates(session_factory, settings, limit: int) -> dict:
+    with session_factory() as db:
+        rows = db.execute(
+            select(Claim.id, Claim.cluster_id).where(Claim.cluster_id.is_not(None)).limit(limit)
+        ).all()
+    assignments = {row.id: row.cluster_id for row in rows}
+    if not assignments:
+        return {"points": 0}
+    started = time.perf_counter()
+    vector_store.update_claim_cluster_payload(settings, assignments)
+    elapsed = time.perf_counter() - started
+    return {"points": len(assignments), "seconds": round(elapsed, 3), "points_per_s": round(len(assignments) / elapsed, 1)}
+
+
+def bench_analytics(session_factory, repeats: int) -> dict:
+    with session_factory() as db:
+        queries = {
+            "top_failures": lambda: analytics_service.get_top_failure_clusters(db, limit=5),
+            "cost_by_component": lambda: analytics_service.get_cost_by_component(db),
+            "dtc_frequency": lambda: analytics_service.get_dtc_frequency(db, limit=20),
+        }
+        return {name: _timed(query, repeats) for name, query in queries.items()}
+
+
+def run_size(size: int, args, workdir: Path) -> dict:
+    database_url = args.database_url or f"sqlite+pysqlite:///{workdir / f'bench_{size}.db'}"
+    settings = get_settings().model_copy(
+        update={
+            "database_url": database_url,
+            "qdrant_url": vector_store.IN_MEMORY_URL,
+            "vector_backend": args.vector_backend,
+            "local_vector_path": str(workdir / f"vectors_{size}"),
+            "embedding_provider": "fake",
+            "embedding_dim": args.dim,
+            "embedding_batch_size": args.embedding_batch_size,
+            "clustering_min_claims": 2,
+            "clustering_segment_by": args.segment_by,
+            "clustering_workers": args.clustering_workers,
+        }
+    )
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    async_engine = create_async_engine(to_async_url(database_url))
+    async_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    vector_store.drop_vector_store(settings)
+
+    try:
+        result = {"claims": size}
+        result["ingest"] = bench_ingest(session_factory, settings, size, args.seed, args.ingest_chunk_rows)
+        result["pagination"] = asyncio.run(_bench_pagination(async_factory, size, args.repeats))
+        if not args.skip_clustering:
+            result.update(bench_embedding_and_clustering(session_factory, settings))
+            result["payload_updates"] = bench_payload_updates(session_factory, settings, args.payload_update_points)
+        result["analytics"] = bench_analytics(session_factory, args.repeats)
+        return result
+    finally:
+        engine.dispose()
+        asyncio.run(async_engine.dispose())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="Benchmark database; it is dropped and recreated per size")
+    parser.add_argument("--dim", type=int, default=64, help="Fake embedding dimensions")
+    parser.add_argument("--embedding-batch-size", type=int, default=512)
+    parser.add_argument("--ingest-chunk-rows", type=int, default=50_000, help="Rows per ingested CSV upload")
+    parser.add_argument("--payload-update-points", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--skip-clustering", action="store_true")
+    parser.add_argument("--vector-backend", choices=["qdrant", "local"], default="qdrant", help="Vector store to benchmark")
+    parser.add_argument(
+        "--segment-by",
+        choices=["model", "model_year", "region", "component"],
+        help="Cluster each value of this claim field separately",
+    )
+    parser.add_argument("--clustering-workers", type=int, default=0, help="Segment worker processes (0: one per CPU)")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="warrantrix-bench-") as workdir:
+        runs = [run_size(size, args, Path(workdir)) for size in args.sizes]
+    write_results(
+        "suite",
+        {
+            "seed": args.seed,
+            "dim": args.dim,
+            "vector_backend": args.vector_backend,
+            "segment_by": args.segment_by,
+            "runs": runs,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Recall@10 and search latency of the Qdrant collection layouts.
+
+Every configuration gets its own throwaway collection holding the same fake embeddings
+of synthetic claims. Held-out claims are the queries, and recall is measured against
+exact brute-force cosine neighbours::
+
+    python -m benchmarks.bench_vector_configs --qdrant-url http://localhost:6333 \
+        --points 50000 --queries 200 --output vectors.json
+
+Point it at a real Qdrant server: in-process mode (``:memory:``) always searches
+exhaustively and ignores quantization and HNSW settings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from qdrant_client.http import models as qmodels
+
+from app.config import get_settings
+from app.services import vector_store
+from app.services.fake_embeddings import fake_embedding
+
+from ._common import latency_summary, write_results
+from .synthetic import generate_claims
+
+CONFIGS = {
+    "float32_ram": {},
+    "float32_hnsw_m32": {"qdrant_hnsw_m": 32, "qdrant_hnsw_ef_construct": 200},
+    "float32_on_disk": {"qdrant_on_disk_vectors": True, "qdrant_on_disk_payload": True},
+    "scalar_int8": {"qdrant_quantization": "scalar"},
+    "scalar_int8_on_disk": {"qdrant_quantization": "scalar", "qdrant_on_disk_vectors": True, "qdrant_on_disk_payload": True},
+    "scalar_int8_no_rescore": {"qdrant_quantization": "scalar", "qdrant_search_rescore": False},
+    "binary": {"qdrant_quantization": "binary", "qdrant_search_oversampling": 3.0},
+    "binary_on_disk": {
+        "qdrant_quantization": "binary",
+        "qdrant_search_oversampling": 3.0,
+        "qdrant_on_disk_vectors": True,
+        "qdrant_on_disk_payload": True,
+    },
+}
+
+
+def _embeddings(count: int, dim: int, seed: int, start_index: int = 0) -> np.ndarray:
+    claims = generate_claims(count, seed=seed, start_index=start_index)
+    texts = (
+        f"Model: {row.model}, Component: {row.component}, Region: {row.region}, "
+        f"DTC: {row.dtc_codes}, Symptoms: {row.symptom_text}"
+        for row in claims.itertuples()
+    )
+    return np.asarray([fake_embedding(text, dim) for text in texts], dtype=np.float32)
+
+
+def _wait_until_indexed(client, collection_name: str, timeout: float = 600.0) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if client.get_collection(collection_name).status == qmodels.CollectionStatus.GREEN:
+            break
+        time.sleep(0.5)
+    return round(time.perf_counter() - started, 3)
+
+
+def bench_config(settings, name: str, vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, batch_size: int) -> dict:
+    client = vector_store.get_client(settings)
+    collection_name = f"bench_{name}"
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(collection_name=collection_name, **vector_store.collection_config(settings))
+
+    try:
+        started = time.perf_counter()
+        for start in range(0, len(vectors), batch_size):
+            batch = vectors[start : start + batch_size]
+            client.upsert(
+                collection_name=collection_name,
+                points=[
+                    qmodels.PointStruct(id=start + offset, vector=vector.tolist(), payload={"claim_id": start + offset})
+                    for offset, vector in enumerate(batch)
+                ],
+            )
+        upload_seconds = round(time.perf_counter() - started, 3)
+        index_seconds = _wait_until_indexed(client, collection_name)
+
+        params = vector_store.search_params(settings)
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            points = client.query_points(
+                collection_name=collection_name,
+                query=query.tolist(),
+                limit=truth.shape[1],
+                search_params=params,
+            ).points
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += len({point.id for point in points} & set(expected.tolist()))
+        return {
+            "upload_s": upload_seconds,
+            "index_wait_s": index_seconds,
+            f"recall_at_{truth.shape[1]}": round(hits / truth.size, 4),
+            "search": latency_summary(latencies),
+        }
+    finally:
+        client.delete_collection(collection_name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=get_settings().embedding_dim)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, default=None, help="Search-time ef for every configuration")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--configs", nargs="+", choices=sorted(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--output", help="Write the results JSON to this file as well")
+    args = parser.parse_args()
+
+    vectors = _embeddings(args.points, args.dim, args.seed)
+    queries = _embeddings(args.queries, args.dim, args.seed, start_index=args.points)
+    # Vectors are unit length, so the dot product is the cosine similarity.
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, : args.k]
+
+    base = get_settings().model_copy(
+        update={"qdrant_url": args.qdrant_url, "embedding_dim": args.dim, "qdrant_hnsw_ef": args.hnsw_ef}
+    )
+    results = {
+        "points": args.points,
+        "queries": args.queries,
+        "dim": args.dim,
+        "configs": {
+            name: bench_config(base.model_copy(update=CONFIGS[name]), name, vectors, queries, truth, args.batch_size)
+            for name in args.configs
+        },
+    }
+    write_results("vector_configs", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Seeded generator of realistic synthetic warranty claims.
+
+Rows carry exactly the ingest ``CSV_COLUMNS``. Failure modes tie a component to its
+typical DTC codes, symptoms, repairs and cost range, and their frequencies follow a
+long-tailed distribution, so clustering and analytics see the kind of skew real fleets
+produce. The same ``seed`` always yields the same rows::
+
+    python -m benchmarks.synthetic --claims 100000 --seed 7 --output claims.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.services.ingest_service import CSV_COLUMNS
+
+
+@dataclass(frozen=True)
+class FailureMode:
+    component: str
+    part_prefix: str
+    dtc_codes: tuple[str, ...]
+    symptoms: tuple[str, ...]
+    repairs: tuple[str, ...]
+    cost_range: tuple[float, float]
+
+
+FAILURE_MODES = (
+    FailureMode(
+        "Engine",
+        "ENG",
+        ("P0300", "P0301", "P0302", "P0171", "P0420"),
+        ("Engine misfire at idle", "Rough running when cold", "Check engine light with loss of power"),
+        ("Replaced ignition coil", "Replaced spark plugs", "Cleaned fuel injectors"),
+        (250.0, 2400.0),
+    ),
+    FailureMode(
+        "Transmission",
+        "TRN",
+        ("P0700", "P0730", "P0741"),
+        ("Harsh shift from 2nd to 3rd", "Slipping under load", "Delayed engagement into drive"),
+        ("Replaced valve body", "Reflashed TCM", "Replaced torque converter"),
+        (600.0, 5200.0),
+    ),
+    FailureMode(
+        "Brakes",
+        "BRK",
+        ("C0035", "C0040", "C0265"),
+        ("Grinding noise when braking", "ABS light on", "Pedal pulsation at highway speed"),
+        ("Replaced pads and rotors", "Replaced wheel speed sensor", "Replaced ABS module"),
+        (150.0, 1400.0),
+    ),
+    FailureMode(
+        "Electrical",
+        "ELE",
+        ("B1000", "U0100", "U0121", "P0562"),
+        ("Intermittent no-start", "Infotainment reboots while driving", "Battery drains overnight"),
+        ("Replaced body control module", "Repaired wiring harness", "Replaced battery"),
+        (120.0, 1800.0),
+    ),
+    FailureMode(
+        "HVAC",
+        "HVC",
+        ("B1479", "B10A2"),
+        ("No cold air from vents", "Blower fan noise", "Foggy windshield with AC on"),
+        ("Recharged refrigerant", "Replaced blower motor", "Replaced AC compressor"),
+        (90.0, 1600.0),
+    ),
+    FailureMode(
+        "Suspension",
+        "SUS",
+        ("C0550", "C1A00"),
+        ("Clunk over bumps", "Vehicle pulls to the right", "Uneven tire wear"),
+        ("Replaced control arm bushing", "Replaced strut assembly", "Performed alignment"),
+        (180.0, 1900.0),
+    ),
+    FailureMode(
+        "Battery",
+        "BAT",
+        ("P0A80", "P0AFA", "P1A10"),
+        ("Reduced range warning", "High voltage battery fault", "Charging stops at 80%"),
+        ("Replaced battery module", "Updated BMS software", "Replaced charging port"),
+        (400.0, 9000.0),
+    ),
+    FailureMode(
+        "Steering",
+        "STR",
+        ("C0545", "C0460"),
+        ("Heavy steering at low speed", "Steering wheel off-center", "Power steering warning"),
+        ("Replaced steering rack", "Recalibrated steering angle sensor"),
+        (200.0, 2600.0),
+    ),
+)
+
+MODELS = {"Falcon": (2019, 2024), "Osprey": (2020, 2025), "Kestrel": (2018, 2023), "Harrier": (2021, 2025)}
+REGIONS = {
+    "EU": (48.8, 9.2, 4.0),
+    "NA": (39.5, -98.4, 8.0),
+    "APAC": (35.6, 139.7, 6.0),
+    "LATAM": (-23.5, -46.6, 5.0),
+    "MEA": (25.2, 55.3, 3.0),
+}
+REGION_WEIGHTS = (0.32, 0.34, 0.2, 0.09, 0.05)
+SYMPTOM_SUFFIXES = ("", " after rain", " on cold start", " above 100 km/h", " intermittently", " after service")
+START_DATE = date(2022, 1, 1)
+DATE_SPAN_DAYS = 3 * 365
+DEALERS_PER_REGION = 40
+COORDINATE_MISSING_RATE = 0.03
+
+
+def generate_claims(count: int, seed: int = 42, start_index: int = 0) -> pd.DataFrame:
+    """Return ``count`` synthetic claims as a DataFrame with the ingest CSV columns."""
+
+    rng = np.random.default_rng(seed + start_index)
+
+    # Zipf-like weights: a few failure modes dominate, the rest form a long tail.
+    mode_weights = 1.0 / np.arange(1, len(FAILURE_MODES) + 1) ** 1.1
+    mode_index = rng.choice(len(FAILURE_MODES), size=count, p=mode_weights / mode_weights.sum())
+    region_names = list(REGIONS)
+    region_index = rng.choice(len(region_names), size=count, p=REGION_WEIGHTS)
+    model_names = list(MODELS)
+    model_index = rng.integers(0, len(model_names), size=count)
+
+    rows = []
+    for offset in range(count):
+        mode = FAILURE_MODES[mode_index[offset]]
+        model = model_names[model_index[offset]]
+        region = region_names[region_index[offset]]
+        first_year, last_year = MODELS[model]
+        model_year = int(rng.integers(first_year, last_year + 1))
+        center_lat, center_lon, spread = REGIONS[region]
+
+        code_count = min(len(mode.dtc_codes), 1 + rng.poisson(0.6))
+        # Earlier codes in each mode are the common ones.
+        code_weights = 1.0 / np.arange(1, len(mode.dtc_codes) + 1)
+        codes = rng.choice(mode.dtc_codes, size=code_count, replace=False, p=code_weights / code_weights.sum())
+
+        if rng.random() < COORDINATE_MISSING_RATE:
+            latitude = longitude = None
+        else:
+            latitude = round(float(np.clip(rng.normal(center_lat, spread), -89.9, 89.9)), 5)
+            longitude = round(float(np.clip(rng.normal(center_lon, spread), -179.9, 179.9)), 5)
+
+        low, high = mode.cost_range
+        index = start_index + offset
+        rows.append(
+            (
+                f"CLM-{index:08d}",
+                f"VIN{rng.integers(0, 10**14):014d}",
+                model,
+                model_year,
+                region,
+                int(rng.gamma(2.0, 18000.0)),
+                START_DATE + timedelta(days=int(rng.integers(0, DATE_SPAN_DAYS))),
+                mode.component,
+                f"{mode.part_prefix}-{rng.integers(100, 140)}",
+                ",".join(codes),
+                rng.choice(mode.symptoms) + rng.choice(SYMPTOM_SUFFIXES),
+                rng.choice(mode.repairs),
+                round(float(np.clip(rng.lognormal(np.log((low + high) / 3), 0.5), low, high)), 2),
+                f"{region}-D{rng.integers(0, DEALERS_PER_REGION):03d}",
+                latitude,
+                longitude,
+            )
+        )
+    return pd.DataFrame.from_records(rows, columns=CSV_COLUMNS)
+
+
+def write_csv(path: str, count: int, seed: int = 42, chunk_size: int = 100_000) -> None:
+    """Stream ``count`` claims to ``path`` in chunks so large files never sit in memory."""
+
+    for start in range(0, count, chunk_size):
+        frame = generate_claims(min(chunk_size, count - start), seed=seed, start_index=start)
+        frame.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    write_csv(args.output, args.claims, args.seed)
+
+
+if __name__ == "__main__":
+    main()
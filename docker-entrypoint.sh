@@ -3,4 +3,7 @@ set -eu
 
 alembic upgrade head
 
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+# Take the client address from X-Forwarded-For when the request comes through a trusted
+# proxy; login throttling counts failures per client IP.
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 \
+    --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}"
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import deps
+from app.database import Base, get_async_db, get_db, get_read_db
+from app.main import app
+
+
+@pytest.fixture()
+def db_sessions(tmp_path):
+    """File-backed SQLite database shared by the sync and async session dependencies."""
+
+    database_path = tmp_path / "test.db"
+    engine = create_engine(
+        f"sqlite+pysqlite:///{database_path}",
+        connect_args={"check_same_thread": False},
+    )
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+
+    sessions = SimpleNamespace(
+        sync=sessionmaker(bind=engine, autoflush=False, autocommit=False),
+        async_=async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+    )
+
+    def override_get_db():
+        db = sessions.sync()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with sessions.async_() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[deps.get_db] = override_get_db
+    app.dependency_overrides[deps.get_session_factory] = lambda: sessions.sync
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
+    sessions.engine = engine
+    yield sessions
+    for dependency in (get_db, deps.get_db, deps.get_session_factory, get_async_db, get_read_db):
+        app.dependency_overrides.pop(dependency, None)
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
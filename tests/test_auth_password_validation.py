@@ -3,39 +3,20 @@ from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from app.core.login_throttle import login_throttle
 from app.core.security import PASSWORD_MAX_LENGTH
-from app.database import Base
-from app.deps import get_db
 from app.main import app
 
 
 @pytest.fixture()
-def client():
-    engine = create_engine(
-        "sqlite+pysqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-    Base.metadata.create_all(bind=engine)
-
-    def override_get_db():
-        db = TestingSessionLocal()
-        try:
-            yield db
-        finally:
-            db.close()
-
-    app.dependency_overrides[get_db] = override_get_db
+def client(db_sessions):
+    login_throttle.clear()
     with TestClient(app) as test_client:
         yield test_client
-    app.dependency_overrides.clear()
+    login_throttle.clear()
 
 
 def _signup(client: TestClient, email: str, password: str):
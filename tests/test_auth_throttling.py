@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core import security
+from app.core.login_throttle import LoginThrottle, login_throttle
+from app.main import app
+
+
+@pytest.fixture()
+def client(db_sessions):
+    login_throttle.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+    login_throttle.clear()
+
+
+def _login(client: TestClient, email: str, password: str):
+    return client.post("/api/v1/auth/login", json={"email": email, "password": password})
+
+
+def test_repeated_failures_lock_the_account(client: TestClient):
+    email = "locked@example.com"
+    signup = client.post(
+        "/api/v1/auth/signup",
+        json={"email": email, "name": "Test User", "password": "right-password"},
+    )
+    assert signup.status_code == 200
+
+    for _ in range(login_throttle.max_per_account):
+        assert _login(client, email, "wrong-password").status_code == 401
+
+    response = _login(client, email, "right-password")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_ip_limit_spans_accounts():
+    throttle = LoginThrottle(window_seconds=60, max_per_account=10, max_per_ip=3)
+    for index in range(3):
+        throttle.record_failure(f"user{index}@example.com", "10.0.0.1")
+
+    assert throttle.retry_after("fresh@example.com", "10.0.0.1") > 0
+    assert throttle.retry_after("fresh@example.com", "10.0.0.2") == 0
+
+
+def test_sprayed_accounts_are_evicted(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.core.login_throttle.time.monotonic", lambda: clock[0])
+    throttle = LoginThrottle(window_seconds=60, max_per_account=3, max_per_ip=0, max_keys=50)
+
+    for index in range(200):
+        throttle.record_failure(f"nobody{index}@example.com", "10.0.0.1")
+    assert len(throttle) == 50
+    # The spraying IP keeps failing, so it is never the one dropped.
+    assert "ip:10.0.0.1" in throttle._failures
+
+    clock[0] += 61
+    throttle.record_failure("late@example.com", None)
+    assert len(throttle) == 1
+
+
+def test_full_hash_queue_returns_503(client: TestClient, monkeypatch):
+    class BusyHasher:
+        async def hash(self, password: str) -> str:
+            raise security.PasswordHasherBusy("full")
+
+    monkeypatch.setattr("app.routers.auth.password_hasher", BusyHasher())
+    response = client.post(
+        "/api/v1/auth/signup",
+        json={"email": "busy@example.com", "name": "Test User", "password": "right-password"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import deps
+from app.core.user_cache import user_cache
+from app.main import app
+from app.models import User
+
+
+@pytest.fixture()
+def env(db_sessions):
+    statements: list[str] = []
+    event.listen(db_sessions.engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+
+    user_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client, db_sessions.sync, statements
+    user_cache.clear()
+
+
+def _signup(client: TestClient, email: str) -> str:
+    response = client.post(
+        "/api/v1/auth/signup",
+        json={"email": email, "name": "Test User", "password": "correct-horse"},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _me(client: TestClient, token: str):
+    return client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_repeat_requests_are_served_from_the_cache(env):
+    client, _, statements = env
+    token = _signup(client, "cached@example.com")
+
+    assert _me(client, token).status_code == 200
+    statements.clear()
+    response = _me(client, token)
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "cached@example.com"
+    assert statements == []
+
+
+def test_role_change_revokes_existing_tokens(env):
+    client, session_factory, _ = env
+    token = _signup(client, "promoted@example.com")
+    assert _me(client, token).status_code == 200
+
+    with session_factory() as db:
+        user = db.query(User).filter(User.email == "promoted@example.com").one()
+        user.role = "admin"
+        db.commit()
+        assert user.token_version == 1
+
+    assert _me(client, token).status_code == 401
+
+
+def test_cache_hits_do_not_open_a_session(env):
+    client, session_factory, _ = env
+    token = _signup(client, "sessionless@example.com")
+    assert _me(client, token).status_code == 200
+
+    opened: list[int] = []
+
+    def counting_factory():
+        opened.append(1)
+        return session_factory()
+
+    app.dependency_overrides[deps.get_session_factory] = lambda: counting_factory
+    assert _me(client, token).status_code == 200
+    assert opened == []
+
+    user_cache.clear()
+    assert _me(client, token).status_code == 200
+    assert opened == [1]
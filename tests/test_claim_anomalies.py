@@ -0,0 +1,77 @@
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.main import app
+from app.models import Claim, Cluster
+from app.services import vector_store
+from app.services.clustering_service import outlier_scores, recalculate_clusters
+from app.services.embedding_service import embed_new_claims
+from app.services.ingest_service import ingest_claims_from_csv
+from benchmarks.synthetic import generate_claims
+
+
+def test_scores_are_relative_to_each_clusters_spread():
+    labels = np.array([0, 0, 0, 0, 1, 1, 1, 1, 2])
+    distances = np.array([1.0, 1.1, 0.9, 2.0, 10.0, 12.0, 8.0, 30.0, 0.0])
+
+    medians, scales, scores = outlier_scores(labels, distances, 3)
+
+    assert medians[:2].tolist() == [1.05, 11.0]
+    # Both far claims sit well outside their cluster although their raw distances differ 15-fold.
+    assert scores[3] > 5 and scores[7] > 5
+    assert np.abs(scores[[0, 1, 2, 4, 5, 6]]).max() < 2
+    # A single-claim cluster has no spread of its own and borrows the overall one.
+    assert scales[2] > 0 and scores[8] == 0
+
+
+def test_anomaly_feed_and_scores_on_arrival(db_sessions):
+    settings = get_settings().model_copy(
+        update={
+            "embedding_provider": "fake",
+            "embedding_dim": 16,
+            "vector_backend": "local",
+            "local_vector_path": vector_store.IN_MEMORY_URL,
+            "clustering_min_claims": 10,
+        }
+    )
+
+    def ingest(count: int, seed: int) -> None:
+        csv_bytes = generate_claims(count, seed=seed).to_csv(index=False).encode("utf-8")
+        ingest_claims_from_csv(db, UploadFile(file=io.BytesIO(csv_bytes), filename="claims.csv"), settings)
+
+    try:
+        with db_sessions.sync() as db:
+            ingest(150, seed=5)
+            embed_new_claims(db, settings)
+            recalculate_clusters(db, settings)
+            clustered = db.execute(select(Claim.outlier_score).where(Claim.cluster_id.is_not(None))).scalars().all()
+            assert clustered and None not in clustered
+
+            last_id = db.execute(select(Claim.id).order_by(Claim.id.desc())).scalars().first()
+            ingest(20, seed=6)
+            embedded = embed_new_claims(db, settings)
+            arrivals = db.execute(select(Claim).where(Claim.id > last_id, Claim.embedded_at.is_not(None))).scalars().all()
+            leaf_ids = set(db.execute(select(Cluster.id)).scalars())
+            assert len(arrivals) == embedded > 0
+            assert all(claim.cluster_id in leaf_ids and claim.outlier_score is not None for claim in arrivals)
+    finally:
+        vector_store._get_local_index.cache_clear()
+
+    with TestClient(app) as client:
+        anomalies = client.get("/api/v1/claims/anomalies", params={"limit": 10}).json()
+        assert len(anomalies) == 10
+        scores = [claim["outlier_score"] for claim in anomalies]
+        assert scores == sorted(scores, reverse=True)
+
+        model = anomalies[0]["model"]
+        filtered = client.get("/api/v1/claims/anomalies", params={"model": model, "min_score": 0}).json()
+        assert filtered and all(claim["model"] == model and claim["outlier_score"] >= 0 for claim in filtered)
@@ -0,0 +1,95 @@
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.main import app
+from app.models import Claim
+from app.services import vector_store
+from app.services.embedding_service import embed_new_claims
+from app.services.search_service import reciprocal_rank_fusion
+
+CLAIMS = [
+    ("CLM-1", "Engine", "P0301", "ENG-101", "Misfire on cylinder 1 at idle", "Replaced ignition coil"),
+    ("CLM-2", "Engine", "P0301,P0420", "ENG-102", "Rough running and misfire when cold", "Replaced spark plugs"),
+    ("CLM-3", "Brakes", "C0035", "BRK-121", "Grinding noise when braking", "Replaced pads and rotors"),
+    ("CLM-4", "Engine", "P0171", "ENG-103", "Lean condition, hesitation", "Cleaned 100%_injectors"),
+]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    hits = reciprocal_rank_fusion({"text": [1, 2, 3], "vector": [3, 1, 4]}, k=60)
+
+    assert [hit.claim_id for hit in hits] == [1, 3, 2, 4]
+    assert (hits[0].text_rank, hits[0].vector_rank) == (1, 2)
+    assert hits[0].score == pytest.approx(1 / 61 + 1 / 62)
+    assert hits[3].text_rank is None
+
+
+@pytest.fixture()
+def client(db_sessions):
+    settings = get_settings().model_copy(
+        update={
+            "embedding_provider": "fake",
+            "embedding_dim": 32,
+            "vector_backend": "local",
+            "local_vector_path": vector_store.IN_MEMORY_URL,
+        }
+    )
+    with db_sessions.sync() as db:
+        for claim_id, component, dtc_codes, part_number, symptom, repair in CLAIMS:
+            db.add(
+                Claim(
+                    claim_id=claim_id,
+                    vin=f"VIN-{claim_id}",
+                    model="Falcon",
+                    model_year=2022,
+                    region="EU",
+                    mileage_km=1000,
+                    failure_date=date(2024, 3, 1),
+                    component=component,
+                    part_number=part_number,
+                    dtc_codes=dtc_codes,
+                    symptom_text=symptom,
+                    repair_action=repair,
+                    claim_cost_usd=Decimal("100.00"),
+                    dealer_id="D1",
+                )
+            )
+        db.commit()
+        embed_new_claims(db, settings)
+
+    app.dependency_overrides[get_settings] = lambda: settings
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.pop(get_settings, None)
+    vector_store._get_local_index.cache_clear()
+
+
+def test_search_ranks_exact_code_and_text_matches_first(client):
+    response = client.get("/api/v1/claims/search", params={"q": "P0301 misfire", "limit": 3})
+    assert response.status_code == 200
+    hits = response.json()
+
+    assert {hit["claim"]["claim_id"] for hit in hits[:2]} == {"CLM-1", "CLM-2"}
+    assert all(hit["text_rank"] is not None for hit in hits[:2])
+    assert hits[0]["score"] >= hits[-1]["score"]
+    assert len(hits) == 3
+
+
+def test_search_applies_filters_to_both_sources(client):
+    response = client.get("/api/v1/claims/search", params={"q": "noise", "component": "Brakes"})
+    assert [hit["claim"]["claim_id"] for hit in response.json()] == ["CLM-3"]
+
+
+def test_text_fallback_escapes_like_wildcards(client):
+    response = client.get("/api/v1/claims/search", params={"q": "100%_injectors", "component": "Engine"})
+    hits = response.json()
+    assert hits[0]["claim"]["claim_id"] == "CLM-4"
+    assert [hit["claim"]["claim_id"] for hit in hits if hit["text_rank"] is not None] == ["CLM-4"]
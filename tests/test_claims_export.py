@@ -0,0 +1,83 @@
+import csv
+import gzip
+import io
+import json
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.main import app
+from app.models import Claim
+
+
+def _claim(index: int, model: str) -> Claim:
+    return Claim(
+        claim_id=f"CLM-{index:04d}",
+        vin=f"VIN{index:014d}",
+        model=model,
+        model_year=2022,
+        region="EU",
+        mileage_km=12000 + index,
+        failure_date=date(2024, 3, 1 + index % 28),
+        component="Brakes",
+        part_number="BRK-100",
+        dtc_codes="C1234, P0301",
+        symptom_text="Grinding noise, when braking",
+        repair_action="Replaced pads",
+        claim_cost_usd=Decimal("125.50"),
+        dealer_id="D-01",
+        latitude=48.1,
+        longitude=11.5,
+    )
+
+
+@pytest.fixture()
+def client(db_sessions):
+    with db_sessions.sync() as db:
+        db.add_all(_claim(index, "Falcon" if index % 3 else "Osprey") for index in range(30))
+        db.commit()
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_csv_export_streams_filtered_rows(client: TestClient):
+    response = client.get("/api/v1/claims/export", params={"format": "csv", "compression": "none", "model": "Osprey"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 10
+    assert {row["model"] for row in rows} == {"Osprey"}
+    assert rows[0]["symptom_text"] == "Grinding noise, when braking"
+    assert rows[0]["claim_cost_usd"] == "125.50"
+
+
+def test_ndjson_export_is_gzipped_by_default(client: TestClient):
+    response = client.get("/api/v1/claims/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert 'filename="claims-export.ndjson.gz"' in response.headers["content-disposition"]
+
+    lines = gzip.decompress(response.content).decode("utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 30
+    assert [record["id"] for record in records] == sorted(record["id"] for record in records)
+    assert records[0]["failure_date"] == "2024-03-01"
+
+
+def test_parquet_export_round_trips(client: TestClient):
+    response = client.get("/api/v1/claims/export", params={"format": "parquet", "model": "Falcon"})
+    assert response.status_code == 200
+
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 20
+    assert set(table.column("model").to_pylist()) == {"Falcon"}
+    assert table.column("claim_cost_usd").to_pylist()[0] == Decimal("125.50")
@@ -0,0 +1,102 @@
+import io
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.main import app
+from app.models import Claim, Cluster
+from app.services import vector_store
+from app.services.clustering_service import recalculate_clusters
+from app.services.embedding_service import embed_new_claims
+from app.services.ingest_service import ingest_claims_from_csv
+from benchmarks.synthetic import generate_claims
+
+REPRESENTATIVES_K = 3
+
+
+@pytest.fixture()
+def clustered(db_sessions):
+    settings = get_settings().model_copy(
+        update={
+            "embedding_provider": "fake",
+            "embedding_dim": 16,
+            "vector_backend": "local",
+            "local_vector_path": vector_store.IN_MEMORY_URL,
+            "clustering_min_claims": 10,
+            "cluster_representatives_k": REPRESENTATIVES_K,
+        }
+    )
+    csv_bytes = generate_claims(150, seed=3).to_csv(index=False).encode("utf-8")
+    try:
+        with db_sessions.sync() as db:
+            ingest_claims_from_csv(db, UploadFile(file=io.BytesIO(csv_bytes), filename="claims.csv"), settings)
+            embed_new_claims(db, settings)
+            assert recalculate_clusters(db, settings) > 0
+    finally:
+        vector_store._get_local_index.cache_clear()
+
+    with TestClient(app) as client:
+        yield client, db_sessions.sync
+
+
+def test_detail_serves_the_precomputed_drill_down(clustered):
+    client, session_factory = clustered
+    with session_factory() as db:
+        members: dict[int, list] = {}
+        for row in db.execute(
+            select(Claim.id, Claim.cluster_id, Claim.model, Claim.region, Claim.centroid_distance).where(
+                Claim.cluster_id.is_not(None)
+            )
+        ):
+            members.setdefault(row.cluster_id, []).append(row)
+
+    for cluster_id, rows in members.items():
+        response = client.get(f"/api/v1/clusters/{cluster_id}/detail")
+        assert response.status_code == 200
+        detail = response.json()
+        assert detail["num_claims"] == len(rows)
+        assert detail["computed_at"] is not None
+
+        representatives = detail["representative_claims"]
+        distances = [claim["distance"] for claim in representatives]
+        assert len(representatives) == min(REPRESENTATIVES_K, len(rows))
+        assert distances == sorted(distances)
+        nearest = sorted(row.centroid_distance for row in rows)[: len(representatives)]
+        assert distances == pytest.approx(nearest, rel=1e-4)
+        assert {claim["id"] for claim in representatives} <= {row.id for row in rows}
+
+        for field, column in (("model_breakdown", "model"), ("region_breakdown", "region")):
+            counts = Counter(getattr(row, column) for row in rows)
+            assert {entry["key"]: entry["claim_count"] for entry in detail[field]} == counts
+            assert [entry["claim_count"] for entry in detail[field]] == sorted(counts.values(), reverse=True)
+
+        histogram = detail["cost_histogram"]
+        assert sum(histogram["counts"]) == detail["num_claims"]
+        assert len(histogram["bin_edges"]) == len(histogram["counts"]) + 1
+
+
+def test_detail_without_precomputed_row_falls_back_to_the_summary(clustered):
+    client, session_factory = clustered
+    with session_factory() as db:
+        cluster = Cluster(label="Manual", num_claims=0)
+        db.add(cluster)
+        db.commit()
+        cluster_id = cluster.id
+
+    response = client.get(f"/api/v1/clusters/{cluster_id}/detail")
+    assert response.status_code == 200
+    detail = response.json()
+    assert detail["label"] == "Manual"
+    assert detail["representative_claims"] == []
+    assert detail["model_breakdown"] == [] and detail["region_breakdown"] == []
+    assert detail["cost_histogram"] is None and detail["computed_at"] is None
+
+    assert client.get("/api/v1/clusters/999999/detail").status_code == 404
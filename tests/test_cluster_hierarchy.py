@@ -0,0 +1,87 @@
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.main import app
+from app.models import Claim, Cluster, ClusterDetail
+from app.services import vector_store
+from app.services.clustering_service import cluster_tree, recalculate_clusters, ward_agglomerate
+from app.services.embedding_service import embed_new_claims
+from app.services.ingest_service import ingest_claims_from_csv
+from benchmarks.synthetic import generate_claims
+
+
+def test_ward_merges_by_size_weighted_distance():
+    centroids = np.array([[0.0], [1.0], [10.0], [11.0], [30.0]])
+
+    assert ward_agglomerate(centroids, np.ones(5), 3).tolist() == [0, 0, 1, 1, 2]
+    # Merging heavy centroids moves more claims, so a farther but light pair goes first.
+    pairs = np.array([[0.0], [2.0], [10.0], [11.0]])
+    assert ward_agglomerate(pairs, np.ones(4), 3).tolist() == [0, 1, 2, 2]
+    assert ward_agglomerate(pairs, np.array([1, 1, 100, 100]), 3).tolist() == [0, 0, 1, 2]
+
+
+def test_tree_never_merges_across_segments():
+    centroids = np.arange(6, dtype=float)[:, None]
+    levels = cluster_tree(centroids, np.ones(6), ["a", "a", "a", "b", "b", "c"], branching=2)
+
+    assert [parents.tolist() for parents in levels] == [[0, 0, 1, 2, 2, 3], [0, 0, 1, 2]]
+
+
+def test_recluster_persists_a_tree_with_bottom_up_stats(db_sessions):
+    settings = get_settings().model_copy(
+        update={
+            "embedding_provider": "fake",
+            "embedding_dim": 16,
+            "vector_backend": "local",
+            "local_vector_path": vector_store.IN_MEMORY_URL,
+            "clustering_min_claims": 10,
+            "num_clusters_default": 8,
+            "cluster_hierarchy": True,
+            "cluster_hierarchy_branching": 2,
+        }
+    )
+    csv_bytes = generate_claims(400, seed=11).to_csv(index=False).encode("utf-8")
+    try:
+        with db_sessions.sync() as db:
+            ingest_claims_from_csv(db, UploadFile(file=io.BytesIO(csv_bytes), filename="claims.csv"), settings)
+            embed_new_claims(db, settings)
+            assert recalculate_clusters(db, settings) == 8
+
+            clusters = db.execute(select(Cluster)).scalars().all()
+            total = db.execute(select(func.count(Claim.id)).where(Claim.cluster_id.is_not(None))).scalar_one()
+            by_level: dict[int, list[Cluster]] = {}
+            for cluster in clusters:
+                by_level.setdefault(cluster.level, []).append(cluster)
+            assert [len(by_level[level]) for level in sorted(by_level)] == [8, 4, 2, 1]
+            assert all(sum(cluster.num_claims for cluster in level) == total for level in by_level.values())
+
+            for parent in clusters:
+                children = [cluster for cluster in clusters if cluster.parent_id == parent.id]
+                if not children:
+                    continue
+                assert {child.level for child in children} == {parent.level - 1}
+                assert parent.num_claims == sum(child.num_claims for child in children)
+                assert parent.total_cost_usd == sum(child.total_cost_usd for child in children)
+                assert parent.first_failure_date == min(child.first_failure_date for child in children)
+            root = by_level[3][0]
+            assert root.parent_id is None
+            detail = db.get(ClusterDetail, root.id)
+            assert sum(entry["claim_count"] for entry in detail.model_breakdown) == total
+            assert db.execute(select(Claim.id).join(Cluster).where(Cluster.level > 0)).all() == []
+    finally:
+        vector_store._get_local_index.cache_clear()
+
+    with TestClient(app) as client:
+        assert len(client.get("/api/v1/clusters").json()) == 8
+        (top,) = client.get("/api/v1/clusters", params={"level": 3}).json()
+        children = client.get("/api/v1/clusters", params={"parent_id": top["id"]}).json()
+        assert {child["level"] for child in children} == {2} and len(children) == 2
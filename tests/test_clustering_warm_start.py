@@ -0,0 +1,87 @@
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+from fastapi import UploadFile
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.models import ClusterRun
+from app.services import vector_store
+from app.services.clustering_service import centroids_from_bytes, recalculate_clusters, warm_start_centroids
+from app.services.embedding_service import embed_new_claims
+from app.services.ingest_service import ingest_claims_from_csv
+from benchmarks.synthetic import generate_claims
+
+CENTERS = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0], [10.0, 10.0]], dtype=np.float32)
+
+
+def _blobs(centers: np.ndarray, per_blob: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.vstack([center + rng.normal(0, 0.5, size=(per_blob, 2)) for center in centers]).astype(np.float32)
+
+
+def test_warm_start_keeps_settled_centroids_in_place():
+    init, reseeded = warm_start_centroids(CENTERS[:3], _blobs(CENTERS[:3], 50), k=3, reseed_distance_factor=2.0)
+
+    assert reseeded == 0
+    np.testing.assert_array_equal(init, CENTERS[:3])
+
+
+def test_warm_start_seeds_new_mass_into_free_slots():
+    init, reseeded = warm_start_centroids(CENTERS[:3], _blobs(CENTERS, 50), k=4, reseed_distance_factor=2.0)
+
+    assert reseeded == 1
+    np.testing.assert_array_equal(init[:3], CENTERS[:3])
+    assert np.linalg.norm(init[3] - CENTERS[3]) < 3
+
+
+def test_warm_start_replaces_a_vanished_centroid_with_new_mass():
+    stale = np.vstack([CENTERS[:2], [[-30.0, -30.0]]])
+    init, reseeded = warm_start_centroids(stale, _blobs(CENTERS[:3], 50), k=3, reseed_distance_factor=2.0)
+
+    assert reseeded == 1
+    np.testing.assert_array_equal(init[:2], CENTERS[:2])
+    assert np.linalg.norm(init[2] - CENTERS[2]) < 3
+
+
+def _run(db, settings) -> ClusterRun:
+    run = ClusterRun(status="running")
+    db.add(run)
+    db.commit()
+    recalculate_clusters(db, settings, run=run)
+    run.status = "succeeded"
+    db.commit()
+    return run
+
+
+def test_second_run_starts_from_the_stored_centroids(db_sessions):
+    settings = get_settings().model_copy(
+        update={
+            "embedding_provider": "fake",
+            "embedding_dim": 16,
+            "vector_backend": "local",
+            "local_vector_path": vector_store.IN_MEMORY_URL,
+            "clustering_min_claims": 10,
+        }
+    )
+    csv_bytes = generate_claims(150, seed=5).to_csv(index=False).encode("utf-8")
+    try:
+        with db_sessions.sync() as db:
+            ingest_claims_from_csv(db, UploadFile(file=io.BytesIO(csv_bytes), filename="claims.csv"), settings)
+            embed_new_claims(db, settings)
+
+            cold = _run(db, settings)
+            warm = _run(db, settings)
+
+            assert not cold.warm_started
+            assert warm.warm_started and warm.reseeded_centroids == 0
+            assert warm.kmeans_iterations <= cold.kmeans_iterations
+            assert centroids_from_bytes(warm.centroids).shape == (3, 16)
+            np.testing.assert_allclose(
+                centroids_from_bytes(warm.centroids), centroids_from_bytes(cold.centroids), atol=1e-5
+            )
+    finally:
+        vector_store._get_local_index.cache_clear()
@@ -30,3 +30,18 @@ def _load_settings(monkeypatch: pytest.MonkeyPatch, value: str):
 def test_cors_origins_from_env(raw_value: str, expected: Iterable[str], monkeypatch):
     settings = _load_settings(monkeypatch, raw_value)
     assert settings.cors_origins == list(expected)
+
+
+@pytest.mark.parametrize(
+    "env",
+    [
+        {"GEOHASH_PRECISION": "0"},
+        {"GEOHASH_PRECISION": "13"},
+        {"GEOHASH_PRECISION": "6", "HOTSPOT_GEOHASH_PRECISION": "7"},
+    ],
+)
+def test_invalid_geohash_precisions_are_rejected(env: dict, monkeypatch):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError):
+        Settings()
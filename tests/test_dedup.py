@@ -0,0 +1,104 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.main import app
+from app.services import vector_store
+from app.services.dedup_service import claim_shingles, estimate_similarity, minhash_signature, reindex_claims
+from app.services.embedding_service import embed_new_claims
+from app.services.ingest_service import CSV_COLUMNS
+
+FIRST_BATCH = [
+    ["CLM-1", "1HGCM82633A004352", "Falcon", "2022", "EU", "1000", "2024-03-01", "Engine", "ENG-1", "P0301", "Engine misfire at idle on cold start, check engine light flashing", "Coil", "250.00", "D1", "", ""],
+    ["CLM-2", "1HGCM82633A004352", "Falcon", "2022", "EU", "1000", "2024-03-01", "Engine", "ENG-1", "P0301", "Engine misfire at idle on cold start - check engine light flashing!", "Coil", "250.00", "D1", "", ""],
+    ["CLM-3", "5YJSA1E26HF000337", "Falcon", "2022", "EU", "1200", "2024-03-02", "Engine", "ENG-1", "P0301", "Engine misfire at idle on cold start, check engine light flashing", "Coil", "260.00", "D2", "", ""],
+]
+SECOND_BATCH = [
+    ["CLM-4", "1HGCM82633A004352", "Falcon", "2022", "EU", "1000", "2024-03-01", "Engine", "ENG-1", "P0301", "engine misfire at idle on cold start, check engine light flashing", "Coil", "250.00", "D1", "", ""],
+]
+
+
+def _csv(rows: list[list[str]]) -> str:
+    return "\n".join([",".join(CSV_COLUMNS)] + [",".join(f'"{value}"' for value in row) for row in rows])
+
+
+def _signature(vin: str, symptom: str):
+    return minhash_signature(claim_shingles(vin, "P0301", symptom, 5), 128)
+
+
+def test_vin_separates_identical_symptoms_on_different_vehicles():
+    symptom = "Engine misfire at idle on cold start, check engine light flashing"
+    original = _signature("1HGCM82633A004352", symptom)
+
+    assert estimate_similarity(original, _signature("1HGCM82633A004352", symptom.upper())) == 1.0
+    assert estimate_similarity(original, _signature("5YJSA1E26HF000337", symptom)) < 0.8
+    assert minhash_signature(set(), 128) is None
+
+
+@pytest.fixture()
+def client(db_sessions):
+    with TestClient(app) as test_client:
+        for rows in (FIRST_BATCH, SECOND_BATCH):
+            response = test_client.post("/api/v1/ingest/claims-csv", files={"file": ("claims.csv", _csv(rows), "text/csv")})
+            assert response.status_code == 200
+        assert response.json()["duplicates"] == 1
+        yield test_client
+
+
+def _claims(client: TestClient) -> dict[str, dict]:
+    return {item["claim_id"]: item for item in client.get("/api/v1/claims").json()["items"]}
+
+
+def test_ingest_links_resubmissions_to_the_canonical_claim(client: TestClient):
+    claims = _claims(client)
+    canonical = claims["CLM-1"]["id"]
+
+    assert claims["CLM-1"]["duplicate_of_id"] is None
+    assert claims["CLM-2"]["duplicate_of_id"] == canonical
+    assert claims["CLM-3"]["duplicate_of_id"] is None
+    assert claims["CLM-4"]["duplicate_of_id"] == canonical
+
+
+def test_duplicates_endpoint_lists_the_rest_of_the_group(client: TestClient):
+    claims = _claims(client)
+
+    response = client.get(f"/api/v1/claims/{claims['CLM-4']['id']}/duplicates")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["canonical_id"] == claims["CLM-1"]["id"]
+    assert [(item["claim"]["claim_id"], item["is_canonical"]) for item in body["duplicates"]] == [
+        ("CLM-1", True),
+        ("CLM-2", False),
+    ]
+    assert body["duplicates"][1]["similarity"] >= 0.8
+
+    assert client.get(f"/api/v1/claims/{claims['CLM-3']['id']}/duplicates").json()["duplicates"] == []
+    assert client.get("/api/v1/claims/999/duplicates").status_code == 404
+
+
+def test_embedding_skips_flagged_duplicates(client: TestClient, db_sessions):
+    settings = get_settings().model_copy(
+        update={
+            "embedding_provider": "fake",
+            "embedding_dim": 16,
+            "vector_backend": "local",
+            "local_vector_path": vector_store.IN_MEMORY_URL,
+        }
+    )
+    try:
+        with db_sessions.sync() as db:
+            assert embed_new_claims(db, settings) == 2
+    finally:
+        vector_store._get_local_index.cache_clear()
+
+
+def test_rebuild_reproduces_the_links(client: TestClient, db_sessions):
+    before = {claim_id: item["duplicate_of_id"] for claim_id, item in _claims(client).items()}
+    with db_sessions.sync() as db:
+        assert reindex_claims(db, get_settings(), batch_size=2, rebuild=True) == {"indexed": 4, "duplicates": 2}
+    assert {claim_id: item["duplicate_of_id"] for claim_id, item in _claims(client).items()} == before
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.main import app
+from app.services.ingest_service import CSV_COLUMNS, parse_dtc_codes
+
+CSV_ROWS = [
+    ["CLM-1", "VIN1", "Falcon", "2022", "EU", "1000", "2024-03-01", "Brakes", "BRK-1", "P0301, c1234", "Noise", "Pads", "100.00", "D1", "48.1", "11.5"],
+    ["CLM-2", "VIN2", "Falcon", "2022", "EU", "2000", "2024-03-02", "Engine", "ENG-1", "P0301,P0420", "Misfire", "Coil", "250.00", "D1", "48.2", "11.6"],
+    ["CLM-3", "VIN3", "Osprey", "2023", "NA", "3000", "2024-03-03", "Engine", "ENG-2", "P0420", "Lamp on", "Sensor", "80.00", "D2", "", ""],
+]
+
+
+@pytest.fixture()
+def client(db_sessions):
+    with TestClient(app) as test_client:
+        csv_body = "\n".join(
+            [",".join(CSV_COLUMNS)] + [",".join(f'"{value}"' for value in row) for row in CSV_ROWS]
+        )
+        response = test_client.post(
+            "/api/v1/ingest/claims-csv",
+            files={"file": ("claims.csv", csv_body, "text/csv")},
+        )
+        assert response.status_code == 200
+        yield test_client
+
+
+def test_parse_dtc_codes_normalises_and_deduplicates():
+    assert parse_dtc_codes(" p0301, P0420 ,,P0301") == ["P0301", "P0420"]
+    assert parse_dtc_codes(None) == []
+
+
+def test_claims_can_be_filtered_by_dtc_code(client: TestClient):
+    response = client.get("/api/v1/claims", params={"dtc": "p0301"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert {item["claim_id"] for item in data["items"]} == {"CLM-1", "CLM-2"}
+
+
+def test_dtc_frequency_counts_claims_per_code(client: TestClient):
+    response = client.get("/api/v1/analytics/dtc-frequency")
+    assert response.status_code == 200
+    assert [(row["code"], row["claim_count"]) for row in response.json()] == [
+        ("P0301", 2),
+        ("P0420", 2),
+        ("C1234", 1),
+    ]
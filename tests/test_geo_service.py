@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.geo_service import compute_hotspots, encode_geohashes
+
+
+def test_encode_geohashes_matches_reference_values():
+    hashes = encode_geohashes([57.64911, -25.382708, float("nan")], [10.40744, -49.265506, 11.0], 11)
+    assert hashes[0] == "u4pruydqqvj"
+    assert hashes[1].startswith("6gkzwgjz")
+    assert hashes[2] is None
+
+
+def test_encode_geohashes_prefixes_are_coarser_cells():
+    fine = encode_geohashes([48.1374], [11.5755], 7)[0]
+    coarse = encode_geohashes([48.1374], [11.5755], 4)[0]
+    assert fine.startswith(coarse)
+
+
+def test_cluster_concentrated_in_one_cell_is_a_hotspot():
+    cells = pd.DataFrame(
+        {
+            "cluster_id": [1, 1, 2, 2, 2],
+            "cell": ["u281z", "u0yjj", "u281z", "u0yjj", "u33db"],
+            "claim_count": [40.0, 2.0, 5.0, 30.0, 30.0],
+            "total_cost_usd": [4000.0, 200.0, 500.0, 3000.0, 3000.0],
+            "latitude_sum": [40 * 48.1, 2 * 48.5, 5 * 48.1, 30 * 48.5, 30 * 52.5],
+            "longitude_sum": [40 * 11.5, 2 * 9.1, 5 * 11.5, 30 * 9.1, 30 * 13.4],
+        }
+    )
+    result = compute_hotspots(cells, min_claims=5, z_threshold=3.0)
+
+    flagged = result[result["is_hotspot"] & result["cluster_id"].notna()]
+    assert list(zip(flagged["cluster_id"], flagged["cell"])) == [(1, "u281z")]
+    assert flagged["center_latitude"].iloc[0] == 48.1
+    assert len(result[result["cluster_id"].isna()]) == 3
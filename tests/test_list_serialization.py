@@ -0,0 +1,90 @@
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.main import app
+from app.models import Claim, Cluster
+from app.schemas import ClaimRead, ClaimsPage, ClusterRead
+
+
+@pytest.fixture()
+def client(db_sessions):
+    with db_sessions.sync() as db:
+        cluster = Cluster(label="Brake noise", num_claims=30, total_cost_usd=Decimal("4512.50"))
+        db.add(cluster)
+        db.flush()
+        for index in range(30):
+            db.add(
+                Claim(
+                    claim_id=f"CLM-{index}",
+                    vin=f"VIN{index}",
+                    model="Falcon",
+                    model_year=2022,
+                    region="EU" if index % 2 else None,
+                    mileage_km=1000 + index,
+                    failure_date=date(2024, 3, 1 + index % 28),
+                    component="Brakes",
+                    part_number="BRK-1",
+                    dtc_codes="C0035",
+                    symptom_text="Grinding noise when braking",
+                    repair_action="Replaced pads and rotors",
+                    claim_cost_usd=Decimal("150.40"),
+                    dealer_id="D1",
+                    latitude=48.1 if index % 3 else None,
+                    longitude=11.5 if index % 3 else None,
+                    cluster_id=cluster.id,
+                )
+            )
+        db.commit()
+    with TestClient(app) as test_client:
+        yield test_client, db_sessions
+
+
+def test_claims_page_matches_the_pydantic_encoding(client):
+    test_client, sessions = client
+    response = test_client.get("/api/v1/claims", params={"page_size": 10, "page": 2})
+    assert response.status_code == 200
+
+    with sessions.sync() as db:
+        expected_total = db.query(Claim).count()
+        claims = db.query(Claim).order_by(Claim.failure_date.desc()).offset(10).limit(10).all()
+        expected = ClaimsPage(
+            total=expected_total,
+            page=2,
+            page_size=10,
+            items=[ClaimRead.model_validate(claim) for claim in claims],
+        )
+    assert response.json() == expected.model_dump(mode="json")
+
+
+def test_cluster_list_matches_the_pydantic_encoding(client):
+    test_client, sessions = client
+    response = test_client.get("/api/v1/clusters")
+    assert response.status_code == 200
+
+    with sessions.sync() as db:
+        expected = [ClusterRead.model_validate(cluster).model_dump(mode="json") for cluster in db.query(Cluster).all()]
+    assert response.json() == expected
+
+
+def test_large_responses_are_gzipped(client):
+    test_client, _ = client
+    response = test_client.get("/api/v1/claims", params={"page_size": 30}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["items"]) == 30
+
+    small = test_client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_gzipped_export_is_not_compressed_twice(client):
+    test_client, _ = client
+    response = test_client.get("/api/v1/claims/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-type"] == "application/gzip"
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.main import app
+from app.services.ingest_service import CSV_COLUMNS
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_expose_route_latency_and_db_queries(db_sessions):
+    client = TestClient(app)
+    route_count = _sample(
+        "warrantrix_http_request_duration_seconds_count", method="GET", route="/api/v1/claims/{claim_id}", status="404"
+    )
+    select_count = _sample("warrantrix_db_query_duration_seconds_count", operation="SELECT")
+
+    assert client.get("/api/v1/claims/12345").status_code == 404
+
+    assert _sample(
+        "warrantrix_http_request_duration_seconds_count", method="GET", route="/api/v1/claims/{claim_id}", status="404"
+    ) == route_count + 1
+    assert _sample("warrantrix_db_query_duration_seconds_count", operation="SELECT") > select_count
+
+    body = client.get("/metrics").text
+    assert 'route="/api/v1/claims/{claim_id}"' in body
+    assert "/api/v1/claims/12345" not in body
+
+
+def test_ingest_counts_inserted_rows(db_sessions):
+    client = TestClient(app)
+    before = _sample("warrantrix_ingest_rows_total", outcome="inserted")
+    rows = "\n".join(f"C-{index},VIN{index},Falcon,2022,EU,10,2024-03-02,Brakes,B,P0301,Noise,Pads,10.00,D1,," for index in range(3))
+    response = client.post(
+        "/api/v1/ingest/claims-csv",
+        files={"file": ("claims.csv", ",".join(CSV_COLUMNS) + "\n" + rows + "\n", "text/csv")},
+    )
+
+    assert response.status_code == 200
+    assert _sample("warrantrix_ingest_rows_total", outcome="inserted") == before + 3
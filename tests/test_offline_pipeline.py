@@ -0,0 +1,48 @@
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+from fastapi import UploadFile
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.services import vector_store
+from app.services.embedding_service import embed_new_claims
+from app.services.fake_embeddings import fake_embedding
+from app.services.ingest_service import CSV_COLUMNS, ingest_claims_from_csv
+from benchmarks.synthetic import generate_claims
+
+
+def test_synthetic_claims_are_seeded_and_match_the_ingest_columns():
+    first = generate_claims(50, seed=3)
+    assert list(first.columns) == CSV_COLUMNS
+    assert first.equals(generate_claims(50, seed=3))
+    assert not first.equals(generate_claims(50, seed=4))
+
+
+def test_fake_embeddings_keep_similar_claims_close():
+    base = "Model: Falcon, Component: Brakes, Region: EU, DTC: C0035, Symptoms: Grinding noise"
+    similar = "Model: Falcon, Component: Brakes, Region: NA, DTC: C0035, Symptoms: Grinding noise"
+    different = "Model: Osprey, Component: HVAC, Region: APAC, DTC: B1479, Symptoms: No cold air"
+
+    vectors = {name: np.array(fake_embedding(text, 64)) for name, text in [("base", base), ("similar", similar), ("different", different)]}
+    assert fake_embedding(base, 64) == fake_embedding(base, 64)
+    assert vectors["base"] @ vectors["similar"] > vectors["base"] @ vectors["different"]
+
+
+def test_claims_embed_offline_into_in_memory_qdrant(db_sessions):
+    settings = get_settings().model_copy(
+        update={"qdrant_url": vector_store.IN_MEMORY_URL, "embedding_provider": "fake", "embedding_dim": 16}
+    )
+    vector_store.drop_vector_store(settings)
+
+    csv_bytes = generate_claims(30, seed=1).to_csv(index=False).encode("utf-8")
+    with db_sessions.sync() as db:
+        ingest_claims_from_csv(db, UploadFile(file=io.BytesIO(csv_bytes), filename="claims.csv"), settings)
+        assert embed_new_claims(db, settings) == 30
+
+    embeddings = vector_store.fetch_all_embeddings(settings)
+    assert len(embeddings) == 30
+    assert len(embeddings[0].vector) == 16
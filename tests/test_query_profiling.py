@@ -0,0 +1,115 @@
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core import profiling
+from app.core.security import create_access_token
+from app.core.user_cache import user_cache
+from app.main import app
+from app.models import User
+
+USER_IDS = {"admin": 1, "engineer": 2}
+
+
+@pytest.fixture()
+def client(db_sessions):
+    with db_sessions.sync() as db:
+        db.add_all(
+            User(id=user_id, email=f"{role}@example.com", name=role, password_hash="x", role=role)
+            for role, user_id in USER_IDS.items()
+        )
+        db.commit()
+    user_cache.clear()
+    with TestClient(app) as test_client:
+        test_client.sessions = db_sessions.sync
+        yield test_client
+    user_cache.clear()
+
+
+def _headers(role: str, version: int = 0) -> dict:
+    claims = {"sub": f"{role}@example.com", "user_id": USER_IDS[role], "role": role, "ver": version}
+    return {"Authorization": f"Bearer {create_access_token(claims)}", profiling.PROFILE_HEADER: "1"}
+
+
+def test_admins_get_server_timing(client: TestClient):
+    response = client.get("/api/v1/clusters", headers=_headers("admin"))
+
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert "db-1;dur=" in timing and "SELECT" in timing
+    assert "total;dur=" in timing
+
+
+def test_profiling_is_ignored_for_non_admins(client: TestClient):
+    response = client.get("/api/v1/clusters", headers=_headers("engineer"))
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_demoted_admins_tokens_no_longer_profile(client: TestClient):
+    headers = _headers("admin")
+    assert "Server-Timing" in client.get("/api/v1/clusters", headers=headers).headers
+
+    with client.sessions() as db:
+        db.get(User, USER_IDS["admin"]).role = "engineer"
+        db.commit()
+
+    assert "Server-Timing" not in client.get("/api/v1/clusters", headers=headers).headers
+    # The role claim of a still-valid token is not trusted either; the user's role is.
+    claims = {"sub": "engineer@example.com", "user_id": USER_IDS["engineer"], "role": "admin", "ver": 0}
+    headers = {"Authorization": f"Bearer {create_access_token(claims)}", profiling.PROFILE_HEADER: "1"}
+    assert "Server-Timing" not in client.get("/api/v1/clusters", headers=headers).headers
+
+
+def test_slow_statements_are_logged_with_parameters_and_plan(client: TestClient, monkeypatch, caplog):
+    monkeypatch.setattr(profiling.settings, "slow_query_threshold_ms", 0.0)
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        assert client.get("/api/v1/clusters/42").status_code == 404
+
+    entries = [json.loads(record.getMessage()) for record in caplog.records if record.name == "app.slow_query"]
+    lookup = next(entry for entry in entries if "FROM clusters" in entry["statement"])
+    assert "42" in json.dumps(lookup["parameters"])
+    assert lookup["plan"]
+
+
+class _RecordingCursor:
+    def __init__(self, executed: list[str]):
+        self.executed = executed
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement.split()[0] if statement.startswith("EXPLAIN") else statement)
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("relation does not exist")
+
+    def close(self):
+        pass
+
+
+def test_failed_explain_is_rolled_back_to_its_savepoint():
+    executed: list[str] = []
+    cursor = _RecordingCursor(executed)
+
+    class FakeConnection:
+        dialect = type("Dialect", (), {"name": "postgresql"})()
+        connection = type("Pool", (), {"dbapi_connection": type("DBAPI", (), {"cursor": lambda self: cursor})()})()
+
+        def in_transaction(self):
+            return True
+
+    plan = profiling._explain(FakeConnection(), "SELECT * FROM missing", {})
+
+    assert plan == ["EXPLAIN failed: relation does not exist"]
+    assert executed == [
+        f"SAVEPOINT {profiling.EXPLAIN_SAVEPOINT}",
+        "EXPLAIN",
+        f"ROLLBACK TO SAVEPOINT {profiling.EXPLAIN_SAVEPOINT}",
+        f"RELEASE SAVEPOINT {profiling.EXPLAIN_SAVEPOINT}",
+    ]
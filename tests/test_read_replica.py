@@ -0,0 +1,104 @@
+import asyncio
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database
+from app.database import READ_CONSISTENCY_HEADER, Base, ReadSessionRouter, get_db
+from app.main import app
+from app.models import Claim
+from app.services.ingest_service import CSV_COLUMNS
+
+
+def _claim(claim_id: str) -> Claim:
+    return Claim(
+        claim_id=claim_id,
+        vin="VIN1",
+        model="Falcon",
+        model_year=2022,
+        region="EU",
+        mileage_km=1000,
+        failure_date=date(2024, 3, 1),
+        component="Brakes",
+        part_number="BRK-1",
+        dtc_codes="P0301",
+        symptom_text="Noise",
+        repair_action="Pads",
+        claim_cost_usd=Decimal("100.00"),
+        dealer_id="D1",
+    )
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    """Primary and replica are two SQLite files seeded with different claims."""
+
+    engines = []
+    factories = {}
+    for name in ("primary", "replica"):
+        path = tmp_path / f"{name}.db"
+        engine = create_engine(f"sqlite+pysqlite:///{path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(_claim(f"{name.upper()}-1"))
+            db.commit()
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        engines.extend([engine, async_engine])
+        factories[name] = (sessionmaker(bind=engine, autoflush=False), async_sessionmaker(async_engine, expire_on_commit=False))
+
+    router = ReadSessionRouter(
+        factories["primary"][1],
+        factories["replica"][1],
+        max_lag_seconds=5.0,
+        check_interval_seconds=10.0,
+    )
+    monkeypatch.setattr(database, "get_read_router", lambda: router)
+
+    def override_get_db():
+        db = factories["primary"][0]()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+    for engine in engines:
+        result = engine.dispose()
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+
+
+def _claim_ids(client: TestClient, **kwargs) -> set[str]:
+    response = client.get("/api/v1/claims", **kwargs)
+    assert response.status_code == 200
+    return {item["claim_id"] for item in response.json()["items"]}
+
+
+def test_reads_go_to_the_replica_by_default(client: TestClient):
+    assert _claim_ids(client) == {"REPLICA-1"}
+
+
+def test_consistency_header_forces_the_primary(client: TestClient):
+    assert _claim_ids(client, headers={READ_CONSISTENCY_HEADER: "primary"}) == {"PRIMARY-1"}
+
+
+def test_reads_follow_a_recent_write_to_the_primary(client: TestClient):
+    csv_body = ",".join(CSV_COLUMNS) + "\nNEW-1,VIN2,Falcon,2022,EU,10,2024-03-02,Brakes,B,P0301,Noise,Pads,10.00,D1,,\n"
+    response = client.post("/api/v1/ingest/claims-csv", files={"file": ("claims.csv", csv_body, "text/csv")})
+    assert response.status_code == 200
+    assert database.READ_YOUR_WRITES_COOKIE in response.cookies
+
+    assert _claim_ids(client) == {"PRIMARY-1", "NEW-1"}
@@ -0,0 +1,139 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import worker
+from app.config import get_settings
+from app.main import app
+from app.models import ClusterRun, Job
+from app.services import recluster_service
+from app.services.job_service import claim_next_job, requeue_stale_jobs
+
+
+@pytest.fixture()
+def client(db_sessions):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def stages(monkeypatch):
+    calls: list[str] = []
+
+    def embed(db, settings, on_progress=None):
+        calls.append("embed")
+        on_progress(embedded=2, last_claim_id=2)
+        return 2
+
+    def explain(db, settings, on_progress=None):
+        calls.append("explain")
+        return 0
+
+    monkeypatch.setattr(recluster_service, "embed_new_claims", embed)
+    monkeypatch.setattr(recluster_service, "recalculate_clusters", lambda db, settings, run=None: calls.append("cluster") or 3)
+    monkeypatch.setattr(recluster_service, "update_ai_explanations_for_all_clusters", explain)
+    monkeypatch.setattr(recluster_service, "recalculate_trends", lambda db, settings: calls.append("trends") or 7)
+    monkeypatch.setattr(recluster_service, "recalculate_hotspots", lambda db, settings: calls.append("hotspots") or 1)
+    return calls
+
+
+def test_recluster_is_single_flight(client: TestClient):
+    first = client.post("/api/v1/admin/recluster")
+    second = client.post("/api/v1/admin/recluster")
+
+    assert first.status_code == 202
+    assert second.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    assert first.json()["status"] == "queued"
+
+
+def test_worker_runs_stages_and_reports_progress(client: TestClient, db_sessions, stages):
+    job_id = client.post("/api/v1/admin/recluster").json()["id"]
+
+    assert worker.run_once(get_settings(), "test-worker", db_sessions.sync)
+    assert stages == list(recluster_service.RECLUSTER_STAGES)
+
+    job = client.get(f"/api/v1/admin/jobs/{job_id}").json()
+    assert job["status"] == "succeeded"
+    assert job["result"]["clusters_created"] == 3
+    assert job["stages"]["embed"]["checkpoint"] == {"embedded": 2, "last_claim_id": 2}
+    assert all(stage["duration_seconds"] is not None for stage in job["stages"].values())
+    with db_sessions.sync() as db:
+        run = db.get(ClusterRun, job["stages"]["cluster"]["checkpoint"]["run_id"])
+        assert (run.status, run.num_clusters) == ("succeeded", 3)
+
+    assert client.post("/api/v1/admin/recluster").status_code == 202
+
+
+def test_retry_resumes_after_the_last_completed_stage(client: TestClient, db_sessions, stages, monkeypatch):
+    def explode(db, settings, on_progress=None):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(recluster_service, "update_ai_explanations_for_all_clusters", explode)
+    job_id = client.post("/api/v1/admin/recluster").json()["id"]
+    worker.run_once(get_settings(), "test-worker", db_sessions.sync)
+
+    job = client.get(f"/api/v1/admin/jobs/{job_id}").json()
+    assert job["status"] == "failed"
+    assert job["stages"]["explain"]["error"] == "model unavailable"
+
+    with db_sessions.sync() as db:
+        db.get(Job, job_id).status = "queued"
+        db.commit()
+    monkeypatch.undo()
+    stages.clear()
+    monkeypatch.setattr(recluster_service, "update_ai_explanations_for_all_clusters", lambda db, settings, on_progress=None: 4)
+    monkeypatch.setattr(recluster_service, "recalculate_trends", lambda db, settings: 7)
+    monkeypatch.setattr(recluster_service, "recalculate_hotspots", lambda db, settings: 1)
+    monkeypatch.setattr(recluster_service, "embed_new_claims", lambda *args, **kwargs: pytest.fail("embed re-ran"))
+    monkeypatch.setattr(recluster_service, "recalculate_clusters", lambda *args, **kwargs: pytest.fail("cluster re-ran"))
+    worker.run_once(get_settings(), "test-worker", db_sessions.sync)
+
+    job = client.get(f"/api/v1/admin/jobs/{job_id}").json()
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+    assert job["result"]["clusters_updated_with_ai"] == 4
+
+
+def test_stale_jobs_fail_after_max_attempts(client: TestClient, db_sessions):
+    job_id = client.post("/api/v1/admin/recluster").json()["id"]
+    settings = get_settings().model_copy(update={"job_stale_after_seconds": 60, "job_max_attempts": 2})
+
+    def crash_worker() -> None:
+        # Claimed, then the worker dies without another heartbeat.
+        with db_sessions.sync() as db:
+            assert claim_next_job(db, "doomed-worker").id == job_id
+            db.get(Job, job_id).heartbeat_at = datetime.utcnow() - timedelta(minutes=5)
+            db.commit()
+
+    crash_worker()
+    with db_sessions.sync() as db:
+        assert requeue_stale_jobs(db, settings.job_stale_after_seconds, settings.job_max_attempts) == 1
+    crash_worker()
+    with db_sessions.sync() as db:
+        assert requeue_stale_jobs(db, settings.job_stale_after_seconds, settings.job_max_attempts) == 0
+
+    job = client.get(f"/api/v1/admin/jobs/{job_id}").json()
+    assert (job["status"], job["attempts"]) == ("failed", 2)
+    assert "2 attempt" in job["error"]
+    assert client.post("/api/v1/admin/recluster").status_code == 202
+
+
+def test_embed_stage_waits_for_the_embedding_lock(client: TestClient, db_sessions, stages, monkeypatch):
+    locks: list[bool] = []
+
+    def acquire(db, wait=False):
+        locks.append(wait)
+        return True
+
+    monkeypatch.setattr(recluster_service, "acquire_embedding_lock", acquire)
+    client.post("/api/v1/admin/recluster")
+    worker.run_once(get_settings(), "test-worker", db_sessions.sync)
+
+    assert locks == [True]
+    assert stages[0] == "embed"
@@ -0,0 +1,104 @@
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.models import Claim, ClusterRun, Job
+from app.services import scheduler_service
+
+
+def _claim(index: int, embedded_at: datetime | None = None) -> Claim:
+    return Claim(
+        claim_id=f"C-{index}",
+        vin=f"VIN{index}",
+        model="Falcon",
+        model_year=2022,
+        region="EU",
+        mileage_km=1000,
+        failure_date=date(2024, 3, 1),
+        component="Brakes",
+        part_number="BRK-1",
+        dtc_codes="P0301",
+        symptom_text="Noise",
+        repair_action="Pads",
+        claim_cost_usd=Decimal("100.00"),
+        dealer_id="D1",
+        embedded_at=embedded_at,
+    )
+
+
+@pytest.fixture()
+def settings():
+    return get_settings().model_copy(
+        update={
+            "scheduler_embed_batch_size": 2,
+            "scheduler_embed_concurrency": 2,
+            "scheduler_recluster_min_new_claims": 5,
+            "scheduler_recluster_max_interval_seconds": 3600,
+        }
+    )
+
+
+@pytest.fixture()
+def embedded_batches(monkeypatch):
+    batches: list[list[int]] = []
+
+    def fake_embed(db, settings, on_progress=None, claim_ids=None):
+        batches.append(sorted(claim_ids))
+        for claim in db.query(Claim).filter(Claim.id.in_(claim_ids)):
+            claim.embedded_at = datetime.utcnow()
+        db.commit()
+        return len(claim_ids)
+
+    monkeypatch.setattr(scheduler_service, "embed_new_claims", fake_embed)
+    return batches
+
+
+def test_tick_embeds_small_concurrent_batches(db_sessions, settings, embedded_batches):
+    with db_sessions.sync() as db:
+        db.add(ClusterRun(status="succeeded", finished_at=datetime.utcnow() - timedelta(minutes=5)))
+        db.add_all(_claim(index) for index in range(7))
+        db.commit()
+
+    result = scheduler_service.run_scheduler_tick(db_sessions.sync, settings)
+
+    assert result["embedded"] == 4
+    assert sorted(embedded_batches) == [[1, 2], [3, 4]]
+    assert result["recluster_job_id"] is None
+
+
+def test_tick_queues_recluster_once_backlog_threshold_is_crossed(db_sessions, settings, embedded_batches):
+    with db_sessions.sync() as db:
+        db.add(ClusterRun(status="succeeded", finished_at=datetime.utcnow() - timedelta(minutes=5)))
+        db.add_all(_claim(index, embedded_at=datetime.utcnow()) for index in range(5))
+        db.commit()
+
+    first = scheduler_service.run_scheduler_tick(db_sessions.sync, settings)
+    second = scheduler_service.run_scheduler_tick(db_sessions.sync, settings)
+
+    assert first["recluster_job_id"] is not None
+    assert second["recluster_job_id"] == first["recluster_job_id"]
+    with db_sessions.sync() as db:
+        assert db.query(Job).count() == 1
+
+
+def test_tick_waits_while_backlog_and_age_are_below_thresholds(db_sessions, settings, embedded_batches):
+    with db_sessions.sync() as db:
+        db.add(ClusterRun(status="succeeded", finished_at=datetime.utcnow() - timedelta(minutes=5)))
+        db.add(_claim(1, embedded_at=datetime.utcnow()))
+        db.commit()
+
+    assert scheduler_service.run_scheduler_tick(db_sessions.sync, settings)["recluster_job_id"] is None
+
+
+def test_first_tick_queues_recluster_without_a_previous_run(db_sessions, settings, embedded_batches):
+    with db_sessions.sync() as db:
+        db.add_all(_claim(index, embedded_at=datetime.utcnow()) for index in range(2))
+        db.commit()
+
+    assert scheduler_service.run_scheduler_tick(db_sessions.sync, settings)["recluster_job_id"] is not None
@@ -0,0 +1,69 @@
+import io
+import sys
+from pathlib import Path
+
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.main import app
+from app.models import Claim, Cluster, ClusterRun
+from app.services import vector_store
+from app.services.clustering_service import centroids_from_bytes, recalculate_clusters
+from app.services.embedding_service import embed_new_claims
+from app.services.ingest_service import ingest_claims_from_csv
+from benchmarks.synthetic import generate_claims
+
+
+def _run(db, settings) -> ClusterRun:
+    run = ClusterRun(status="running")
+    db.add(run)
+    db.commit()
+    recalculate_clusters(db, settings, run=run)
+    run.status = "succeeded"
+    db.commit()
+    return run
+
+
+def test_segments_are_clustered_separately_in_a_process_pool(db_sessions):
+    settings = get_settings().model_copy(
+        update={
+            "embedding_provider": "fake",
+            "embedding_dim": 16,
+            "vector_backend": "local",
+            "local_vector_path": vector_store.IN_MEMORY_URL,
+            "clustering_min_claims": 10,
+            "clustering_segment_by": "model",
+            "clustering_workers": 2,
+        }
+    )
+    csv_bytes = generate_claims(240, seed=9).to_csv(index=False).encode("utf-8")
+    try:
+        with db_sessions.sync() as db:
+            ingest_claims_from_csv(db, UploadFile(file=io.BytesIO(csv_bytes), filename="claims.csv"), settings)
+            embed_new_claims(db, settings)
+
+            cold = _run(db, settings)
+            models = set(db.execute(select(Claim.model)).scalars())
+            assert set(cold.centroid_segments) == models
+            assert len(cold.centroid_segments) == len(centroids_from_bytes(cold.centroids))
+
+            mismatched = db.execute(
+                select(Claim.id).join(Cluster, Claim.cluster_id == Cluster.id).where(Cluster.segment != Claim.model)
+            ).all()
+            assert mismatched == []
+            assert all(label.startswith(f"{segment}: ") for label, segment in db.execute(select(Cluster.label, Cluster.segment)))
+
+            # In-process this time; the segments and their warm start must not depend on the pool.
+            warm = _run(db, settings.model_copy(update={"clustering_workers": 1}))
+            assert warm.warm_started and warm.segment_by == "model"
+            assert warm.centroid_segments == cold.centroid_segments
+    finally:
+        vector_store._get_local_index.cache_clear()
+
+    with TestClient(app) as client:
+        clusters = client.get("/api/v1/clusters", params={"segment": "Falcon"}).json()
+    assert clusters and {cluster["segment"] for cluster in clusters} == {"Falcon"}
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ("pandas", "numpy", "sklearn", "openai", "qdrant_client", "pyarrow")
+
+PROBE = """
+import json, sys
+from app.main import app
+print(json.dumps({
+    "heavy": [name for name in %r if name in sys.modules],
+    "paths": sorted(app.openapi()["paths"]),
+}))
+"""
+
+
+def _import_app(api_role: str) -> dict:
+    env = {**os.environ, "API_ROLE": api_role, "PYTHONPATH": str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE % (HEAVY_MODULES,)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_api_startup_does_not_import_the_ml_stack():
+    for role in ("full", "read"):
+        assert _import_app(role)["heavy"] == [], role
+
+
+def test_read_role_serves_only_read_endpoints():
+    full = _import_app("full")["paths"]
+    read = _import_app("read")["paths"]
+
+    assert "/api/v1/ingest/claims-csv" in full
+    assert "/api/v1/admin/recluster" in full
+    assert not any(path.startswith(("/api/v1/ingest", "/api/v1/admin")) for path in read)
+    assert "/api/v1/claims" in read
+    assert "/health" in read
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.trend_service import compute_weekly_trends
+
+
+def _trends(weekly: pd.DataFrame, spike_rule: str = "ewma") -> pd.DataFrame:
+    return compute_weekly_trends(
+        weekly,
+        rolling_weeks=4,
+        baseline_weeks=8,
+        spike_rule=spike_rule,
+        ewma_alpha=0.3,
+        control_limit_sigma=3.0,
+        min_spike_claims=3,
+    )
+
+
+def _weekly(counts: list[int], key: str = "Brakes") -> pd.DataFrame:
+    weeks = pd.date_range("2024-01-01", periods=len(counts), freq="7D")
+    return pd.DataFrame(
+        {
+            "key": key,
+            "week_start": weeks,
+            "claim_count": counts,
+            "total_cost_usd": [count * 100.0 for count in counts],
+        }
+    )
+
+
+def test_flat_series_raises_no_alerts():
+    trends = _trends(_weekly([2, 3, 2, 2, 3, 2, 3, 2, 2, 3]))
+    assert not trends["is_spike"].any()
+
+
+def test_sudden_increase_is_flagged_as_spike():
+    trends = _trends(_weekly([2, 3, 2, 2, 3, 2, 3, 2, 2, 20]))
+    assert trends["is_spike"].tolist() == [False] * 9 + [True]
+
+
+def test_gaps_are_zero_filled_and_rolled():
+    weekly = _weekly([1, 4])
+    weekly.loc[1, "week_start"] = pd.Timestamp("2024-01-22")
+    trends = _trends(weekly, spike_rule="shewhart")
+
+    assert trends["claim_count"].tolist() == [1, 0, 0, 4]
+    assert trends["rolling_claim_count"].tolist() == [1, 1, 1, 5]
+    assert trends["rolling_cost_usd"].tolist() == [100.0, 100.0, 100.0, 500.0]
@@ -0,0 +1,249 @@
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pytest
+from qdrant_client.http import models as qmodels
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import get_settings
+from app.models import Claim
+from app.services import vector_store
+
+
+@pytest.fixture()
+def settings():
+    settings = get_settings().model_copy(update={"qdrant_url": vector_store.IN_MEMORY_URL, "embedding_dim": 4})
+    vector_store.drop_vector_store(settings)
+    yield settings
+    vector_store.drop_vector_store(settings)
+
+
+def _points(count: int) -> list[vector_store.ClaimEmbedding]:
+    return [vector_store.ClaimEmbedding(id=i, vector=[1.0, float(i), 0.0, 1.0], payload={"claim_id": i}) for i in range(1, count + 1)]
+
+
+def test_collection_is_created_behind_the_alias(settings):
+    vector_store.upsert_claim_embeddings(settings, _points(3))
+    client = vector_store.get_client(settings)
+
+    physical = vector_store.current_collection(client)
+    assert physical.startswith(f"{vector_store.COLLECTION_NAME}_")
+    assert len(vector_store.fetch_all_embeddings(settings)) == 3
+
+
+def test_collection_config_follows_settings(settings):
+    config = vector_store.collection_config(
+        settings.model_copy(
+            update={"qdrant_quantization": "scalar", "qdrant_on_disk_vectors": True, "qdrant_hnsw_m": 32}
+        )
+    )
+    assert config["vectors_config"].on_disk is True
+    assert config["hnsw_config"].m == 32
+    assert config["quantization_config"].scalar.type == qmodels.ScalarType.INT8
+
+    binary = settings.model_copy(update={"qdrant_quantization": "binary", "qdrant_search_oversampling": 3.0})
+    assert isinstance(vector_store.collection_config(binary)["quantization_config"], qmodels.BinaryQuantization)
+    assert vector_store.search_params(binary).quantization.oversampling == 3.0
+    assert vector_store.search_params(settings).quantization is None
+
+
+def test_migration_copies_points_and_switches_the_alias(settings):
+    vector_store.upsert_claim_embeddings(settings, _points(5))
+    client = vector_store.get_client(settings)
+    before = vector_store.current_collection(client)
+
+    after = vector_store.migrate_vector_store(settings, batch_size=2)
+
+    assert after != before
+    assert vector_store.current_collection(client) == after
+    assert not client.collection_exists(before)
+    assert sorted(point.id for point in vector_store.fetch_all_embeddings(settings)) == [1, 2, 3, 4, 5]
+    hits = vector_store.query_similar_claims(settings, [1.0, 5.0, 0.0, 1.0], limit=1)
+    assert hits[0]["id"] == 5
+
+
+def test_migration_adopts_a_plain_legacy_collection(settings):
+    client = vector_store.get_client(settings)
+    client.create_collection(
+        collection_name=vector_store.COLLECTION_NAME,
+        vectors_config=qmodels.VectorParams(size=4, distance=qmodels.Distance.COSINE),
+    )
+    client.upsert(
+        collection_name=vector_store.COLLECTION_NAME,
+        points=[qmodels.PointStruct(id=7, vector=[1.0, 0.0, 0.0, 0.0], payload={"claim_id": 7})],
+    )
+
+    target = vector_store.migrate_vector_store(settings)
+
+    assert vector_store.current_collection(client) == target
+    assert [point.id for point in vector_store.fetch_all_embeddings(settings)] == [7]
+
+
+def test_keep_old_copies_a_legacy_collection_and_alias_failures_name_the_target(settings, monkeypatch):
+    client = vector_store.get_client(settings)
+    client.create_collection(
+        collection_name=vector_store.COLLECTION_NAME,
+        vectors_config=qmodels.VectorParams(size=4, distance=qmodels.Distance.COSINE),
+    )
+    client.upsert(
+        collection_name=vector_store.COLLECTION_NAME,
+        points=[qmodels.PointStruct(id=7, vector=[1.0, 0.0, 0.0, 0.0], payload={"claim_id": 7})],
+    )
+
+    vector_store.migrate_vector_store(settings, keep_old=True)
+    (backup,) = [
+        collection.name
+        for collection in client.get_collections().collections
+        if collection.name.startswith(f"{vector_store.COLLECTION_NAME}_legacy_")
+    ]
+    (point,) = client.scroll(collection_name=backup, with_payload=True)[0]
+    assert (point.id, point.payload) == (7, {"claim_id": 7})
+    client.delete_collection(collection_name=backup)
+
+    def refuse(*args, **kwargs):
+        raise ConnectionError("qdrant went away")
+
+    monkeypatch.setattr(vector_store, "_point_alias_at", refuse)
+    before = vector_store.current_collection(client)
+    with pytest.raises(RuntimeError, match=rf"points are in '{vector_store.COLLECTION_NAME}_\d+'"):
+        vector_store.migrate_vector_store(settings)
+    assert vector_store.current_collection(client) == before
+    for collection in client.get_collections().collections:
+        if collection.name != before:
+            client.delete_collection(collection_name=collection.name)
+
+
+def _claim(claim_pk: int, region: str, failure_date: date) -> Claim:
+    return Claim(
+        id=claim_pk,
+        claim_id=f"CLM-{claim_pk}",
+        vin=f"VIN{claim_pk}",
+        model="Falcon",
+        model_year=2022,
+        region=region,
+        mileage_km=1000,
+        failure_date=failure_date,
+        component="Brakes",
+        part_number="BRK-1",
+        dtc_codes="C0035",
+        symptom_text="Grinding noise when braking",
+        repair_action="Pads",
+        claim_cost_usd=Decimal("120.00"),
+        dealer_id="D1",
+    )
+
+
+def test_payload_keeps_only_filterable_fields(settings):
+    payload = vector_store.claim_payload(_claim(1, "EU", date(2024, 3, 1)), settings)
+    assert payload == {
+        "model": "Falcon",
+        "model_year": 2022,
+        "region": "EU",
+        "component": "Brakes",
+        "failure_date": 1709251200,
+        "cluster_id": None,
+    }
+
+    narrow = settings.model_copy(update={"qdrant_payload_fields": ["region"]})
+    assert vector_store.claim_payload(_claim(1, "EU", date(2024, 3, 1)), narrow) == {"region": "EU"}
+    with pytest.raises(ValueError):
+        vector_store.payload_fields(settings.model_copy(update={"qdrant_payload_fields": ["symptom_text"]}))
+
+
+def test_filtered_search_applies_payload_filters(settings, db_sessions):
+    claims = [_claim(1, "EU", date(2024, 1, 10)), _claim(2, "EU", date(2024, 6, 1)), _claim(3, "NA", date(2024, 1, 12))]
+    with db_sessions.sync() as db:
+        db.add_all(claims)
+        db.commit()
+        vector_store.upsert_claim_embeddings(
+            settings,
+            [
+                vector_store.ClaimEmbedding(id=claim.id, vector=[1.0, float(claim.id), 0.0, 1.0], payload=vector_store.claim_payload(claim, settings))
+                for claim in claims
+            ],
+        )
+
+        hits = vector_store.query_similar_claims(
+            settings,
+            [1.0, 1.0, 0.0, 1.0],
+            filter=vector_store.payload_filter(region="EU", date_from=date(2024, 1, 1), date_to=date(2024, 3, 31)),
+        )
+
+    assert [hit["id"] for hit in hits] == [1]
+
+
+def test_migration_slims_full_legacy_payloads(settings):
+    vector_store.upsert_claim_embeddings(
+        settings,
+        [
+            vector_store.ClaimEmbedding(
+                id=4,
+                vector=[1.0, 0.0, 0.0, 0.0],
+                payload={"claim_id": "CLM-4", "symptom_text": "Noise", "region": "EU", "failure_date": "2024-03-01"},
+            )
+        ],
+    )
+    vector_store.migrate_vector_store(settings)
+
+    assert vector_store.fetch_all_embeddings(settings)[0].payload == {"region": "EU", "failure_date": 1709251200}
+
+
+@pytest.fixture()
+def local_settings(tmp_path):
+    settings = get_settings().model_copy(
+        update={"vector_backend": "local", "local_vector_path": str(tmp_path / "vectors"), "embedding_dim": 4}
+    )
+    yield settings
+    vector_store._get_local_index.cache_clear()
+
+
+def test_local_backend_searches_filters_and_persists(local_settings):
+    claims = [_claim(1, "EU", date(2024, 1, 10)), _claim(2, "EU", date(2024, 6, 1)), _claim(3, "NA", date(2024, 1, 12))]
+    vector_store.upsert_claim_embeddings(
+        local_settings,
+        [
+            vector_store.ClaimEmbedding(id=claim.id, vector=[1.0, float(claim.id), 0.0, 1.0], payload=vector_store.claim_payload(claim, local_settings))
+            for claim in claims
+        ],
+    )
+    vector_store.update_claim_cluster_payload(local_settings, {1: 10, 3: 11})
+
+    hits = vector_store.query_similar_claims(
+        local_settings,
+        [1.0, 1.0, 0.0, 1.0],
+        filter=vector_store.payload_filter(region="EU", date_from=date(2024, 1, 1), date_to=date(2024, 3, 31)),
+    )
+    assert [hit["id"] for hit in hits] == [1]
+    assert hits[0]["payload"]["cluster_id"] == 10
+    assert hits[0]["score"] == pytest.approx(1.0)
+    assert vector_store.query_similar_claims(local_settings, [1.0, 1.0, 0.0, 1.0], filter=vector_store.payload_filter(region="APAC")) == []
+
+    # A fresh process (here: a fresh index object) reads the same files back.
+    vector_store._get_local_index.cache_clear()
+    embeddings = {embedding.id: embedding for embedding in vector_store.fetch_all_embeddings(local_settings)}
+    assert sorted(embeddings) == [1, 2, 3]
+    assert embeddings[3].payload["cluster_id"] == 11
+    assert embeddings[2].payload["region"] == "EU"
+
+
+def test_local_backend_ivf_finds_the_same_neighbours(local_settings):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((2000, 4)).astype(np.float32)
+    vector_store.upsert_claim_embeddings(
+        local_settings,
+        [vector_store.ClaimEmbedding(id=i + 1, vector=vector.tolist(), payload={}) for i, vector in enumerate(vectors)],
+    )
+    query = vectors[17].tolist()
+
+    exact = vector_store.query_similar_claims(local_settings, query, limit=5)
+    ivf_settings = local_settings.model_copy(
+        update={"local_vector_ivf_min_points": 1000, "local_vector_ivf_lists": 16, "local_vector_ivf_probes": 16}
+    )
+    approximate = vector_store.query_similar_claims(ivf_settings, query, limit=5)
+
+    assert exact[0]["id"] == 18
+    assert [hit["id"] for hit in approximate] == [hit["id"] for hit in exact]